@@ -6,17 +6,58 @@ import argparse
 import asyncio
 import json
 import re
-import subprocess
-import tempfile
 import time
-from dataclasses import asdict, dataclass
-from datetime import datetime, timezone
+from collections import Counter
+from collections.abc import Awaitable, Callable, Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field, replace
+from datetime import UTC, datetime
 from pathlib import Path
 from typing import Any
 
 import httpx
 
+from ai_test_harness.aggregate import CaseAggregator
+from ai_test_harness.cache import ResponseCache, cache_key, is_deterministic
+from ai_test_harness.executor import CaseExecutor
+from ai_test_harness.incremental import fingerprint, index_results, recent_results
+from ai_test_harness.journal import RunJournal, read_journal
+from ai_test_harness.lifecycle import ModelLifecycle
+from ai_test_harness.logging import configure_logging, log_event
+from ai_test_harness.metrics import HarnessMetrics, MetricsServer
+from ai_test_harness.mock_server import MockServer
+from ai_test_harness.ollama import (
+    TimingBreakdown,
+    model_digests,
+    native_chat,
+    stream_native_chat,
+)
+from ai_test_harness.passk import mean_pass_at_k, pass_at_k
+from ai_test_harness.pool import EndpointPool
+from ai_test_harness.progress import LiveView, ProgressTracker, format_seconds, load_history
+from ai_test_harness.repeats import RepeatPolicy
+from ai_test_harness.resultfile import CaseSpool, load_results, result_stem, write_results
+from ai_test_harness.sandbox import ExecResult, Limits, SandboxPool, run_python
+from ai_test_harness.scheduler import MatrixScheduler, plan_prefix_order
+from ai_test_harness.streaming import stream_chat_completion, stream_metrics
+from ai_test_harness.tracing import (
+    current_tracer,
+    lane,
+    span,
+    start_tracing,
+    stop_tracing,
+    tagged,
+)
+from ai_test_harness.writer import ResultWriter
+
 BASE_URL = "http://127.0.0.1:11434"
+CACHE_PATH = Path(".harness_cache/responses.db")
+DB_PATH = Path("harness.db")  # the v1 package's default (HARNESS_DB_PATH), so `harness` reads it
+RESULTS_DIR = Path("results")
+BASELINE_FILES = 20  # newest result files --incremental looks through for reusable records
+JOURNAL_DIR = RESULTS_DIR / "journal"
 
 # ---------------------------------------------------------------------------
 # Configuration
@@ -63,6 +104,57 @@ MODELS: list[str] = [
     "qwen2.5:7b",
 ]
 
+# Per-suite overrides of the --concurrency limit (cases in flight within one suite).
+SUITE_CONCURRENCY: dict[str, int] = {
+    "context_scaling": 1,  # each case fills up to 100% of num_ctx
+}
+
+
+@dataclass
+class Runtime:
+    """Run-wide state shared by chat() and the suites; populated by run_all."""
+    executor: CaseExecutor = field(default_factory=CaseExecutor)
+    scheduler: MatrixScheduler = field(default_factory=MatrixScheduler)
+    pool: EndpointPool | None = None
+    api: str = "openai"  # "openai" (/v1/chat/completions) or "native" (/api/chat)
+    lifecycle: ModelLifecycle | None = None  # None with --no-warmup
+    cache: ResponseCache | None = None  # None with --cache off
+    digests: dict[str, str] = field(default_factory=dict)  # model name -> digest
+    # Models with no known digest; their requests bypass the cache (logged once each)
+    undigested: set[str] = field(default_factory=set)
+    journal: RunJournal | None = None  # completed cases/suites, for --resume
+    # (suite, input_hash) -> earlier record, with --incremental; None otherwise
+    baseline: dict[tuple[str, str], dict[str, Any]] | None = None
+    reuse: Counter[str] = field(default_factory=Counter)  # reused / regraded / run
+    repeats: RepeatPolicy = field(default_factory=RepeatPolicy)  # one run per suite by default
+    case_order: str = "prefix"  # "prefix" (KV-cache reuse) or "given"
+    batch_sizes: list[int] | None = None  # intent_throughput sweep; None: INTENT_BATCH_SIZES
+    sandbox: SandboxPool | None = None  # warm workers for code_generation; None: one-shot runs
+    code_samples: int = 1  # samples per code prompt; above 1, code_generation reports pass@k
+    pass_k: list[int] = field(default_factory=lambda: [1, 5, 10])
+    results_db: ResultWriter | None = None  # None with --no-db
+    metrics: HarnessMetrics | None = None  # live series for --metrics-port/--live; else None
+    progress: ProgressTracker | None = None  # case progress and ETA, set by run_all
+    # Online per-(config label, suite) stats of case metrics, emptied as each suite ends
+    case_stats: CaseAggregator | None = None
+    spool: CaseSpool | None = None  # case records of finished suites, on disk until saved
+    # (config label, suite) -> prefix-reuse estimate of the suite's last run_cases call
+    prefix_plans: dict[tuple[str, str], dict[str, Any]] = field(default_factory=dict)
+    # Server-side timing per model, summed over every native call in the run
+    timings: dict[str, TimingBreakdown] = field(default_factory=dict)
+
+
+RUNTIME = Runtime()
+
+# Timing breakdowns of the chat calls made by the case currently running (native API)
+CASE_TIMING: ContextVar[list[TimingBreakdown] | None] = ContextVar("CASE_TIMING", default=None)
+# Config whose suites are running, so run_cases can journal and hash its records
+CURRENT_CONFIG: ContextVar[ModelConfig | None] = ContextVar("CURRENT_CONFIG", default=None)
+# Suite whose cases are running, for the per-suite series of RUNTIME.metrics
+CURRENT_SUITE: ContextVar[str] = ContextVar("CURRENT_SUITE", default="")
+# Which repeat of the current suite is running (0 = first); later repeats must re-sample
+CURRENT_REPEAT: ContextVar[int] = ContextVar("CURRENT_REPEAT", default=0)
+
 # ---------------------------------------------------------------------------
 # System prompts per style
 # ---------------------------------------------------------------------------
@@ -77,6 +169,17 @@ SYSTEM_PROMPTS: dict[str, dict[str, str]] = {
         "minimal": "Classify into: search, tool_call, answer, escalate",
         "none": "",
     },
+    "intent_batch": {
+        "detailed": (
+            "You are a routing classifier. Classify each numbered user query into exactly "
+            "one category. Reply with ONLY a JSON array of category names, one per query, "
+            "in the order given.\n"
+            "Categories: search, tool_call, answer, escalate"
+        ),
+        "minimal": "Classify each query into: search, tool_call, answer, escalate. "
+                   "Reply with a JSON array of labels in order.",
+        "none": "",
+    },
     "json": {
         "detailed": (
             "You are a JSON generator. Reply with ONLY valid JSON, no explanation, "
@@ -144,7 +247,8 @@ def get_system_prompt(suite: str, config: ModelConfig) -> str | None:
 
 def strip_think_tags(text: str) -> str:
     """Remove <think>...</think> blocks (deepseek-r1 chain-of-thought)."""
-    return re.sub(r"<think>.*?</think>", "", text, flags=re.DOTALL).strip()
+    with span("strip_think_tags"):
+        return re.sub(r"<think>.*?</think>", "", text, flags=re.DOTALL).strip()
 
 
 def word_match(expected: str, text: str) -> bool:
@@ -168,32 +272,39 @@ def strip_markdown_fences(text: str) -> str:
 
 
 class TokenCounter:
-    """Accumulates prompt and completion token counts across multiple chat calls."""
+    """Accumulates prompt and completion token counts across multiple chat calls.
+
+    With the native API it also sums the server timings, giving prefill and decode tok/s.
+    """
 
     def __init__(self) -> None:
         self.prompt_tokens: int = 0
         self.completion_tokens: int = 0
+        self.timing: TimingBreakdown | None = None
 
-    def add(self, usage: dict[str, Any]) -> None:
+    def add(self, usage: dict[str, Any], timing: TimingBreakdown | None = None) -> None:
         self.prompt_tokens += usage.get("prompt_tokens", 0)
         self.completion_tokens += usage.get("completion_tokens", 0)
+        if timing is not None:
+            self.timing = timing if self.timing is None else self.timing + timing
 
-    def as_dict(self) -> dict[str, int]:
-        return {
+    def as_dict(self) -> dict[str, Any]:
+        out: dict[str, Any] = {
             "prompt_tokens": self.prompt_tokens,
             "completion_tokens": self.completion_tokens,
         }
+        if self.timing is not None:
+            out["tokens_per_second_prompt"] = round(self.timing.tokens_per_second_prompt, 1)
+            out["tokens_per_second_generation"] = round(
+                self.timing.tokens_per_second_generation, 1
+            )
+        return out
 
 
-async def chat(
-    client: httpx.AsyncClient,
-    config: ModelConfig,
-    messages: list[dict[str, str]],
-    max_tokens: int = 256,
-    timeout: float = 60.0,
-    counter: TokenCounter | None = None,
+def build_payload(
+    config: ModelConfig, messages: list[dict[str, str]], max_tokens: int
 ) -> dict[str, Any]:
-    """Send a chat completion request using config params, return parsed response."""
+    """Build the /v1/chat/completions request body for a config."""
     payload: dict[str, Any] = {
         "model": config.name,
         "messages": messages,
@@ -202,22 +313,153 @@ async def chat(
         "top_p": config.top_p,
         "options": {"num_ctx": config.num_ctx},
     }
-    resp = await client.post(
-        "/v1/chat/completions",
-        json=payload,
-        timeout=httpx.Timeout(timeout, connect=10.0),
-    )
-    resp.raise_for_status()
-    data = resp.json()
+    if RUNTIME.lifecycle is not None:
+        # Every request resets Ollama's idle timer; keep the preloaded model's setting
+        payload["keep_alive"] = RUNTIME.lifecycle.keep_alive
+    return payload
+
+
+async def chat(
+    client: httpx.AsyncClient,
+    config: ModelConfig,
+    messages: list[dict[str, str]],
+    max_tokens: int = 256,
+    timeout: float = 60.0,
+    counter: TokenCounter | None = None,
+) -> dict[str, Any]:
+    """Send a chat completion request using config params, return parsed response.
+
+    ``client`` comes from the run's EndpointPool, which picks the server instance.
+    With ``--api native`` the request goes to /api/chat and the response also
+    carries Ollama's timing fields and a ``timing`` breakdown.
+    """
+    payload = build_payload(config, messages, max_tokens)
+    key = None
+    digest = cache_digest(config.name) if RUNTIME.cache is not None else None
+    if digest is not None and is_deterministic(payload):
+        # keep_alive only affects residency, not the output
+        keyed = {k: v for k, v in payload.items() if k != "keep_alive"}
+        key = cache_key(f"ollama/{RUNTIME.api}", digest, keyed)
+        cached = RUNTIME.cache.get(key)
+        if cached is not None:
+            return finish_response(config, cached, counter)
+    start = time.perf_counter()
+    try:
+        if RUNTIME.api == "native":
+            with span("request", cat="http", api="native"):
+                data = await native_chat(client, payload, timeout)
+        else:
+            with span("request", cat="http", api="openai"):
+                resp = await client.post(
+                    "/v1/chat/completions",
+                    json=payload,
+                    timeout=httpx.Timeout(timeout, connect=10.0),
+                )
+                resp.raise_for_status()
+            with span("parse"):
+                data = resp.json()
+    except Exception as e:
+        request_failed(config, e)
+        raise
+    elapsed = time.perf_counter() - start
+    if key is not None:
+        RUNTIME.cache.put(key, {"choices": data["choices"], "usage": data.get("usage", {})})
+    return finish_response(config, data, counter, elapsed)
+
+
+def cache_digest(model: str) -> str | None:
+    """The model's digest for response cache keys, or None to bypass the cache.
+
+    Without a digest (/api/tags failed, or lists no such name) a cached answer
+    could come from weights the model has since been re-pulled with.
+    """
+    digest = RUNTIME.digests.get(model)
+    if digest is None and model not in RUNTIME.undigested:
+        RUNTIME.undigested.add(model)
+        log_event("cache_bypassed", model=model, level="warning", reason="no model digest")
+    return digest
+
+
+def request_failed(config: ModelConfig, error: Exception) -> None:
+    """Count a failed chat request in RUNTIME.metrics (by timeout, http, transport...)."""
+    if RUNTIME.metrics is not None:
+        RUNTIME.metrics.record_request_error(config.name, CURRENT_SUITE.get(), error)
+
+
+def finish_response(
+    config: ModelConfig,
+    data: dict[str, Any],
+    counter: TokenCounter | None,
+    elapsed: float | None = None,
+) -> dict[str, Any]:
+    """Strip think tags, count tokens and record server timings for one response.
+
+    ``elapsed`` is the request's wall time; it is None for a cached response,
+    which then does not count as a request in RUNTIME.metrics.
+    """
+    # Native Ollama responses report model load time (ns); feed real reloads to the scheduler
+    if data.get("load_duration"):
+        RUNTIME.scheduler.observe(config.name, config.num_ctx, data["load_duration"] / 1e9)
+    timing: TimingBreakdown | None = data.get("timing")
+    if timing is not None:
+        prev = RUNTIME.timings.get(config.name)
+        RUNTIME.timings[config.name] = timing if prev is None else prev + timing
+        spent = CASE_TIMING.get()
+        if spent is not None:
+            spent.append(timing)
     # Strip think tags from content
     content = data["choices"][0]["message"]["content"]
     data["choices"][0]["message"]["content"] = strip_think_tags(content)
     # Accumulate tokens
+    usage = data.get("usage", {})
     if counter is not None:
-        counter.add(data.get("usage", {}))
+        counter.add(usage, timing)
+    if RUNTIME.metrics is not None and elapsed is not None:
+        RUNTIME.metrics.record_request(
+            config.name, CURRENT_SUITE.get(), elapsed,
+            usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0),
+        )
     return data
 
 
+async def resident_model(client: httpx.AsyncClient) -> tuple[str, int] | None:
+    """Return the (model, num_ctx) Ollama currently has loaded, if it reports one."""
+    try:
+        resp = await client.get("/api/ps", timeout=5.0)
+        resp.raise_for_status()
+        loaded = resp.json().get("models") or []
+    except (httpx.HTTPError, ValueError):
+        return None
+    if not loaded or "context_length" not in loaded[0]:
+        return None
+    return loaded[0]["name"], loaded[0]["context_length"]
+
+
+async def chat_stream(
+    client: httpx.AsyncClient,
+    config: ModelConfig,
+    messages: list[dict[str, str]],
+    max_tokens: int = 256,
+    timeout: float = 60.0,
+    counter: TokenCounter | None = None,
+) -> tuple[dict[str, Any], dict[str, Any]]:
+    """Streaming variant of chat(): returns the parsed response and its stream metrics
+    (TTFT, inter-token latency percentiles/histogram, decode tok/s, stalls)."""
+    payload = build_payload(config, messages, max_tokens)
+    start = time.perf_counter()
+    try:
+        with span("request", cat="http", api=RUNTIME.api, stream=True):
+            if RUNTIME.api == "native":
+                data, timing = await stream_native_chat(client, payload, timeout)
+            else:
+                data, timing = await stream_chat_completion(client, payload, timeout)
+    except Exception as e:
+        request_failed(config, e)
+        raise
+    elapsed = time.perf_counter() - start
+    return finish_response(config, data, counter, elapsed), stream_metrics(timing)
+
+
 def extract_content(data: dict[str, Any]) -> str:
     """Pull the assistant message content from a chat response."""
     return data["choices"][0]["message"]["content"].strip()
@@ -241,21 +483,156 @@ def build_messages(
     return msgs
 
 
+async def run_cases(
+    suite: str,
+    cases: Iterable[Any],
+    fn: Callable[[Any], Awaitable[dict[str, Any]]],
+    report: Callable[[dict[str, Any]], None] | None = None,
+    serial: bool = False,
+    prefix: Callable[[Any], str] | None = None,
+    limit: int | None = None,
+    hold_slot: bool = True,
+) -> list[dict[str, Any]]:
+    """Run a suite's cases through the shared executor; records come back in case order.
+
+    ``report`` prints one case and is called in execution order. Timing-sensitive
+    suites pass ``serial=True`` so their measurements never overlap; ``limit``
+    overrides the suite's case concurrency (see SUITE_CONCURRENCY), and with
+    ``hold_slot=False`` a case holds no endpoint slot while it runs: ``fn`` takes
+    ``RUNTIME.executor.slot("pool")`` around its requests instead. Suites whose
+    prompts share long prefixes pass ``prefix`` (case -> prompt text); cases then
+    run in an order that lets each server slot reuse its KV cache (see
+    plan_prefix_order), unless --case-order given. With the native API
+    each record gains a ``timing`` split of its calls' wall time into overhead,
+    model load, prefill and decode.
+
+    Each finished record is appended to the run journal and fed to
+    RUNTIME.case_stats, and each case is counted in RUNTIME.metrics and
+    RUNTIME.progress (whose ETA uses the wall time of cases that ran); when
+    resuming, cases the journal already holds are replayed from it instead of
+    being re-run.
+    Graded records carry an ``input_hash``; with --incremental, a case whose hash
+    matches an earlier result reuses that record (re-graded if the grader changed).
+    """
+    journal, config, repeat = RUNTIME.journal, CURRENT_CONFIG.get(), CURRENT_REPEAT.get()
+    label = config.label if config else None
+    base = suite_fingerprint(suite, config) if config and suite in GRADERS else None
+
+    def journal_key(case: Any) -> str:
+        return case_key(suite, case) + (f"#{repeat}" if repeat else "")
+
+    def observe(record: dict[str, Any]) -> dict[str, Any]:
+        if RUNTIME.case_stats is not None and label is not None:
+            RUNTIME.case_stats.add((label, suite), metric_fields(record))
+        return record
+
+    @contextmanager
+    def in_flight() -> Iterator[None]:
+        # The case counts as in flight for the metrics endpoint and the progress view
+        with ExitStack() as stack:
+            if RUNTIME.metrics is not None:
+                stack.enter_context(RUNTIME.metrics.case(config.name if config else "", suite))
+            if RUNTIME.progress is not None and label is not None:
+                stack.enter_context(RUNTIME.progress.case(label, suite))
+            yield
+
+    async def timed(case: Any) -> dict[str, Any]:
+        # Each case gets a trace row of its own; its wait for a slot is an async span
+        with lane(), tagged(case=journal_key(case)):
+            tracer = current_tracer()
+            if tracer is not None:
+                tracer.add_async("queued", submitted, time.perf_counter())
+            with in_flight(), span("case"):
+                return await run_or_replay(case)
+
+    async def run_or_replay(case: Any) -> dict[str, Any]:
+        if journal is not None and label is not None:
+            done = journal.completed_case(label, suite, journal_key(case))
+            if done is not None:
+                return observe(done)
+        input_hash = fingerprint(base, case) if base else None
+        # Repeats exist to re-sample, so only the first may reuse an earlier record
+        record = await reuse_case(suite, case, input_hash) if input_hash and not repeat else None
+        if record is None:
+            record = await run_case(case)
+            if input_hash:
+                record["input_hash"] = input_hash
+        if journal is not None and label is not None:
+            with span("journal"):
+                journal.record_case(label, suite, journal_key(case), record)
+        return observe(record)
+
+    async def run_case(case: Any) -> dict[str, Any]:
+        RUNTIME.reuse["run"] += 1
+        token = CASE_TIMING.set([])
+        start = time.perf_counter()
+        try:
+            record = await fn(case)
+            spent = CASE_TIMING.get()
+        finally:
+            CASE_TIMING.reset(token)
+        if RUNTIME.progress is not None and label is not None:
+            RUNTIME.progress.observe(label, suite, time.perf_counter() - start)
+        if spent:
+            record["timing"] = sum(spent, TimingBreakdown()).as_dict()
+        return record
+
+    cases = list(cases)
+    if RUNTIME.progress is not None and label is not None:
+        RUNTIME.progress.plan_cases(label, suite, len(cases))
+    order = list(range(len(cases)))
+    if prefix is not None and cases:
+        slots = limit or SUITE_CONCURRENCY.get(suite) or RUNTIME.executor.suite_limit
+        plan = plan_prefix_order([prefix(c) for c in cases], 1 if serial else slots)
+        if RUNTIME.case_order == "prefix":
+            order = plan.order
+        else:  # report what the given order actually shares
+            plan = replace(plan, order=order, shared_chars=plan.naive_shared_chars)
+        if label is not None:
+            RUNTIME.prefix_plans[(label, suite)] = {"order": RUNTIME.case_order, **plan.as_dict()}
+    submitted = time.perf_counter()
+    records = await RUNTIME.executor.map(
+        [cases[i] for i in order],
+        timed,
+        endpoint="pool" if hold_slot else None,
+        limit=limit or SUITE_CONCURRENCY.get(suite),
+        serial=serial,
+        on_result=report,
+    )
+    in_case_order: list[dict[str, Any]] = [{}] * len(cases)
+    for i, record in zip(order, records):
+        in_case_order[i] = record
+    return in_case_order
+
+
+async def own_lane(awaitable: Awaitable[Any]) -> Any:
+    """Await on a trace row of its own: for calls one case makes concurrently."""
+    with lane():
+        return await awaitable
+
+
 # ---------------------------------------------------------------------------
 # Suite 1: Latency
 # ---------------------------------------------------------------------------
 
+# (label, prompt, max_tokens), timed one at a time
+LATENCY_PROMPTS = [
+    ("short", "Say hello.", 32),
+    ("medium", "Explain what a hash table is in two sentences.", 128),
+    ("long", "Write a detailed paragraph about the history of the internet.", 300),
+]
+
+
 async def run_latency_suite(
     client: httpx.AsyncClient, config: ModelConfig
 ) -> dict[str, Any]:
     print("\n=== Latency Test ===")
     counter = TokenCounter()
-    prompts = [
-        ("short", "Say hello.", 32),
-        ("medium", "Explain what a hash table is in two sentences.", 128),
-        ("long", "Write a detailed paragraph about the history of the internet.", 300),
-    ]
-    results: list[dict[str, Any]] = []
+
+    # Model load is measured by the lifecycle preload, so the ping below is warm
+    load = RUNTIME.lifecycle.load_for(config.name, config.num_ctx) if RUNTIME.lifecycle else None
+    if load is not None:
+        print(f"  Model load: {load.load_s:.3f}s (preloaded, {load.wall_s:.3f}s round trip)")
 
     # Cold start: first request after potential idle
     start = time.perf_counter()
@@ -263,32 +640,56 @@ async def run_latency_suite(
     msgs = build_messages(sys_prompt, "ping", config.system_style, "Reply with pong.")
     await chat(client, config, msgs, max_tokens=8, counter=counter)
     cold_start = time.perf_counter() - start
-    print(f"  Cold-start latency: {cold_start:.3f}s")
+    print(f"  {'First-request' if load else 'Cold-start'} latency: {cold_start:.3f}s")
 
-    for label, prompt, max_tok in prompts:
+    async def measure(item: tuple[str, str, int]) -> dict[str, Any]:
+        label, prompt, max_tok = item
         msgs = build_messages(None, prompt)
         start = time.perf_counter()
-        data = await chat(client, config, msgs, max_tokens=max_tok, counter=counter)
+        data, stream = await chat_stream(client, config, msgs, max_tokens=max_tok, counter=counter)
         elapsed = time.perf_counter() - start
         usage = data.get("usage", {})
         comp_tok = usage.get("completion_tokens", 0)
         prompt_tok = usage.get("prompt_tokens", 0)
         tps = (comp_tok / elapsed) if elapsed > 0 else 0
-        results.append({
+        return {
             "label": label,
             "total_time_s": round(elapsed, 3),
             "prompt_tokens": prompt_tok,
             "completion_tokens": comp_tok,
             "tokens_per_second": round(tps, 1),
-        })
-        print(f"  [{label}] {elapsed:.3f}s | {comp_tok} tokens | {tps:.1f} tok/s")
+            **stream,
+        }
+
+    def report(r: dict[str, Any]) -> None:
+        print(f"  [{r['label']}] {r['total_time_s']:.3f}s | {r['completion_tokens']} tokens "
+              f"| {r['tokens_per_second']:.1f} tok/s")
+        print(f"      TTFT {r['ttft_ms']}ms | ITL p50/p95/p99 {r.get('itl_p50_ms')}/"
+              f"{r.get('itl_p95_ms')}/{r.get('itl_p99_ms')}ms | decode {r['decode_tps']} tok/s "
+              f"| {r['stalls']} stall(s)")
+        if "timing" in r:
+            t = r["timing"]
+            print(f"      load {t['load_s']:.3f}s | prefill {t['prefill_s']:.3f}s "
+                  f"({t['tokens_per_second_prompt']} tok/s) | decode {t['decode_s']:.3f}s "
+                  f"| overhead {t['overhead_s']:.3f}s")
+
+    # Timed cases must not overlap, so latency always runs serially
+    results = await run_cases("latency", LATENCY_PROMPTS, measure, report, serial=True)
+    ttfts = [r["ttft_ms"] for r in results if r["ttft_ms"] is not None]
 
     return {
         "cold_start_s": round(cold_start, 3),
+        "model_load_s": round(load.load_s, 3) if load else None,
         "prompts": results,
         "avg_tps": round(
             sum(r["tokens_per_second"] for r in results) / len(results), 1
         ),
+        # Over the prompts whose stream had a first token; None if none did
+        "avg_ttft_ms": round(sum(ttfts) / len(ttfts), 1) if ttfts else None,
+        "avg_decode_tps": round(
+            sum(r["decode_tps"] for r in results) / len(results), 1
+        ),
+        "stalls": sum(r["stalls"] for r in results),
         **counter.as_dict(),
     }
 
@@ -330,16 +731,38 @@ INTENT_PROMPTS = [
 ]
 
 
+def grade_intent(p: dict[str, Any], raw: str) -> dict[str, Any]:
+    got = raw.lower()
+    return {
+        "text": p["text"],
+        "expected": p["expected"],
+        "got": got,
+        # Strict match: exact word
+        "strict": got.strip() == p["expected"],
+        # Loose match: expected appears as whole word (not substring of another word)
+        "loose": word_match(p["expected"], got),
+    }
+
+
+def summarize_intent(details: list[dict[str, Any]]) -> dict[str, Any]:
+    correct = sum(1 for d in details if d["loose"])
+    strict_count = sum(1 for d in details if d["strict"])
+    return {
+        "correct_loose": correct,
+        "correct_strict": strict_count,
+        "total": len(details),
+        "accuracy_percent": round(correct / len(details) * 100, 1),
+    }
+
+
 async def run_intent_suite(
     client: httpx.AsyncClient, config: ModelConfig
 ) -> dict[str, Any]:
     print("\n=== Intent Classification ===")
     counter = TokenCounter()
     sys_prompt = get_system_prompt("intent", config)
-    correct = 0
-    details: list[dict[str, Any]] = []
 
-    for p in INTENT_PROMPTS:
+    async def classify(p: dict[str, Any]) -> dict[str, Any]:
         user_content = p["text"]
         if config.system_style == "none":
             user_content = (
@@ -348,34 +771,119 @@ async def run_intent_suite(
             )
         msgs = build_messages(sys_prompt, user_content)
         data = await chat(client, config, msgs, max_tokens=16, counter=counter)
-        raw = extract_content(data).lower()
-        # Strict match: exact word
-        strict = raw.strip() == p["expected"]
-        # Loose match: expected appears as whole word (not substring of another word)
-        loose = word_match(p["expected"], raw)
-        matched = loose
-        if matched:
-            correct += 1
-        status = "OK" if matched else "MISS"
-        details.append({
-            "text": p["text"],
-            "expected": p["expected"],
-            "got": raw,
-            "strict": strict,
-            "loose": loose,
+        return grade_case("intent_classification", p, extract_content(data))
+
+    def report(d: dict[str, Any]) -> None:
+        status = "OK" if d["loose"] else "MISS"
+        print(f"  [{status}] \"{d['text'][:50]}\" -> \"{d['got']}\" (exp: {d['expected']})")
+
+    details = await run_cases(
+        "intent_classification", INTENT_PROMPTS, classify, report,
+        prefix=lambda p: (sys_prompt or "") + p["text"],
+    )
+    summary = summarize_intent(details)
+
+    total = summary["total"]
+    print(f"  Accuracy (loose): {summary['correct_loose']}/{total} "
+          f"({summary['accuracy_percent']:.1f}%)")
+    print(f"  Accuracy (strict): {summary['correct_strict']}/{total} "
+          f"({summary['correct_strict'] / total * 100:.1f}%)")
+    return {**summary, "cases": details, **counter.as_dict()}
+
+
+# ---------------------------------------------------------------------------
+# Suite 2b: Intent Throughput (opt-in)
+# ---------------------------------------------------------------------------
+
+INTENT_BATCH_SIZES = [1, 5, 10, 25]
+
+
+def parse_batch_labels(raw: str, n: int) -> list[str] | None:
+    """Labels from a batched reply: a JSON array, else "1. label" lines; None if neither."""
+    text = strip_markdown_fences(raw)
+    start, end = text.find("["), text.rfind("]")
+    if start != -1 and end > start:
+        try:
+            labels = json.loads(text[start:end + 1])
+        except json.JSONDecodeError:
+            labels = None
+        if isinstance(labels, list):
+            return [str(label) for label in labels][:n]
+    numbered = dict(re.findall(r"^\s*(\d+)[.):]\s*(.+?)\s*$", text, re.MULTILINE))
+    if not numbered:
+        return None
+    return [numbered.get(str(i + 1), "") for i in range(n)]
+
+
+def grade_intent_batch(batch: list[dict[str, Any]], raw: str) -> dict[str, Any]:
+    """Score each query of a batch on its own label, with the per-query intent grader."""
+    labels = parse_batch_labels(raw, len(batch))
+    got = (labels or []) + [""] * (len(batch) - len(labels or []))
+    return {
+        "parsed": labels is not None,
+        "cases": [grade_intent(p, label) for p, label in zip(batch, got)],
+        "raw_output": raw,
+    }
+
+
+def ascii_bar(value: float, top: float, width: int = 20) -> str:
+    return "#" * round(width * value / top) if top > 0 else ""
+
+
+async def run_intent_throughput_suite(
+    client: httpx.AsyncClient, config: ModelConfig
+) -> dict[str, Any]:
+    """Pack N intent queries into one request and sweep N: queries/sec vs accuracy."""
+    print("\n=== Intent Throughput ===")
+    counter = TokenCounter()
+    sys_prompt = get_system_prompt("intent_batch", config)
+
+    async def classify_batch(batch: list[dict[str, Any]]) -> dict[str, Any]:
+        queries = "\n".join(f"{i + 1}. {p['text']}" for i, p in enumerate(batch))
+        user_content = f"Queries:\n{queries}"
+        if config.system_style == "none":
+            user_content = (
+                "Classify each query into: search, tool_call, answer, escalate. "
+                "Reply with a JSON array of labels in order.\n\n" + user_content
+            )
+        msgs = build_messages(sys_prompt, user_content)
+        data = await chat(client, config, msgs, max_tokens=8 * len(batch) + 16, counter=counter)
+        return {"batch_size": len(batch), **grade_intent_batch(batch, extract_content(data))}
+
+    sweep = []
+    for n in RUNTIME.batch_sizes or INTENT_BATCH_SIZES:
+        batches = [INTENT_PROMPTS[i:i + n] for i in range(0, len(INTENT_PROMPTS), n)]
+        start = time.perf_counter()
+        records = await run_cases("intent_throughput", batches, classify_batch)
+        elapsed = time.perf_counter() - start
+        graded = [c for r in records for c in r["cases"]]
+        correct = sum(1 for c in graded if c["loose"])
+        sweep.append({
+            "batch_size": n,
+            "requests": len(batches),
+            "queries": len(graded),
+            "elapsed_s": round(elapsed, 3),
+            "queries_per_s": round(len(graded) / elapsed, 2) if elapsed > 0 else 0.0,
+            "correct_loose": correct,
+            "correct_strict": sum(1 for c in graded if c["strict"]),
+            "accuracy_percent": round(correct / len(graded) * 100, 1),
+            "parse_failures": sum(1 for r in records if not r["parsed"]),
+            "batches": records,
         })
-        print(f"  [{status}] \"{p['text'][:50]}\" -> \"{raw}\" (exp: {p['expected']})")
 
-    acc = correct / len(INTENT_PROMPTS) * 100
-    strict_count = sum(1 for d in details if d["strict"])
-    print(f"  Accuracy (loose): {correct}/{len(INTENT_PROMPTS)} ({acc:.1f}%)")
-    print(f"  Accuracy (strict): {strict_count}/{len(INTENT_PROMPTS)} "
-          f"({strict_count / len(INTENT_PROMPTS) * 100:.1f}%)")
+    top_qps = max(s["queries_per_s"] for s in sweep)
+    print(f"  {'N':>4}  {'queries/s':>9}  {'':20}  {'accuracy':>8}")
+    for s in sweep:
+        print(f"  {s['batch_size']:>4}  {s['queries_per_s']:>9.2f}  "
+              f"{ascii_bar(s['queries_per_s'], top_qps):20}  {s['accuracy_percent']:>7.1f}%  "
+              f"{ascii_bar(s['accuracy_percent'], 100, 10):10}"
+              f"{'  (' + str(s['parse_failures']) + ' unparsed)' if s['parse_failures'] else ''}")
+    best = max(sweep, key=lambda s: s["queries_per_s"])
     return {
-        "correct_loose": correct,
-        "correct_strict": strict_count,
-        "total": len(INTENT_PROMPTS),
-        "accuracy_percent": round(acc, 1),
+        "sweep": sweep,
+        "best_batch_size": best["batch_size"],
+        "best_queries_per_s": best["queries_per_s"],
+        "best_accuracy_percent": best["accuracy_percent"],
         **counter.as_dict(),
     }
 
@@ -454,47 +962,61 @@ JSON_PROMPTS = [
 ]
 
 
+def grade_json(jp: dict[str, Any], raw: str) -> dict[str, Any]:
+    content = strip_markdown_fences(raw)
+    record = {"prompt": jp["prompt"], "content": content, "valid": False, "struct": False}
+    try:
+        parsed = json.loads(content)
+        record["valid"] = True
+        record["struct"] = bool(jp["validate"](parsed))
+        record["status"] = "VALID+STRUCT" if record["struct"] else "VALID"
+    except (json.JSONDecodeError, Exception):
+        record["status"] = "INVALID"
+    return record
+
+
+def summarize_json(records: list[dict[str, Any]]) -> dict[str, Any]:
+    valid_count = sum(1 for r in records if r["valid"])
+    struct_valid = sum(1 for r in records if r["struct"])
+    total = len(records)
+    return {
+        "valid": valid_count,
+        "structurally_correct": struct_valid,
+        "total": total,
+        "json_validity_percent": round(valid_count / total * 100, 1),
+        "structural_accuracy_percent": round(struct_valid / total * 100, 1),
+    }
+
+
 async def run_json_suite(
     client: httpx.AsyncClient, config: ModelConfig
 ) -> dict[str, Any]:
     print("\n=== JSON Schema Conformance ===")
     counter = TokenCounter()
     sys_prompt = get_system_prompt("json", config)
-    valid_count = 0
-    struct_valid = 0
 
-    for jp in JSON_PROMPTS:
+    async def check(jp: dict[str, Any]) -> dict[str, Any]:
         prompt_text = jp["prompt"]
         if config.system_style == "none":
             prompt_text = "Reply with ONLY valid JSON, no explanation.\n\n" + prompt_text
         msgs = build_messages(sys_prompt, prompt_text)
         data = await chat(client, config, msgs, max_tokens=300, counter=counter)
-        content = strip_markdown_fences(extract_content(data))
-        try:
-            parsed = json.loads(content)
-            valid_count += 1
-            if jp["validate"](parsed):
-                struct_valid += 1
-                print(f"  [VALID+STRUCT] {prompt_text[:55]}...")
-            else:
-                print(f"  [VALID]        {prompt_text[:55]}...")
-        except (json.JSONDecodeError, Exception):
-            print(f"  [INVALID]      {prompt_text[:55]}...")
-            print(f"                 Got: {content[:120]}")
-
-    total = len(JSON_PROMPTS)
-    pct_valid = valid_count / total * 100
-    pct_struct = struct_valid / total * 100
-    print(f"  Valid JSON: {valid_count}/{total} ({pct_valid:.1f}%)")
-    print(f"  Structurally correct: {struct_valid}/{total} ({pct_struct:.1f}%)")
-    return {
-        "valid": valid_count,
-        "structurally_correct": struct_valid,
-        "total": total,
-        "json_validity_percent": round(pct_valid, 1),
-        "structural_accuracy_percent": round(pct_struct, 1),
-        **counter.as_dict(),
-    }
+        return grade_case("json_conformance", jp, extract_content(data))
+
+    def report(r: dict[str, Any]) -> None:
+        print(f"  [{r['status']}]".ljust(17) + f"{r['prompt'][:55]}...")
+        if r["status"] == "INVALID":
+            print(f"                 Got: {r['content'][:120]}")
+
+    records = await run_cases("json_conformance", JSON_PROMPTS, check, report)
+    summary = summarize_json(records)
+
+    total = summary["total"]
+    print(f"  Valid JSON: {summary['valid']}/{total} "
+          f"({summary['json_validity_percent']:.1f}%)")
+    print(f"  Structurally correct: {summary['structurally_correct']}/{total} "
+          f"({summary['structural_accuracy_percent']:.1f}%)")
+    return {**summary, "cases": records, **counter.as_dict()}
 
 
 # ---------------------------------------------------------------------------
@@ -543,14 +1065,32 @@ def build_haystack(needle: str, position_frac: float, num_ctx: int) -> str:
     return " ".join(final)
 
 
+NEEDLE_CASES = [(n, label, frac) for n in NEEDLES for label, frac in NEEDLE_POSITIONS]
+
+
+def grade_needle(case: tuple[dict[str, str], str, float], raw: str) -> dict[str, Any]:
+    needle_info, pos_label, _ = case
+    return {
+        "needle": needle_info["fact"],
+        "position": pos_label,
+        "found": needle_info["answer"].lower() in raw.lower(),
+    }
+
+
+def summarize_needle(details: list[dict[str, Any]]) -> dict[str, Any]:
+    recalled = sum(1 for d in details if d["found"])
+    return {
+        "recalled": recalled,
+        "total": len(details),
+        "recall_percent": round(recalled / len(details) * 100, 1),
+    }
+
+
 async def run_needle_suite(
     client: httpx.AsyncClient, config: ModelConfig
 ) -> dict[str, Any]:
     print("\n=== Needle in Haystack ===")
     counter = TokenCounter()
-    recalled = 0
-    total = 0
-    details: list[dict[str, Any]] = []
 
     # Store each haystack text once (at middle position) for the log
     haystacks = [
@@ -563,34 +1103,31 @@ async def run_needle_suite(
         for n in NEEDLES
     ]
 
-    for needle_info in NEEDLES:
-        for pos_label, pos_frac in NEEDLE_POSITIONS:
-            total += 1
-            haystack = build_haystack(needle_info["fact"], pos_frac, config.num_ctx)
-            msgs: list[dict[str, str]] = [
-                {"role": "system", "content": haystack},
-                {"role": "user", "content": needle_info["query"]},
-            ]
-            data = await chat(client, config, msgs, max_tokens=64, counter=counter)
-            answer = extract_content(data).lower()
-            found = needle_info["answer"].lower() in answer
-            if found:
-                recalled += 1
-            status = "OK" if found else "MISS"
-            details.append({
-                "needle": needle_info["fact"],
-                "position": pos_label,
-                "found": found,
-            })
-            print(f"  [{status}] needle@{pos_label}: {needle_info['fact'][:40]}...")
-
-    pct = recalled / total * 100
-    print(f"  Recalled: {recalled}/{total} ({pct:.1f}%)")
+    async def probe(case: tuple[dict[str, str], str, float]) -> dict[str, Any]:
+        needle_info, pos_label, pos_frac = case
+        haystack = build_haystack(needle_info["fact"], pos_frac, config.num_ctx)
+        msgs: list[dict[str, str]] = [
+            {"role": "system", "content": haystack},
+            {"role": "user", "content": needle_info["query"]},
+        ]
+        data = await chat(client, config, msgs, max_tokens=64, counter=counter)
+        return grade_case("needle_in_haystack", case, extract_content(data))
+
+    def report(d: dict[str, Any]) -> None:
+        status = "OK" if d["found"] else "MISS"
+        print(f"  [{status}] needle@{d['position']}: {d['needle'][:40]}...")
+
+    details = await run_cases(
+        "needle_in_haystack", NEEDLE_CASES, probe, report,
+        prefix=lambda c: build_haystack(c[0]["fact"], c[2], config.num_ctx) + c[0]["query"],
+    )
+    summary = summarize_needle(details)
+
+    print(f"  Recalled: {summary['recalled']}/{summary['total']} "
+          f"({summary['recall_percent']:.1f}%)")
     return {
         "haystacks": haystacks,
-        "recalled": recalled,
-        "total": total,
-        "recall_percent": round(pct, 1),
+        **summary,
         "details": details,
         **counter.as_dict(),
     }
@@ -636,63 +1173,162 @@ CODE_PROMPTS = [
 ]
 
 
+def grade_code(
+    cp: dict[str, str], raw: str, execution: ExecResult | None = None
+) -> dict[str, Any]:
+    """Run the generated code in the sandbox and compare its output.
+
+    ``execution`` is the snippet's result when the caller already ran it on the
+    warm pool (RUNTIME.sandbox); otherwise it is run here, blocking for up to 15s.
+    """
+    if execution is None:
+        execution = run_python(strip_markdown_fences(raw), Limits(timeout_s=15))
+    record: dict[str, Any] = {
+        "prompt": cp["prompt"], "expected_output": cp["expected_output"], "ran": False,
+        "exec_s": execution.duration_s,
+    }
+    if execution.timed_out:
+        record["status"] = "TIMEOUT"
+    elif execution.returncode == 0:
+        record["ran"] = True
+        stdout = execution.stdout
+        record["stdout"] = stdout
+        # Check each output line for an exact match to avoid
+        # partial number matches (e.g. "5" in "15")
+        stdout_lines = [l.strip() for l in stdout.split("\n") if l.strip()]
+        if cp["expected_output"] in stdout_lines or cp["expected_output"] == stdout:
+            record["status"] = "PASS"
+        else:
+            record["status"] = "RUN_OK"
+    else:
+        record["status"] = "FAIL"
+        record["stderr"] = execution.stderr
+    return record
+
+
+def summarize_code(records: list[dict[str, Any]]) -> dict[str, Any]:
+    """Scores of each case's first sample, plus mean pass@k when cases were sampled n times."""
+    run_success = sum(1 for r in records if r["ran"])
+    output_correct = sum(1 for r in records if r["status"] == "PASS")
+    total = len(records)
+    summary: dict[str, Any] = {
+        "run_success": run_success,
+        "output_correct": output_correct,
+        "total": total,
+        "run_percent": round(run_success / total * 100, 1),
+        "correctness_percent": round(output_correct / total * 100, 1),
+    }
+    if records and all("samples" in r for r in records):
+        counts = [(len(r["samples"]), r["passed"]) for r in records]
+        ks = set.intersection(*(set(map(int, r["pass_at_k"])) for r in records))
+        summary["pass_at_k"] = {
+            str(k): round(v * 100, 1) for k, v in mean_pass_at_k(counts, ks).items()
+        }
+        summary["samples"] = sum(n for n, _ in counts)
+        summary["unique_programs"] = sum(r["unique_programs"] for r in records)
+    return summary
+
+
 async def run_code_suite(
     client: httpx.AsyncClient, config: ModelConfig
 ) -> dict[str, Any]:
-    print("\n=== Code Generation ===")
+    n = RUNTIME.code_samples
+    print("\n=== Code Generation ===" + (f" (pass@k, n={n})" if n > 1 else ""))
     counter = TokenCounter()
     sys_prompt = get_system_prompt("code", config)
-    run_success = 0
-    output_correct = 0
+    sandbox = RUNTIME.sandbox
+    # Only generation counts against the suite's concurrency: a case whose code is
+    # executing has released its slot, so the next case is already generating.
+    # A case's n samples are requested together, up to the endpoints' capacity.
+    generating = asyncio.Semaphore(
+        max(RUNTIME.executor.suite_limit, RUNTIME.executor.endpoint_limit if n > 1 else 1)
+    )
+
+    sampled: list[tuple[float, float]] = []  # (start, end) of each case sampled in this run
 
-    for cp in CODE_PROMPTS:
+    async def execute(code: str) -> ExecResult:
+        with span("execute", sandbox=sandbox is not None):
+            if sandbox is not None:
+                result = await sandbox.run(code)
+            else:
+                # Off the event loop so other cases keep generating while this one runs
+                result = await asyncio.to_thread(run_python, code, Limits(timeout_s=15))
+        if result.timed_out and not result.cached and RUNTIME.metrics is not None:
+            RUNTIME.metrics.code_timeouts.inc()
+        return result
+
+    async def generate(msgs: list[dict[str, str]]) -> str:
+        # The request slot is held only while generating, never while code executes
+        async with generating, RUNTIME.executor.slot("pool"):
+            data = await chat(client, config, msgs, max_tokens=512, counter=counter)
+        return extract_content(data)
+
+    async def generate_and_run(cp: dict[str, str]) -> dict[str, Any]:
         prompt_text = cp["prompt"]
         if config.system_style == "none":
             prompt_text = "Reply with ONLY executable Python code, no explanation.\n\n" + prompt_text
         msgs = build_messages(sys_prompt, prompt_text)
-        data = await chat(client, config, msgs, max_tokens=512, counter=counter)
-        code = strip_markdown_fences(extract_content(data))
-
-        tmp = Path(tempfile.mktemp(suffix=".py"))
-        tmp.write_text(code, encoding="utf-8")
-        try:
-            proc = subprocess.run(
-                ["python", str(tmp)],
-                capture_output=True, text=True, timeout=15,
-            )
-            if proc.returncode == 0:
-                run_success += 1
-                stdout = proc.stdout.strip()
-                # Check each output line for an exact match to avoid
-                # partial number matches (e.g. "5" in "15")
-                stdout_lines = [l.strip() for l in stdout.split("\n") if l.strip()]
-                if cp["expected_output"] in stdout_lines or cp["expected_output"] == stdout:
-                    output_correct += 1
-                    print(f"  [PASS] {cp['prompt'][:55]}...")
-                else:
-                    print(f"  [RUN_OK] {cp['prompt'][:55]}...")
-                    print(f"           Expected '{cp['expected_output']}', got '{stdout[:80]}'")
-            else:
-                print(f"  [FAIL] {cp['prompt'][:55]}...")
-                print(f"         Error: {proc.stderr.strip()[:120]}")
-        except subprocess.TimeoutExpired:
-            print(f"  [TIMEOUT] {cp['prompt'][:55]}...")
-        finally:
-            tmp.unlink(missing_ok=True)
+        if n == 1:
+            raw = await generate(msgs)
+            execution = await execute(strip_markdown_fences(raw))
+            return grade_case("code_generation", cp, raw, execution=execution)
+
+        started = time.perf_counter()
+        raws = await asyncio.gather(*(own_lane(generate(msgs)) for _ in range(n)))
+        # Identical programs (common at low temperature) are executed once
+        programs = [strip_markdown_fences(raw).strip() for raw in raws]
+        unique = list(dict.fromkeys(programs))
+        executions = dict(zip(
+            unique, await asyncio.gather(*(own_lane(execute(p)) for p in unique))
+        ))
+        samples = [
+            grade_case("code_generation", cp, raw, execution=executions[program])
+            for raw, program in zip(raws, programs)
+        ]
+        passed = sum(smp["status"] == "PASS" for smp in samples)
+        ks = [k for k in RUNTIME.pass_k if k <= n]
+        sampled.append((started, time.perf_counter()))
+        return {
+            **samples[0],
+            "samples": [
+                {k: v for k, v in smp.items() if k not in ("prompt", "expected_output")}
+                for smp in samples
+            ],
+            "passed": passed,
+            "unique_programs": len(unique),
+            "pass_at_k": {str(k): round(pass_at_k(n, passed, k), 4) for k in ks},
+        }
 
-    total = len(CODE_PROMPTS)
-    pct_run = run_success / total * 100
-    pct_correct = output_correct / total * 100
-    print(f"  Runs OK: {run_success}/{total} ({pct_run:.1f}%)")
-    print(f"  Output correct: {output_correct}/{total} ({pct_correct:.1f}%)")
-    return {
-        "run_success": run_success,
-        "output_correct": output_correct,
-        "total": total,
-        "run_percent": round(pct_run, 1),
-        "correctness_percent": round(pct_correct, 1),
-        **counter.as_dict(),
-    }
+    def report(r: dict[str, Any]) -> None:
+        if "samples" in r:
+            print(f"  [{r['passed']}/{n} PASS] {r['prompt'][:55]}... "
+                  f"({r['unique_programs']} distinct)")
+            return
+        print(f"  [{r['status']}] {r['prompt'][:55]}...")
+        if r["status"] == "RUN_OK":
+            print(f"           Expected '{r['expected_output']}', got '{r['stdout'][:80]}'")
+        elif r["status"] == "FAIL":
+            print(f"         Error: {r['stderr'][:120]}")
+
+    limit = RUNTIME.executor.suite_limit + (sandbox.size if sandbox else 0)
+    records = await run_cases(
+        "code_generation", CODE_PROMPTS, generate_and_run, report, limit=limit, hold_slot=False
+    )
+    summary = summarize_code(records)
+
+    total = summary["total"]
+    if "pass_at_k" in summary:
+        print("  " + ", ".join(f"pass@{k}: {v:.1f}%" for k, v in summary["pass_at_k"].items()))
+        # Throughput of the samples drawn here, not those replayed or reused
+        ran = len(sampled) * n
+        elapsed = max(e for _, e in sampled) - min(s for s, _ in sampled) if sampled else 0.0
+        summary["samples_per_s"] = round(ran / elapsed, 2) if elapsed else None
+        print(f"  {summary['samples']} samples ({summary['unique_programs']} distinct programs); "
+              f"{ran} drawn in {elapsed:.1f}s: {summary['samples_per_s']} samples/s")
+    print(f"  Runs OK: {summary['run_success']}/{total} ({summary['run_percent']:.1f}%)")
+    print(f"  Output correct: {summary['output_correct']}/{total} "
+          f"({summary['correctness_percent']:.1f}%)")
+    return {**summary, "cases": records, **counter.as_dict()}
 
 
 # ---------------------------------------------------------------------------
@@ -724,6 +1360,34 @@ FUNCTION_SELECTION_CASES = [
 ]
 
 
+def grade_function_selection(case: dict[str, str], raw: str) -> dict[str, Any]:
+    got = raw.lower().strip()
+    expected = case["expected"].lower()
+    return {
+        "query": case["query"],
+        "expected": expected,
+        "got": got,
+        "matched": got == expected or word_match(expected, got),
+    }
+
+
+def summarize_accuracy(key: str) -> Callable[[list[dict[str, Any]]], dict[str, Any]]:
+    """Summary for suites scored as the share of records whose ``key`` is truthy."""
+
+    def summarize(records: list[dict[str, Any]]) -> dict[str, Any]:
+        correct = sum(1 for r in records if r[key])
+        return {
+            "correct": correct,
+            "total": len(records),
+            "accuracy_percent": round(correct / len(records) * 100, 1),
+        }
+
+    return summarize
+
+
+summarize_function_selection = summarize_accuracy("matched")
+
+
 async def run_function_selection_suite(
     client: httpx.AsyncClient, config: ModelConfig
 ) -> dict[str, Any]:
@@ -731,9 +1395,8 @@ async def run_function_selection_suite(
     counter = TokenCounter()
     sys_prompt = get_system_prompt("function", config)
     tools_list = ", ".join(AVAILABLE_TOOLS)
-    correct = 0
 
-    for case in FUNCTION_SELECTION_CASES:
+    async def select(case: dict[str, str]) -> dict[str, Any]:
         user_text = f"Available tools: [{tools_list}]\n\nUser query: {case['query']}"
         if config.system_style == "none":
             user_text = (
@@ -742,23 +1405,18 @@ async def run_function_selection_suite(
             )
         msgs = build_messages(sys_prompt, user_text)
         data = await chat(client, config, msgs, max_tokens=32, counter=counter)
-        raw = extract_content(data).lower().strip()
-        expected = case["expected"].lower()
-        matched = raw == expected or word_match(expected, raw)
-        if matched:
-            correct += 1
-        status = "OK" if matched else "MISS"
-        print(f"  [{status}] \"{case['query'][:45]}\" -> \"{raw}\" (exp: {expected})")
-
-    total = len(FUNCTION_SELECTION_CASES)
-    pct = correct / total * 100
-    print(f"  Accuracy: {correct}/{total} ({pct:.1f}%)")
-    return {
-        "correct": correct,
-        "total": total,
-        "accuracy_percent": round(pct, 1),
-        **counter.as_dict(),
-    }
+        return grade_case("function_selection", case, extract_content(data))
+
+    def report(r: dict[str, Any]) -> None:
+        status = "OK" if r["matched"] else "MISS"
+        print(f"  [{status}] \"{r['query'][:45]}\" -> \"{r['got']}\" (exp: {r['expected']})")
+
+    records = await run_cases("function_selection", FUNCTION_SELECTION_CASES, select, report)
+    summary = summarize_function_selection(records)
+
+    print(f"  Accuracy: {summary['correct']}/{summary['total']} "
+          f"({summary['accuracy_percent']:.1f}%)")
+    return {**summary, "cases": records, **counter.as_dict()}
 
 
 # ---------------------------------------------------------------------------
@@ -809,15 +1467,41 @@ ARGUMENT_CASES = [
 ]
 
 
+def grade_argument(case: dict[str, Any], raw_output: str) -> dict[str, Any]:
+    raw = strip_markdown_fences(raw_output)
+    record: dict[str, Any] = {"query": case["query"], "expected": case["expected"], "raw": raw}
+    try:
+        parsed = json.loads(raw)
+        # Check that all expected keys are present with correct values
+        all_match = True
+        for key, val in case["expected"].items():
+            got = parsed.get(key)
+            if isinstance(val, float):
+                all_match = all_match and isinstance(got, (int, float)) and abs(got - val) < 0.01
+            elif isinstance(val, int):
+                all_match = all_match and got == val
+            else:
+                all_match = all_match and isinstance(got, str) and val.lower() in got.lower()
+        record["parsed"] = parsed
+        record["status"] = "OK" if all_match else "MISS"
+        record["ok"] = all_match
+    except (json.JSONDecodeError, Exception):
+        record["status"] = "FAIL"
+        record["ok"] = False
+    return record
+
+
+summarize_argument = summarize_accuracy("ok")
+
+
 async def run_argument_suite(
     client: httpx.AsyncClient, config: ModelConfig
 ) -> dict[str, Any]:
     print("\n=== Argument Accuracy ===")
     counter = TokenCounter()
     sys_prompt = get_system_prompt("argument", config)
-    correct = 0
 
-    for case in ARGUMENT_CASES:
+    async def extract(case: dict[str, Any]) -> dict[str, Any]:
         user_text = f"Tool signature: {case['tool']}\n\nUser query: {case['query']}"
         if config.system_style == "none":
             user_text = (
@@ -826,85 +1510,88 @@ async def run_argument_suite(
             )
         msgs = build_messages(sys_prompt, user_text)
         data = await chat(client, config, msgs, max_tokens=200, counter=counter)
-        raw = strip_markdown_fences(extract_content(data))
-        try:
-            parsed = json.loads(raw)
-            # Check that all expected keys are present with correct values
-            all_match = True
-            for key, val in case["expected"].items():
-                got = parsed.get(key)
-                if isinstance(val, float):
-                    all_match = all_match and isinstance(got, (int, float)) and abs(got - val) < 0.01
-                elif isinstance(val, int):
-                    all_match = all_match and got == val
-                else:
-                    all_match = all_match and isinstance(got, str) and val.lower() in got.lower()
-            if all_match:
-                correct += 1
-                print(f"  [OK] {case['query'][:55]}...")
-            else:
-                print(f"  [MISS] {case['query'][:55]}...")
-                print(f"         Expected: {case['expected']}")
-                print(f"         Got:      {parsed}")
-        except (json.JSONDecodeError, Exception):
-            print(f"  [FAIL] {case['query'][:55]}...")
-            print(f"         Raw: {raw[:120]}")
-
-    total = len(ARGUMENT_CASES)
-    pct = correct / total * 100
-    print(f"  Accuracy: {correct}/{total} ({pct:.1f}%)")
-    return {
-        "correct": correct,
-        "total": total,
-        "accuracy_percent": round(pct, 1),
-        **counter.as_dict(),
-    }
+        return grade_case("argument_accuracy", case, extract_content(data))
+
+    def report(r: dict[str, Any]) -> None:
+        print(f"  [{r['status']}] {r['query'][:55]}...")
+        if r["status"] == "MISS":
+            print(f"         Expected: {r['expected']}")
+            print(f"         Got:      {r['parsed']}")
+        elif r["status"] == "FAIL":
+            print(f"         Raw: {r['raw'][:120]}")
+
+    records = await run_cases("argument_accuracy", ARGUMENT_CASES, extract, report)
+    summary = summarize_argument(records)
+
+    print(f"  Accuracy: {summary['correct']}/{summary['total']} "
+          f"({summary['accuracy_percent']:.1f}%)")
+    return {**summary, "cases": records, **counter.as_dict()}
 
 
 # ---------------------------------------------------------------------------
 # Suite 8: Context Scaling
 # ---------------------------------------------------------------------------
 
+SCALING_CHECKPOINTS = [0.25, 0.50, 0.75, 1.00]
+SCALING_SECRET = "The project codename is FALCON-ECHO-42."
+SCALING_QUERY = "What is the project codename?"
+SCALING_ANSWER = "falcon-echo-42"
+
+
+def grade_context_scaling(frac: float, raw: str) -> dict[str, Any]:
+    return {"fraction": frac, "recalled": SCALING_ANSWER in raw.lower()}
+
+
+def summarize_context_scaling(results: list[dict[str, Any]]) -> dict[str, Any]:
+    recalled = sum(1 for r in results if r["recalled"])
+    return {
+        "recalled": recalled,
+        "total": len(results),
+        "recall_percent": round(recalled / len(results) * 100, 1),
+    }
+
+
 async def run_context_scaling_suite(
     client: httpx.AsyncClient, config: ModelConfig
 ) -> dict[str, Any]:
     print("\n=== Context Scaling ===")
     counter = TokenCounter()
-    checkpoints = [0.25, 0.50, 0.75, 1.00]
-    secret = "The project codename is FALCON-ECHO-42."
-    query = "What is the project codename?"
-    answer_key = "falcon-echo-42"
-    results: list[dict[str, Any]] = []
 
-    for frac in checkpoints:
+    async def probe(frac: float) -> dict[str, Any]:
         target_ctx = int(config.num_ctx * frac)
-        haystack = build_haystack(secret, 0.5, target_ctx)
+        haystack = build_haystack(SCALING_SECRET, 0.5, target_ctx)
         msgs: list[dict[str, str]] = [
             {"role": "system", "content": haystack},
-            {"role": "user", "content": query},
+            {"role": "user", "content": SCALING_QUERY},
         ]
         try:
             data = await chat(client, config, msgs, max_tokens=64, timeout=120.0, counter=counter)
-            content = extract_content(data).lower()
-            found = answer_key in content
-            status = "OK" if found else "MISS"
-            results.append({"fraction": frac, "ctx_tokens": target_ctx, "recalled": found})
-            print(f"  [{status}] {int(frac*100)}% of num_ctx ({target_ctx} tokens)")
+            return {
+                "ctx_tokens": target_ctx,
+                **grade_case("context_scaling", frac, extract_content(data)),
+            }
         except Exception as e:
-            results.append({"fraction": frac, "ctx_tokens": target_ctx, "recalled": False, "error": str(e)})
-            print(f"  [ERR] {int(frac*100)}% of num_ctx ({target_ctx} tokens): {e}")
+            return {
+                "case_id": GRADERS["context_scaling"].case_id(frac),
+                "fraction": frac, "ctx_tokens": target_ctx, "recalled": False, "error": str(e),
+            }
 
-    recalled = sum(1 for r in results if r["recalled"])
-    total = len(results)
-    pct = recalled / total * 100
-    print(f"  Recalled: {recalled}/{total} ({pct:.1f}%)")
-    return {
-        "recalled": recalled,
-        "total": total,
-        "recall_percent": round(pct, 1),
-        "checkpoints": results,
-        **counter.as_dict(),
-    }
+    def report(r: dict[str, Any]) -> None:
+        label = f"{int(r['fraction']*100)}% of num_ctx ({r['ctx_tokens']} tokens)"
+        if "error" in r:
+            print(f"  [ERR] {label}: {r['error']}")
+        else:
+            print(f"  [{'OK' if r['recalled'] else 'MISS'}] {label}")
+
+    results = await run_cases(
+        "context_scaling", SCALING_CHECKPOINTS, probe, report,
+        prefix=lambda f: build_haystack(SCALING_SECRET, 0.5, int(config.num_ctx * f)),
+    )
+    summary = summarize_context_scaling(results)
+
+    print(f"  Recalled: {summary['recalled']}/{summary['total']} "
+          f"({summary['recall_percent']:.1f}%)")
+    return {**summary, "checkpoints": results, **counter.as_dict()}
 
 
 # ---------------------------------------------------------------------------
@@ -933,46 +1620,54 @@ REASONING_PROBLEMS = [
 ]
 
 
+def grade_reasoning(prob: dict[str, str], raw_output: str) -> dict[str, Any]:
+    raw = raw_output.lower()
+    # Try to extract answer after "ANSWER:" prefix, fall back to last line
+    answer_match = re.search(r"answer:\s*(.+)", raw)
+    if answer_match:
+        check_text = answer_match.group(1).strip()
+    else:
+        # Use last non-empty line as the answer (avoid matching reasoning text)
+        lines = [l.strip() for l in raw.strip().split("\n") if l.strip()]
+        check_text = lines[-1] if lines else raw
+    expected = prob["answer"].lower()
+    return {
+        "question": prob["question"],
+        "expected": expected,
+        "found": word_match(expected, check_text),
+        "short_answer": check_text[:60] if answer_match else raw[-60:],
+    }
+
+
+summarize_reasoning = summarize_accuracy("found")
+
+
 async def run_reasoning_suite(
     client: httpx.AsyncClient, config: ModelConfig
 ) -> dict[str, Any]:
     print("\n=== Reasoning / Math ===")
     counter = TokenCounter()
     sys_prompt = get_system_prompt("reasoning", config)
-    correct = 0
 
-    for prob in REASONING_PROBLEMS:
+    async def solve(prob: dict[str, str]) -> dict[str, Any]:
         user_text = prob["question"]
         if config.system_style == "none":
             user_text = "Solve and give the final answer after 'ANSWER: '.\n\n" + user_text
         msgs = build_messages(sys_prompt, user_text)
         data = await chat(client, config, msgs, max_tokens=300, counter=counter)
-        raw = extract_content(data).lower()
-        # Try to extract answer after "ANSWER:" prefix, fall back to last line
-        answer_match = re.search(r"answer:\s*(.+)", raw)
-        if answer_match:
-            check_text = answer_match.group(1).strip()
-        else:
-            # Use last non-empty line as the answer (avoid matching reasoning text)
-            lines = [l.strip() for l in raw.strip().split("\n") if l.strip()]
-            check_text = lines[-1] if lines else raw
-        expected = prob["answer"].lower()
-        found = word_match(expected, check_text)
-        if found:
-            correct += 1
-        status = "OK" if found else "MISS"
-        short_answer = check_text[:60] if answer_match else raw[-60:]
-        print(f"  [{status}] \"{prob['question'][:45]}\" -> \"{short_answer}\" (exp: {expected})")
-
-    total = len(REASONING_PROBLEMS)
-    pct = correct / total * 100
-    print(f"  Accuracy: {correct}/{total} ({pct:.1f}%)")
-    return {
-        "correct": correct,
-        "total": total,
-        "accuracy_percent": round(pct, 1),
-        **counter.as_dict(),
-    }
+        return grade_case("reasoning_math", prob, extract_content(data))
+
+    def report(r: dict[str, Any]) -> None:
+        status = "OK" if r["found"] else "MISS"
+        print(f"  [{status}] \"{r['question'][:45]}\" -> \"{r['short_answer']}\" "
+              f"(exp: {r['expected']})")
+
+    records = await run_cases("reasoning_math", REASONING_PROBLEMS, solve, report)
+    summary = summarize_reasoning(records)
+
+    print(f"  Accuracy: {summary['correct']}/{summary['total']} "
+          f"({summary['accuracy_percent']:.1f}%)")
+    return {**summary, "cases": records, **counter.as_dict()}
 
 
 # ---------------------------------------------------------------------------
@@ -1033,36 +1728,39 @@ INSTRUCTION_CASES = [
 ]
 
 
+def grade_validated(case: dict[str, Any], raw: str) -> dict[str, Any]:
+    """Grade with the case's own ``validate`` callable (instruction and multi-turn suites)."""
+    return {"desc": case["desc"], "got": raw, "passed": bool(case["validate"](raw))}
+
+
+summarize_validated = summarize_accuracy("passed")
+
+
 async def run_instruction_suite(
     client: httpx.AsyncClient, config: ModelConfig
 ) -> dict[str, Any]:
     print("\n=== Instruction Following ===")
     counter = TokenCounter()
     sys_prompt = get_system_prompt("instruction", config)
-    correct = 0
 
-    for case in INSTRUCTION_CASES:
+    async def follow(case: dict[str, Any]) -> dict[str, Any]:
         user_text = case["instruction"]
         if config.system_style == "none":
             user_text = "Follow these instructions exactly.\n\n" + user_text
         msgs = build_messages(sys_prompt, user_text)
         data = await chat(client, config, msgs, max_tokens=128, counter=counter)
-        raw = extract_content(data)
-        passed = case["validate"](raw)
-        if passed:
-            correct += 1
-        status = "PASS" if passed else "FAIL"
-        print(f"  [{status}] {case['desc']}: \"{raw[:60]}\"")
-
-    total = len(INSTRUCTION_CASES)
-    pct = correct / total * 100
-    print(f"  Passed: {correct}/{total} ({pct:.1f}%)")
-    return {
-        "correct": correct,
-        "total": total,
-        "accuracy_percent": round(pct, 1),
-        **counter.as_dict(),
-    }
+        return grade_case("instruction_following", case, extract_content(data))
+
+    def report(r: dict[str, Any]) -> None:
+        status = "PASS" if r["passed"] else "FAIL"
+        print(f"  [{status}] {r['desc']}: \"{r['got'][:60]}\"")
+
+    records = await run_cases("instruction_following", INSTRUCTION_CASES, follow, report)
+    summary = summarize_validated(records)
+
+    print(f"  Passed: {summary['correct']}/{summary['total']} "
+          f"({summary['accuracy_percent']:.1f}%)")
+    return {**summary, "cases": records, **counter.as_dict()}
 
 
 # ---------------------------------------------------------------------------
@@ -1136,27 +1834,22 @@ async def run_multi_turn_suite(
 ) -> dict[str, Any]:
     print("\n=== Multi-Turn Coherence ===")
     counter = TokenCounter()
-    correct = 0
 
-    for case in MULTI_TURN_CASES:
+    async def converse(case: dict[str, Any]) -> dict[str, Any]:
         msgs = list(case["turns"])
         data = await chat(client, config, msgs, max_tokens=128, counter=counter)
-        raw = extract_content(data)
-        passed = case["validate"](raw)
-        if passed:
-            correct += 1
-        status = "PASS" if passed else "FAIL"
-        print(f"  [{status}] {case['desc']}: \"{raw[:60]}\"")
-
-    total = len(MULTI_TURN_CASES)
-    pct = correct / total * 100
-    print(f"  Passed: {correct}/{total} ({pct:.1f}%)")
-    return {
-        "correct": correct,
-        "total": total,
-        "accuracy_percent": round(pct, 1),
-        **counter.as_dict(),
-    }
+        return grade_case("multi_turn_coherence", case, extract_content(data))
+
+    def report(r: dict[str, Any]) -> None:
+        status = "PASS" if r["passed"] else "FAIL"
+        print(f"  [{status}] {r['desc']}: \"{r['got'][:60]}\"")
+
+    records = await run_cases("multi_turn_coherence", MULTI_TURN_CASES, converse, report)
+    summary = summarize_validated(records)
+
+    print(f"  Passed: {summary['correct']}/{summary['total']} "
+          f"({summary['accuracy_percent']:.1f}%)")
+    return {**summary, "cases": records, **counter.as_dict()}
 
 
 # ---------------------------------------------------------------------------
@@ -1166,6 +1859,7 @@ async def run_multi_turn_suite(
 SUITES: dict[str, Any] = {
     "latency": run_latency_suite,
     "intent_classification": run_intent_suite,
+    "intent_throughput": run_intent_throughput_suite,
     "json_conformance": run_json_suite,
     "needle_in_haystack": run_needle_suite,
     "code_generation": run_code_suite,
@@ -1176,20 +1870,205 @@ SUITES: dict[str, Any] = {
     "instruction_following": run_instruction_suite,
     "multi_turn_coherence": run_multi_turn_suite,
 }
+# Suites that only run when named with --suite
+OPTIONAL_SUITES = {"intent_throughput"}
+DEFAULT_SUITES = [s for s in SUITES if s not in OPTIONAL_SUITES]
+
+
+@dataclass
+class SuiteGrader:
+    """A suite's cases and the pure functions that score them, for re-grading stored output."""
+    cases: list[Any]
+    case_id: Callable[[Any], str]
+    grade: Callable[..., dict[str, Any]]  # (case, raw output, **extra) -> record
+    summarize: Callable[[list[dict[str, Any]]], dict[str, Any]]
+    records_key: str = "cases"  # where the suite result keeps its per-case records
+    prompt_key: str | None = None  # its SYSTEM_PROMPTS entry, if any
+
+
+# Latency has nothing to grade: its records are timings, which --rescore keeps as-is
+GRADERS: dict[str, SuiteGrader] = {
+    "intent_classification": SuiteGrader(
+        INTENT_PROMPTS, lambda p: p["text"], grade_intent, summarize_intent,
+        prompt_key="intent",
+    ),
+    "json_conformance": SuiteGrader(
+        JSON_PROMPTS, lambda jp: jp["prompt"], grade_json, summarize_json, prompt_key="json",
+    ),
+    "needle_in_haystack": SuiteGrader(
+        NEEDLE_CASES, lambda c: f"{c[0]['answer']}@{c[1]}", grade_needle, summarize_needle,
+        records_key="details",
+    ),
+    "code_generation": SuiteGrader(
+        CODE_PROMPTS, lambda cp: cp["prompt"], grade_code, summarize_code, prompt_key="code",
+    ),
+    "function_selection": SuiteGrader(
+        FUNCTION_SELECTION_CASES, lambda c: c["query"],
+        grade_function_selection, summarize_function_selection, prompt_key="function",
+    ),
+    "argument_accuracy": SuiteGrader(
+        ARGUMENT_CASES, lambda c: c["query"], grade_argument, summarize_argument,
+        prompt_key="argument",
+    ),
+    "context_scaling": SuiteGrader(
+        SCALING_CHECKPOINTS, lambda f: f"{f:.2f}", grade_context_scaling,
+        summarize_context_scaling, records_key="checkpoints",
+    ),
+    "reasoning_math": SuiteGrader(
+        REASONING_PROBLEMS, lambda p: p["question"], grade_reasoning, summarize_reasoning,
+        prompt_key="reasoning",
+    ),
+    "instruction_following": SuiteGrader(
+        INSTRUCTION_CASES, lambda c: c["desc"], grade_validated, summarize_validated,
+        prompt_key="instruction",
+    ),
+    "multi_turn_coherence": SuiteGrader(
+        MULTI_TURN_CASES, lambda c: c["desc"], grade_validated, summarize_validated,
+    ),
+}
+
+
+def suite_case_counts(suites: Iterable[str]) -> dict[str, int]:
+    """Cases each suite hands to run_cases in one run, from the static case lists."""
+    counts = {s: len(g.cases) for s, g in GRADERS.items()}
+    counts["latency"] = len(LATENCY_PROMPTS)
+    counts["intent_throughput"] = sum(
+        -(-len(INTENT_PROMPTS) // n) for n in RUNTIME.batch_sizes or INTENT_BATCH_SIZES
+    )
+    return {s: counts[s] for s in suites if s in counts}
+
+
+def case_key(suite: str, case: Any) -> str:
+    """Stable id of a case within its suite: the grader's case_id, else the case itself."""
+    grader = GRADERS.get(suite)
+    return grader.case_id(case) if grader else json.dumps(case, sort_keys=True, default=str)
+
+
+def grade_case(suite: str, case: Any, raw: str, **extra: Any) -> dict[str, Any]:
+    """Grade one raw model output, keeping the output so --rescore can grade it again.
+
+    ``extra`` is passed through to the grader (grade_code's ``execution``).
+    """
+    grader = GRADERS[suite]
+    with span("grade"):
+        graded = grader.grade(case, raw, **extra)
+    return {
+        "case_id": grader.case_id(case),
+        **graded,
+        "raw_output": raw,
+        "grader_hash": fingerprint(grader.grade),
+    }
+
+
+def regrade_record(suite: str, case: Any, record: dict[str, Any]) -> dict[str, Any]:
+    """A stored record graded again from its raw output, keeping fields the grader
+    does not produce (e.g. ctx_tokens, timing).
+
+    A sampled code record has each of its samples re-graded (identical outputs
+    once) and its ``passed`` and ``pass_at_k`` recomputed from them.
+    """
+    if "samples" not in record:
+        return {**record, **grade_case(suite, case, record["raw_output"])}
+    raws = [smp.get("raw_output") for smp in record["samples"]]
+    graded = {raw: grade_case(suite, case, raw) for raw in dict.fromkeys(raws) if raw is not None}
+    samples = [{**smp, **graded[raw]} if raw is not None else smp
+               for smp, raw in zip(record["samples"], raws)]
+    passed = sum(smp["status"] == "PASS" for smp in samples)
+    first = graded.get(record["raw_output"]) or grade_case(suite, case, record["raw_output"])
+    return {
+        **record,
+        **first,
+        "samples": [
+            {k: v for k, v in smp.items() if k not in ("prompt", "expected_output")}
+            for smp in samples
+        ],
+        "passed": passed,
+        "pass_at_k": {
+            k: round(pass_at_k(len(samples), passed, int(k)), 4) for k in record["pass_at_k"]
+        },
+    }
+
+
+def planned_hashes(
+    configs: Iterable[ModelConfig], suites: Iterable[str]
+) -> set[tuple[str, str]]:
+    """(suite, input_hash) of every graded case a run will look up with --incremental."""
+    suites = [s for s in suites if s in GRADERS]
+    return {
+        (suite, fingerprint(suite_fingerprint(suite, config), case))
+        for config in configs for suite in suites for case in GRADERS[suite].cases
+    }
+
+
+def suite_fingerprint(suite: str, config: ModelConfig) -> str:
+    """Hash of everything outside the case itself that shapes a suite's requests.
+
+    The suite runner's source stands in for max_tokens and prompt construction;
+    the system prompt is the one SYSTEM_PROMPTS gives the config's style.
+    """
+    grader = GRADERS[suite]
+    return fingerprint(
+        suite,
+        SUITES[suite],
+        get_system_prompt(grader.prompt_key, config) if grader.prompt_key else None,
+        config.name,
+        RUNTIME.digests.get(config.name),
+        config.temperature,
+        config.top_p,
+        config.num_ctx,
+        config.system_style,
+        # pass@k sampling changes what a code record holds; single-sample hashes stay as before
+        *([RUNTIME.code_samples] if suite == "code_generation" and RUNTIME.code_samples > 1
+          else []),
+    )
+
+
+async def reuse_case(suite: str, case: Any, input_hash: str) -> dict[str, Any] | None:
+    """An earlier record for an unchanged case, re-graded if its grader changed since."""
+    prior = RUNTIME.baseline.get((suite, input_hash)) if RUNTIME.baseline else None
+    if prior is None:
+        return None
+    if prior.get("grader_hash") == fingerprint(GRADERS[suite].grade):
+        RUNTIME.reuse["reused"] += 1
+        return prior
+    if "raw_output" not in prior:
+        return None
+    RUNTIME.reuse["regraded"] += 1
+    return await asyncio.to_thread(regrade_record, suite, case, prior)
 
 
 # ---------------------------------------------------------------------------
 # Summary Table
 # ---------------------------------------------------------------------------
 
+SCORE_KEYS = ("accuracy_percent", "recall_percent", "correctness_percent",
+              "json_validity_percent", "run_percent")
+
+
+def suite_score(result: dict[str, Any]) -> float | None:
+    """A suite's headline score as a fraction in [0, 1], if it has one."""
+    for key in SCORE_KEYS:
+        if key in result:
+            return result[key] / 100
+    return None
+
+
 def get_suite_score(suite_name: str, result: dict[str, Any]) -> str:
     """Extract a display score from a suite result dict."""
     if "error" in result:
         return "ERR"
     if suite_name == "latency":
         return f"{result.get('avg_tps', '?')} tok/s"
-    for key in ("accuracy_percent", "recall_percent", "correctness_percent",
-                "json_validity_percent", "run_percent"):
+    if suite_name == "intent_throughput":
+        return (f"{result.get('best_queries_per_s', '?')} q/s "
+                f"@{result.get('best_batch_size', '?')}")
+    if "pass_at_k" in result and "1" in result["pass_at_k"]:
+        return f"pass@1 {result['pass_at_k']['1']}%"
+    repeats = result.get("repeats")
+    if repeats and repeats["repeats"] > 1:
+        return (f"{repeats['mean'] * 100:.1f}±{repeats['ci_width'] * 50:.1f}% "
+                f"x{repeats['repeats']}")
+    for key in SCORE_KEYS:
         if key in result:
             return f"{result[key]}%"
     return "?"
@@ -1200,7 +2079,10 @@ def print_summary_table(all_results: dict[str, dict[str, Any]]) -> None:
     if not all_results:
         return
 
-    suite_names = list(SUITES.keys())
+    suite_names = [
+        s for s in SUITES
+        if s not in OPTIONAL_SUITES or any(s in r for r in all_results.values())
+    ]
     config_labels = list(all_results.keys())
 
     # Column widths
@@ -1233,6 +2115,104 @@ def print_summary_table(all_results: dict[str, dict[str, Any]]) -> None:
 # Main
 # ---------------------------------------------------------------------------
 
+async def run_repeated(
+    client: httpx.AsyncClient, config: ModelConfig, suite_name: str
+) -> dict[str, Any]:
+    """Run a suite, repeating it until RUNTIME.repeats is satisfied with its score's CI.
+
+    The first run's result is returned with a ``repeats`` entry holding the score
+    of every run, their mean and the interval achieved, plus the later runs'
+    summaries. Suites without a fractional score (latency) run once.
+    """
+    policy = RUNTIME.repeats
+    runs: list[dict[str, Any]] = []
+    scores: list[float] = []
+    trials: list[int] = []
+    while True:
+        token = CURRENT_REPEAT.set(len(runs))
+        try:
+            result = await SUITES[suite_name](client, config)
+        finally:
+            CURRENT_REPEAT.reset(token)
+        runs.append(result)
+        score = suite_score(result)
+        if score is None or not policy.enabled:
+            return result
+        scores.append(score)
+        trials.append(result.get("total", 0))
+        if policy.done(scores, trials):
+            break
+        if len(runs) < policy.min_repeats:
+            print(f"  Repeat {len(runs) + 1} (min {policy.min_repeats})")
+        else:
+            low, high = policy.interval(scores, trials)
+            print(f"  Repeat {len(runs) + 1}: CI width {high - low:.3f} > {policy.target_width}")
+
+    summary = policy.summary(scores, trials)
+    print(f"  Repeats: {summary['repeats']} | mean {summary['mean']:.3f} "
+          f"| {summary['method']} CI [{summary['ci_low']:.3f}, {summary['ci_high']:.3f}]"
+          f"{'' if summary['converged'] else ' (max repeats reached)'}")
+    records_key = GRADERS[suite_name].records_key if suite_name in GRADERS else None
+    later = [{k: v for k, v in r.items() if k != records_key} for r in runs[1:]]
+    return {**runs[0], "repeats": {**summary, "runs": later}}
+
+
+def metric_fields(record: dict[str, Any]) -> dict[str, float]:
+    """Numeric and boolean fields of a result, one level of nested dicts as ``outer.inner``."""
+    fields: dict[str, float] = {}
+    for key, value in record.items():
+        if isinstance(value, bool | int | float):
+            fields[key] = float(value)
+        elif isinstance(value, dict):
+            for inner, v in value.items():
+                if isinstance(v, bool | int | float):
+                    fields[f"{key}.{inner}"] = float(v)
+    return fields
+
+
+def persist_suite(config: ModelConfig, suite: str, result: dict[str, Any]) -> None:
+    """Queue a suite result for the results database (see ResultWriter); never blocks.
+
+    One test_runs row per (run, config, suite), named "<config label> | <suite>".
+    Its test_results rows are the suite's metric_fields plus those of every case
+    record (any list of dicts in the result), named "<list>.<field>". Earlier rows
+    of the same test are replaced, so a resumed run re-writes restored suites.
+    """
+    writer, journal = RUNTIME.results_db, RUNTIME.journal
+    if writer is None or journal is None:
+        return
+    run_id, test_name = journal.run_id, f"{config.label} | {suite}"
+    meta: dict[str, Any] = {"config": config.label, "digest": RUNTIME.digests.get(config.name)}
+    writer.add_run(run_id, config.name, suite, test_name, backend=RUNTIME.api,
+                   config_label=config.label, model_digest=meta["digest"])
+    writer.replace_results(run_id, config.name, test_name)
+    if "error" in result:
+        writer.add_result(run_id, config.name, test_name, "error", 1.0,
+                          {**meta, "error": result["error"]})
+    for name, value in metric_fields(result).items():
+        writer.add_result(run_id, config.name, test_name, name, value, meta)
+    for key, records in result.items():
+        if not isinstance(records, list) or not all(isinstance(r, dict) for r in records):
+            continue
+        for i, record in enumerate(records):
+            case_meta = {**meta, "case": record.get("case_id", i)}
+            for name, value in metric_fields(record).items():
+                writer.add_result(run_id, config.name, test_name, f"{key}.{name}", value,
+                                  case_meta)
+
+
+def spool_suite(config: ModelConfig, suite: str, result: dict[str, Any]) -> dict[str, Any]:
+    """Move a finished suite's case records to RUNTIME.spool; the summary stays in memory.
+
+    Once a suite has been journaled and persisted only its scores are needed
+    until the results file is written, which reads the records back config by
+    config (see run_all), so memory stays flat however large the matrix.
+    """
+    if RUNTIME.spool is None:
+        return result
+    return RUNTIME.spool.stash(config.label, suite, result)
+
+
 async def run_config(
     client: httpx.AsyncClient,
     config: ModelConfig,
@@ -1240,7 +2220,7 @@ async def run_config(
 ) -> dict[str, Any]:
     """Run all (or filtered) suites for a single config."""
     results: dict[str, Any] = {}
-    suites_to_run = suite_filter if suite_filter else list(SUITES.keys())
+    suites_to_run = suite_filter if suite_filter else DEFAULT_SUITES
 
     print(f"\n{'#' * 70}")
     print(f"# CONFIG: {config.label}")
@@ -1249,23 +2229,73 @@ async def run_config(
     print(f"{'#' * 70}")
 
     config_start = time.perf_counter()
-
-    for suite_name in suites_to_run:
-        if suite_name not in SUITES:
-            print(f"\n  [WARN] Unknown suite: {suite_name}, skipping")
-            continue
-        try:
-            suite_start = time.perf_counter()
-            result = await SUITES[suite_name](client, config)
-            suite_elapsed = time.perf_counter() - suite_start
-            result["elapsed_s"] = round(suite_elapsed, 3)
-            results[suite_name] = result
-            print(f"  Suite time: {suite_elapsed:.1f}s")
-        except Exception as e:
-            print(f"\n  [ERROR] Suite '{suite_name}' failed: {e}")
-            results[suite_name] = {"error": str(e)}
-
-    config_elapsed = time.perf_counter() - config_start
+    resumed_s = 0.0  # time the journaled suites took in the interrupted run
+    journal = RUNTIME.journal
+    token, suite_token = CURRENT_CONFIG.set(config), CURRENT_SUITE.set("")
+
+    try:
+        for suite_name in suites_to_run:
+            if suite_name not in SUITES:
+                print(f"\n  [WARN] Unknown suite: {suite_name}, skipping")
+                continue
+            # Spans in the suite are tagged with it; its cases add their case_id
+            CURRENT_SUITE.set(suite_name)
+            with tagged(config=config.label, suite=suite_name), span("suite"):
+                done = journal.completed_suite(config.label, suite_name) if journal else None
+                if done is not None:
+                    results[suite_name] = done
+                    resumed_s += done.get("elapsed_s", 0.0)
+                    if RUNTIME.progress is not None:
+                        RUNTIME.progress.finish_suite(config.label, suite_name)
+                    print(f"\n  [RESUMED] {suite_name}: {get_suite_score(suite_name, done)}")
+                    with span("persist"):
+                        persist_suite(config, suite_name, done)
+                        results[suite_name] = spool_suite(config, suite_name, done)
+                    continue
+                try:
+                    suite_start = time.perf_counter()
+                    result = await run_repeated(client, config, suite_name)
+                    suite_elapsed = time.perf_counter() - suite_start
+                    result["elapsed_s"] = round(suite_elapsed, 3)
+                    if RUNTIME.case_stats is not None:
+                        # Every run of the suite, including repeats whose records are not kept
+                        result["case_stats"] = RUNTIME.case_stats.pop((config.label, suite_name))
+                    if RUNTIME.progress is not None:
+                        # Mean case wall time; the database keeps it as later runs' ETA history
+                        case_s = RUNTIME.progress.finish_suite(config.label, suite_name)
+                        if case_s is not None:
+                            result["case_s"] = case_s
+                    prefix_plan = RUNTIME.prefix_plans.pop((config.label, suite_name), None)
+                    if prefix_plan:
+                        result["prefix_cache"] = prefix_plan
+                        print(f"  Prefix reuse ({prefix_plan['order']} order): "
+                              f"~{prefix_plan['est_shared_tokens']} of "
+                              f"~{prefix_plan['est_prompt_tokens']} prompt tokens shareable "
+                              f"(given order: ~{prefix_plan['est_shared_tokens_naive']})")
+                    results[suite_name] = result
+                    eta = RUNTIME.progress.eta() if RUNTIME.progress is not None else None
+                    print(f"  Suite time: {suite_elapsed:.1f}s"
+                          + (f" (run ETA {format_seconds(eta)})" if eta is not None else ""))
+                    if journal:
+                        with span("journal"):
+                            journal.record_suite(config.label, suite_name, result)
+                except Exception as e:
+                    print(f"\n  [ERROR] Suite '{suite_name}' failed: {e}")
+                    results[suite_name] = {"error": str(e)}
+                    if RUNTIME.case_stats is not None:
+                        RUNTIME.case_stats.pop((config.label, suite_name))
+                    if RUNTIME.metrics is not None:
+                        RUNTIME.metrics.suite_errors.inc(model=config.name, suite=suite_name)
+                    if RUNTIME.progress is not None:
+                        RUNTIME.progress.finish_suite(config.label, suite_name, failed=True)
+                with span("persist"):
+                    persist_suite(config, suite_name, results[suite_name])
+                    results[suite_name] = spool_suite(config, suite_name, results[suite_name])
+    finally:
+        CURRENT_CONFIG.reset(token)
+        CURRENT_SUITE.reset(suite_token)
+
+    config_elapsed = time.perf_counter() - config_start + resumed_s
     results["_total_elapsed_s"] = round(config_elapsed, 3)
     print(f"\n  Config total time: {config_elapsed:.1f}s")
 
@@ -1276,8 +2306,83 @@ async def run_all(
     model_filter: list[str] | None = None,
     config_filter: list[str] | None = None,
     suite_filter: list[str] | None = None,
+    concurrency: int = 1,
+    endpoints: list[str] | None = None,
+    endpoint_concurrency: int = 4,
+    api: str = "openai",
+    warmup: bool = True,
+    keep_alive: str | int = "10m",
+    pin_models: bool = False,
+    cache: str = "off",
+    cache_max_mb: int = 512,
+    mock: bool = False,
+    incremental: bool = False,
+    min_repeats: int = 1,
+    max_repeats: int = 1,
+    ci_width: float = 0.10,
+    ci_method: str = "bootstrap",
+    case_order: str = "prefix",
+    batch_sizes: list[int] | None = None,
+    sandbox_workers: int = 2,
+    sandbox_memory_mb: int = 512,
+    code_samples: int = 1,
+    pass_k: list[int] | None = None,
+    db_path: Path | None = DB_PATH,
+    results_format: str = "compact",
+    compression: str = "gzip",
+    trace: bool = False,
+    metrics_port: int | None = None,
+    live: bool = False,
+    resume: Path | None = None,
 ) -> dict[str, dict[str, Any]]:
-    """Run the full configuration matrix."""
+    """Run the full configuration matrix.
+
+    Progress is journaled to results/journal/ as cases finish. ``resume`` points
+    at the journal of an interrupted run, which must have been started with the
+    same arguments (see resume_run): finished configs, suites and cases are taken
+    from it and only the rest is run. ``incremental`` merges in graded cases whose
+    content hash matches a record in an earlier results file, newest first.
+    ``max_repeats`` above 1 re-runs scored suites until the ``ci_method`` interval
+    on their score is at most ``ci_width`` wide (see run_repeated). ``case_order``
+    "prefix" orders cases for KV-cache prefix reuse; "given" keeps suite order.
+    Generated code runs on ``sandbox_workers`` warm sandbox processes, each
+    snippet capped at ``sandbox_memory_mb`` of address space; 0 workers runs
+    every snippet in a fresh subprocess instead. ``code_samples`` above 1 draws
+    that many samples per code prompt and reports pass@k for each k in ``pass_k``.
+    Each finished suite is also written to the SQLite store at ``db_path`` (None
+    disables it) through a write-behind batcher, off the event loop. Results are
+    saved in ``results_format`` ("compact" or "json"; see save_results).
+
+    Memory does not grow with the matrix: finished suites keep only their
+    summary (case records wait in a CaseSpool on disk), each suite gains
+    ``case_stats`` from online aggregates of its case metrics, and the results
+    file is streamed out one config at a time.
+
+    ``trace`` writes a Chrome trace-event timeline of the run (configs, suites,
+    each case's queueing, HTTP stages, parsing, grading and persistence) to
+    results/traces/<run_id>.json, for Perfetto or chrome://tracing.
+
+    ``metrics_port`` serves live Prometheus metrics (cases, request and token
+    rates, latency histograms, errors, cache hit rates) at
+    http://127.0.0.1:<port>/metrics while the run lasts; see HarnessMetrics.
+    ``live`` redraws a rich dashboard instead (LiveView): per-config progress,
+    requests in flight per endpoint, request and token rates, errors and the
+    ETA, which blends this run's case times with earlier runs' from ``db_path``.
+    """
+    run_args = {
+        "model_filter": model_filter, "config_filter": config_filter,
+        "suite_filter": suite_filter, "concurrency": concurrency, "endpoints": endpoints,
+        "endpoint_concurrency": endpoint_concurrency, "api": api, "warmup": warmup,
+        "keep_alive": keep_alive, "pin_models": pin_models, "cache": cache,
+        "cache_max_mb": cache_max_mb, "mock": mock, "incremental": incremental,
+        "min_repeats": min_repeats, "max_repeats": max_repeats, "ci_width": ci_width,
+        "ci_method": ci_method, "case_order": case_order, "batch_sizes": batch_sizes,
+        "sandbox_workers": sandbox_workers, "sandbox_memory_mb": sandbox_memory_mb,
+        "code_samples": code_samples, "pass_k": pass_k,
+        "db_path": str(db_path) if db_path else None,
+        "results_format": results_format, "compression": compression, "trace": trace,
+        "metrics_port": metrics_port, "live": live,
+    }
     run_start = time.perf_counter()
     all_results: dict[str, dict[str, Any]] = {}
     timeout = httpx.Timeout(120.0, connect=10.0)
@@ -1296,55 +2401,397 @@ async def run_all(
         print("Config tags: precise, creative, minimal-prompt, small-context, large-context")
         return {}
 
-    print(f"\nWill run {len(all_configs)} config(s), "
-          f"{len(suite_filter) if suite_filter else len(SUITES)} suite(s) each.")
-    print(f"Configs: {[c.label for c in all_configs]}")
+    # Build a short filename from models tested
+    model_slug = "_".join(
+        m.replace(":", "-").replace(".", "") for m in models_to_test
+    )[:60]
+    if resume is not None:
+        journal = RunJournal.resume(resume)
+        print(f"Resuming {journal.run_id}: {len(journal.state.suites)} suite(s) and "
+              f"{len(journal.state.cases)} case(s) already journaled")
+    else:
+        run_id = f"{datetime.now().strftime('%Y-%m-%dT%H-%M-%S')}_{model_slug}"
+        journal = RunJournal.create(JOURNAL_DIR / f"{run_id}.jsonl", run_id, run_args)
+    suites_to_run = [s for s in suite_filter or DEFAULT_SUITES if s in SUITES]
+    tracer = start_tracing(RESULTS_DIR / "traces" / f"{journal.run_id}.json") if trace else None
+
+    def finished(c: ModelConfig) -> bool:
+        return all(journal.completed_suite(c.label, s) is not None for s in suites_to_run)
+
+    pool = EndpointPool(
+        endpoints or [BASE_URL],
+        max_outstanding=endpoint_concurrency,
+        # In-process mock: exercises scheduling, pooling and timing without a model.
+        # It lists the run's models in /api/tags, so they have digests to cache under.
+        transport=MockServer(models=list(dict.fromkeys(c.name for c in all_configs))).transport()
+        if mock else None,
+    )
+    RUNTIME.pool = pool
+    RUNTIME.executor = CaseExecutor(suite_limit=concurrency, endpoint_limit=pool.capacity)
+    RUNTIME.scheduler = MatrixScheduler()
+    RUNTIME.api = api
+    RUNTIME.timings = {}
+    RUNTIME.lifecycle = None
+    RUNTIME.journal = journal
+    RUNTIME.reuse = Counter()
+    RUNTIME.undigested = set()
+    RUNTIME.repeats = RepeatPolicy(min_repeats, max_repeats, ci_width, ci_method)
+    RUNTIME.case_order = case_order
+    RUNTIME.batch_sizes = batch_sizes
+    RUNTIME.code_samples = max(code_samples, 1)
+    RUNTIME.pass_k = pass_k or [1, 5, 10]
+    RUNTIME.prefix_plans = {}
+    RUNTIME.case_stats = CaseAggregator()
+    RUNTIME.spool = CaseSpool()
+    RUNTIME.baseline = None  # with --incremental, indexed once model digests are known
+    RUNTIME.cache = (
+        ResponseCache(CACHE_PATH, cache_max_mb * 1024 * 1024, cache) if cache != "off" else None
+    )
+    RUNTIME.sandbox = (
+        SandboxPool(sandbox_workers, Limits(timeout_s=15, memory_mb=sandbox_memory_mb))
+        if sandbox_workers > 0 and "code_generation" in suites_to_run else None
+    )
+
+    RUNTIME.results_db = ResultWriter(Path(db_path)) if db_path else None
+    RUNTIME.progress = ProgressTracker(
+        [(c.label, c.name) for c in all_configs],
+        suites_to_run,
+        cases=suite_case_counts(suites_to_run),
+        history=load_history(Path(db_path), models_to_test, suites_to_run) if db_path else None,
+    )
+    RUNTIME.metrics = HarnessMetrics() if metrics_port is not None or live else None
+    metrics_server = None
+    if metrics_port is not None:
+        metrics_server = MetricsServer(RUNTIME.metrics, port=metrics_port)
+    if RUNTIME.metrics is not None:
+
+        def progress(metrics: HarnessMetrics) -> None:
+            metrics.configs.set(len(all_configs), state="total")
+            metrics.configs.set(len(all_results), state="done")
+
+        RUNTIME.metrics.collectors += [collect_cache_metrics, progress]
+
+    await pool.check_health()
+    health_task = asyncio.create_task(pool.run_health_checks())
+    live_task = (
+        asyncio.create_task(LiveView(RUNTIME.progress, pool.stats, RUNTIME.metrics.snapshot).run())
+        if live else None
+    )
+    try:
+        if RUNTIME.results_db is not None:
+            await RUNTIME.results_db.start()
+        if metrics_server is not None:
+            await metrics_server.start()
+            print(f"Metrics: http://{metrics_server.host}:{metrics_server.port}/metrics")
+        if RUNTIME.sandbox is not None:
+            await RUNTIME.sandbox.start()  # workers warm up while the first model loads
+        hooks = tracer.httpx_hooks() if tracer else None  # connect/send/server/receive spans
+        async with pool.client(timeout=timeout, event_hooks=hooks) as client:
+            if RUNTIME.cache is not None or incremental or RUNTIME.results_db is not None:
+                RUNTIME.digests = await model_digests(client)
+            if incremental:
+                RUNTIME.baseline = await asyncio.to_thread(
+                    index_results,
+                    recent_results(RESULTS_DIR)[:BASELINE_FILES],
+                    {s: g.records_key for s, g in GRADERS.items()},
+                    planned_hashes(all_configs, suites_to_run),
+                )
+            lifecycle = ModelLifecycle(client, keep_alive, pin=pin_models) if warmup else None
+            RUNTIME.lifecycle = lifecycle
+            # Configs finished before an interruption need no model: replay them first
+            for config in all_configs:
+                if finished(config):
+                    all_results[config.label] = await run_config(client, config, suite_filter)
+            pending = [c for c in all_configs if c.label not in all_results]
+            # Group configs by (model, num_ctx) so Ollama reloads each pair only once
+            plan = RUNTIME.scheduler.plan(
+                pending,
+                key=lambda c: (c.name, c.num_ctx),
+                resident=await resident_model(client),
+            )
 
-    async with httpx.AsyncClient(base_url=BASE_URL, timeout=timeout) as client:
-        for config in all_configs:
-            results = await run_config(client, config, suite_filter)
-            all_results[config.label] = results
+            print(f"\nWill run {len(pending)} config(s), "
+                  f"{len(suites_to_run)} suite(s) each.")
+            print(f"Configs: {[c.label for c in plan.order]}")
+            print(f"Model loads: {plan.planned_reloads} scheduled "
+                  f"(naive order: {plan.naive_reloads}, avoided: {plan.reloads_avoided})")
+
+            for i, config in enumerate(plan.order):
+                previous = plan.order[i - 1] if i else None
+                following = plan.order[i + 1] if i + 1 < len(plan.order) else None
+                if lifecycle and (previous is None or (previous.name, previous.num_ctx)
+                                  != (config.name, config.num_ctx)):
+                    with span("preload", model=config.name, num_ctx=config.num_ctx):
+                        record = await lifecycle.preload(config.name, config.num_ctx)
+                    if record is not None:
+                        RUNTIME.scheduler.observe(config.name, config.num_ctx, record.load_s)
+                        print(f"\nPreloaded {config.name} (num_ctx={config.num_ctx}) "
+                              f"in {record.load_s:.1f}s")
+                with span("config", config=config.label):
+                    results = await run_config(client, config, suite_filter)
+                all_results[config.label] = results
+                if lifecycle and (following is None or following.name != config.name):
+                    await lifecycle.release(config.name)
+            if lifecycle:
+                await lifecycle.close()
+    except BaseException:
+        journal.close()  # everything finished so far stays resumable
+        stop_tracing()  # the spans so far still make a valid trace
+        raise
+    finally:
+        health_task.cancel()
+        if live_task is not None:
+            live_task.cancel()
+            await asyncio.gather(live_task, return_exceptions=True)  # draws the final state
+        await pool.aclose()
+        if RUNTIME.cache is not None:
+            RUNTIME.cache.close()
+        if RUNTIME.sandbox is not None:
+            await RUNTIME.sandbox.close()
+        if RUNTIME.results_db is not None:
+            await RUNTIME.results_db.close()  # drains what is queued, even when interrupted
+        if metrics_server is not None:
+            await metrics_server.close()
 
     total_elapsed = time.perf_counter() - run_start
+    # Present results in matrix order, not execution order
+    all_results = {c.label: all_results[c.label] for c in all_configs}
+    schedule = RUNTIME.scheduler.report()
 
     # Summary
     print_summary_table(all_results)
-
-    # Persist results
+    print(f"\nScheduler: {schedule['reloads_avoided']} reload(s) avoided, "
+          f"~{schedule['est_load_time_saved_s']}s load time saved; "
+          f"{len(schedule['observed_reloads'])} reload(s) observed")
+    performance = {model: t.as_dict() for model, t in RUNTIME.timings.items()}
+    lifecycle_report = RUNTIME.lifecycle.report() if RUNTIME.lifecycle else None
+    cache_stats = RUNTIME.cache.stats() if RUNTIME.cache else None
+    if cache_stats:
+        print(f"Response cache ({cache_stats['mode']}): {cache_stats['hits']} hit(s), "
+              f"{cache_stats['misses']} miss(es), {cache_stats['evictions']} eviction(s)")
+    prefix_cache = summarize_prefix_reuse(all_results)
+    if prefix_cache:
+        print(f"Prefix reuse ({case_order} order): ~{prefix_cache['est_shared_tokens']} "
+              f"prompt tokens shareable vs ~{prefix_cache['est_shared_tokens_naive']} in given "
+              f"order; prompt_eval_count {prefix_cache['prompt_eval_count']} over those suites")
+    sandbox_report = RUNTIME.sandbox.report() if RUNTIME.sandbox else None
+    if sandbox_report:
+        print(f"Sandbox: {sandbox_report['runs']} snippet(s) run on {sandbox_workers} "
+              f"worker(s), {sandbox_report['cache_hits']} cached, "
+              f"{sandbox_report['timeouts']} timed out")
+    db_report = RUNTIME.results_db.report() if RUNTIME.results_db else None
+    if db_report:
+        print(f"Results DB: {db_report['statements']:.0f} statement(s) in "
+              f"{db_report['batches']:.0f} batch(es) to {db_report['path']}"
+              + (f", {db_report['failed_statements']:.0f} failed"
+                 if db_report["failed_statements"] else ""))
+    if incremental:
+        print(f"Incremental: {RUNTIME.reuse['reused']} case(s) reused, "
+              f"{RUNTIME.reuse['regraded']} re-graded, {RUNTIME.reuse['run']} run")
+    if lifecycle_report:
+        print(f"Preloads: {len(lifecycle_report['loads'])} model load(s), "
+              f"{lifecycle_report['total_load_s']}s cold-load time kept out of case timings")
+    for model, perf in performance.items():
+        print(f"{model}: prefill {perf['tokens_per_second_prompt']} tok/s, "
+              f"decode {perf['tokens_per_second_generation']} tok/s, "
+              f"load {perf['load_s']:.1f}s, overhead {perf['overhead_s']:.1f}s "
+              f"of {perf['wall_s']:.1f}s")
+    if len(pool.endpoints) > 1:
+        for ep in pool.stats():
+            print(f"Endpoint {ep['url']}: {ep['served']} request(s), "
+                  f"{ep['ejections']} ejection(s)")
+
+    # Persist results; each config's case records are read back from the spool as it is written
+    spool = RUNTIME.spool
     output = {
-        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "run_id": journal.run_id,
+        "timestamp": datetime.now(UTC).isoformat(),
         "total_elapsed_s": round(total_elapsed, 3),
         "filters": {
             "models": model_filter,
             "configs": config_filter,
             "suites": suite_filter,
         },
-        "configs_run": [
+        "schedule": schedule,
+        "endpoints": pool.stats(),
+        "api": api,
+        "lifecycle": lifecycle_report,
+        "cache": cache_stats,
+        "incremental": dict(RUNTIME.reuse) if incremental else None,
+        "prefix_cache": prefix_cache,
+        "sandbox": sandbox_report,
+        "results_db": db_report,
+        "trace": str(tracer.path) if tracer else None,
+        # Per-model server timings (native API); fills performance_metrics in source.json
+        "performance_metrics": performance,
+        "configs_run": (
             {
                 "config": asdict(c),
-                "suites": all_results[c.label],
+                "suites": {
+                    s: spool.restore(c.label, s, r) for s, r in all_results[c.label].items()
+                },
             }
             for c in all_configs
-        ],
+        ),
     }
-    results_dir = Path("results")
-    results_dir.mkdir(exist_ok=True)
+    try:
+        with span("save_results"):
+            save_results(output, model_slug, results_format, compression)
+    finally:
+        spool.close()
+        RUNTIME.spool = None
+    if tracer is not None:
+        stop_tracing()
+        print(f"Trace: {tracer.path} ({tracer.spans} spans; open in ui.perfetto.dev)")
+    journal.finish()
+    print(f"Journal: {journal.path}")
+
+    return all_results
+
+
+def collect_cache_metrics(metrics: HarnessMetrics) -> None:
+    """Mirror the response cache's and the sandbox's hit counts into ``metrics``."""
+    if RUNTIME.cache is not None:
+        metrics.record_cache("response", RUNTIME.cache.hits, RUNTIME.cache.misses)
+    if RUNTIME.sandbox is not None:
+        stats = RUNTIME.sandbox.stats
+        metrics.record_cache("sandbox", stats["cache_hits"], stats["runs"])
+
+
+async def resume_run(path: Path) -> dict[str, dict[str, Any]]:
+    """Finish an interrupted run from its journal, with the arguments it was started with."""
+    return await run_all(**read_journal(path).header["args"], resume=path)
+
+
+def summarize_prefix_reuse(all_results: dict[str, dict[str, Any]]) -> dict[str, Any] | None:
+    """Run-wide totals of the suites' prefix-reuse estimates and their prompt_eval_count."""
+    totals: Counter[str] = Counter()
+    for suites in all_results.values():
+        for result in suites.values():
+            plan = result.get("prefix_cache") if isinstance(result, dict) else None
+            if plan:
+                totals.update({k: v for k, v in plan.items() if k.startswith("est_")})
+                totals["prompt_eval_count"] += result.get("prompt_tokens", 0)
+    return dict(totals) if totals else None
+
+
+def save_results(
+    output: dict[str, Any], slug: str, fmt: str = "compact", compression: str = "gzip"
+) -> Path:
+    """Write a result set to results/<timestamp>_<slug>.cjson[.gz|.xz], or .json.
+
+    The compact format stores long strings once and case records column-wise
+    (see ai_test_harness.resultfile); ``fmt="json"`` writes the plain layout.
+    Iterators in ``output`` are consumed as the file is written.
+    """
+    RESULTS_DIR.mkdir(exist_ok=True)
     ts = datetime.now().strftime("%Y-%m-%dT%H-%M-%S")
-    # Build a short filename from models tested
-    model_slug = "_".join(
-        m.replace(":", "-").replace(".", "") for m in models_to_test
-    )[:60]
-    out_path = results_dir / f"{ts}_{model_slug}.json"
-    out_path.write_text(json.dumps(output, indent=2, default=str), encoding="utf-8")
+    out_path = write_results(output, RESULTS_DIR / f"{ts}_{slug}", compression, fmt)
     print(f"\nResults saved to {out_path}")
+    return out_path
 
+
+def rescore_results(
+    path: Path, workers: int | None = None, fmt: str = "compact", compression: str = "gzip"
+) -> dict[str, dict[str, Any]]:
+    """Re-run the current graders over the raw outputs stored in a results file.
+
+    Cases are graded in parallel threads (code cases run a subprocess each) and
+    matched to today's case definitions by case_id. Records that cannot be
+    re-graded (errors, removed cases, files from before raw outputs were kept)
+    are carried over unchanged. Writes a new result set; nothing is queried.
+    """
+    source = load_results(path)
+    pending: dict[tuple[int, str], list[tuple[dict[str, Any], Future[dict[str, Any]] | None]]] = {}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for i, run in enumerate(source["configs_run"]):
+            for suite, result in run["suites"].items():
+                grader = GRADERS.get(suite)
+                if grader is None or not isinstance(result, dict):
+                    continue
+                if grader.records_key not in result:
+                    continue
+                by_id = {grader.case_id(c): c for c in grader.cases}
+                pending[(i, suite)] = [
+                    (rec, pool.submit(regrade_record, suite, by_id[rec["case_id"]], rec)
+                     if rec.get("case_id") in by_id and "raw_output" in rec else None)
+                    for rec in result[grader.records_key]
+                ]
+
+        regraded = kept = 0
+        for (i, suite), items in pending.items():
+            grader = GRADERS[suite]
+            records = []
+            for rec, future in items:
+                if future is None:
+                    kept += 1
+                    records.append(rec)
+                else:
+                    regraded += 1
+                    records.append(future.result())
+            suites = source["configs_run"][i]["suites"]
+            suites[suite] = {
+                **suites[suite], **grader.summarize(records), grader.records_key: records,
+            }
+            if "case_stats" in suites[suite]:  # from the kept records; repeats are not stored
+                stats = CaseAggregator()
+                for rec in records:
+                    stats.add(suite, metric_fields(rec))
+                suites[suite]["case_stats"] = stats.pop(suite)
+
+    all_results = {run["config"]["label"]: run["suites"] for run in source["configs_run"]}
+    print_summary_table(all_results)
+    print(f"\nRe-graded {regraded} case(s) from {path}; {kept} carried over unchanged")
+    output = {
+        **source,
+        "timestamp": datetime.now(UTC).isoformat(),
+        "rescored_from": str(path),
+    }
+    save_results(output, f"rescored_{result_stem(path)}"[:70], fmt, compression)
     return all_results
 
 
+def parse_sample(text: str) -> tuple[str, float]:
+    """``EVENT=RATE`` for --log-sample."""
+    event, sep, rate = text.partition("=")
+    try:
+        value = float(rate)
+    except ValueError:
+        value = -1.0
+    if not sep or not event or not 0 <= value <= 1:
+        raise argparse.ArgumentTypeError(f"expected EVENT=RATE with RATE in [0, 1], got {text!r}")
+    return event, value
+
+
+def positive_int(text: str) -> int:
+    """An integer of at least 1, for count options such as --batch-sizes."""
+    try:
+        value = int(text)
+    except ValueError:
+        value = 0
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"expected a positive integer, got {text!r}")
+    return value
+
+
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(
         description="AI Test Harness — run LLM test suites with a configuration matrix"
     )
+    parser.add_argument(
+        "--rescore",
+        metavar="RESULTS_FILE",
+        default=None,
+        help="Re-grade the raw outputs stored in a results file (either format) with the "
+             "current graders and write a new result set, without querying any model.",
+    )
+    parser.add_argument(
+        "--resume",
+        metavar="JOURNAL",
+        default=None,
+        help=f"Finish an interrupted run from its journal in {JOURNAL_DIR}/, skipping the "
+             "cases it already completed. The run's original arguments are reused.",
+    )
     parser.add_argument(
         "--model", "-m",
         nargs="*",
@@ -1362,15 +2809,258 @@ def parse_args() -> argparse.Namespace:
         "--suite", "-s",
         nargs="*",
         default=None,
-        help="Suite(s) to run (e.g. latency intent_classification). Defaults to all.",
+        help="Suite(s) to run (e.g. latency intent_classification). Defaults to all "
+             "except the opt-in intent_throughput.",
+    )
+    parser.add_argument(
+        "--endpoint", "-e",
+        nargs="*",
+        default=None,
+        help=f"Inference server URL(s) to balance across. Defaults to {BASE_URL}.",
+    )
+    parser.add_argument(
+        "--endpoint-concurrency",
+        type=positive_int,
+        default=4,
+        help="Max requests in flight per endpoint (OLLAMA_NUM_PARALLEL). Default 4.",
+    )
+    parser.add_argument(
+        "--concurrency", "-j",
+        type=positive_int,
+        default=1,
+        help="Cases in flight per suite, up to endpoints x --endpoint-concurrency. "
+             "Timing suites such as latency always run serially. Default 1.",
+    )
+    parser.add_argument(
+        "--api",
+        choices=["openai", "native"],
+        default="openai",
+        help="Server API: OpenAI-compatible /v1/chat/completions, or Ollama's native "
+             "/api/chat, which adds load/prefill/decode timings. Default openai.",
+    )
+    parser.add_argument(
+        "--warmup",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="Preload each (model, num_ctx) before its suites and unload it afterwards, "
+             "so load time stays out of case timings. Default on.",
+    )
+    parser.add_argument(
+        "--keep-alive",
+        type=lambda v: int(v) if v.lstrip("-").isdigit() else v,
+        default="10m",
+        help="Ollama keep_alive for preloaded models (e.g. 10m, 300, -1). Default 10m.",
+    )
+    parser.add_argument(
+        "--pin-models",
+        action="store_true",
+        help="Keep every model resident for the whole run instead of unloading "
+             "it when its configs finish.",
+    )
+    parser.add_argument(
+        "--cache",
+        choices=["off", "read", "readwrite"],
+        default="off",
+        help=f"Replay temperature-0 responses from {CACHE_PATH} (read), and store new "
+             "ones (readwrite). Default off.",
+    )
+    parser.add_argument(
+        "--cache-max-mb",
+        type=int,
+        default=512,
+        help="Response cache size cap; least recently used entries are evicted. Default 512.",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only query new or changed graded cases; reuse the rest from the most recent "
+             "results with the same case content hash and model digest.",
+    )
+    parser.add_argument(
+        "--min-repeats",
+        type=int,
+        default=1,
+        help="Runs of each scored suite before its confidence interval is checked. Default 1.",
+    )
+    parser.add_argument(
+        "--max-repeats",
+        type=int,
+        default=1,
+        help="Upper bound on runs of each scored suite; above 1, suites repeat until "
+             "the score's CI is within --ci-width. Default 1 (no repeats).",
+    )
+    parser.add_argument(
+        "--ci-width",
+        type=float,
+        default=0.10,
+        help="Target width of the 95%% CI on a suite's score (a fraction). Default 0.10.",
+    )
+    parser.add_argument(
+        "--ci-method",
+        choices=["bootstrap", "wilson"],
+        default="bootstrap",
+        help="bootstrap over per-run scores (run-to-run noise) or wilson over pooled "
+             "case outcomes. Default bootstrap.",
+    )
+    parser.add_argument(
+        "--case-order",
+        choices=["prefix", "given"],
+        default="prefix",
+        help="prefix: order cases whose prompts share long prefixes so each server slot "
+             "reuses its KV cache; given: suite order (to compare prompt_eval_count). "
+             "Default prefix.",
+    )
+    parser.add_argument(
+        "--batch-sizes",
+        type=positive_int,
+        nargs="+",
+        default=None,
+        help="Queries per request swept by the opt-in intent_throughput suite "
+             f"(-s intent_throughput). Default {' '.join(map(str, INTENT_BATCH_SIZES))}.",
+    )
+    parser.add_argument(
+        "--sandbox-workers",
+        type=int,
+        default=2,
+        help="Warm sandbox processes running generated code, overlapped with generation; "
+             "0 starts a fresh subprocess per snippet. Default 2.",
+    )
+    parser.add_argument(
+        "--sandbox-memory-mb",
+        type=int,
+        default=512,
+        help="Address-space limit for each generated-code run, in MB. Default 512.",
+    )
+    parser.add_argument(
+        "--db",
+        type=Path,
+        default=DB_PATH,
+        help=f"SQLite results database each finished suite is written to. Default {DB_PATH}.",
+    )
+    parser.add_argument(
+        "--no-db",
+        action="store_true",
+        help="Do not write results to the SQLite database.",
+    )
+    parser.add_argument(
+        "--results-format",
+        choices=["compact", "json"],
+        default="compact",
+        help="compact: long strings stored once, case records column-wise (.cjson); "
+             "json: the plain indented layout. Default compact.",
+    )
+    parser.add_argument(
+        "--compression",
+        choices=["none", "gzip", "lzma"],
+        default="gzip",
+        help="Compression for compact results files. Default gzip.",
+    )
+    parser.add_argument(
+        "--code-samples",
+        type=int,
+        default=1,
+        help="Samples per code_generation prompt, requested concurrently; above 1 the "
+             "suite reports unbiased pass@k and samples/sec. Default 1.",
+    )
+    parser.add_argument(
+        "--pass-k",
+        type=positive_int,
+        nargs="+",
+        default=None,
+        help="k values for pass@k (those above --code-samples are skipped). Default 1 5 10.",
+    )
+    parser.add_argument(
+        "--trace",
+        action="store_true",
+        help="Write a Chrome trace-event timeline of the run (per-case queueing, HTTP "
+             "connect/server/receive, parsing, grading, persistence) to "
+             "results/traces/<run_id>.json for Perfetto or chrome://tracing.",
+    )
+    parser.add_argument(
+        "--live",
+        action="store_true",
+        help="Show a live dashboard: per-config progress bars, requests in flight per "
+             "endpoint, rolling request and token rates, error counts and an ETA from "
+             "this run's case times blended with earlier runs' (from --db).",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=None,
+        metavar="PORT",
+        help="Serve live Prometheus metrics at http://127.0.0.1:PORT/metrics while the "
+             "run lasts (cases done/in flight, requests and tokens per second, latency "
+             "histograms per model and suite, errors, timeouts, cache hit rates).",
+    )
+    parser.add_argument(
+        "--log-file",
+        type=Path,
+        default=None,
+        help="Write structured log events (endpoint ejections, model loads, DB write "
+             "failures) to this rotating NDJSON file from a background thread. "
+             "Default: stderr.",
+    )
+    parser.add_argument(
+        "--log-sample",
+        type=parse_sample,
+        nargs="+",
+        default=[],
+        metavar="EVENT=RATE",
+        help="Keep only this fraction of an event's log records, e.g. "
+             "model_preloaded=0.5. Needs --log-file.",
+    )
+    parser.add_argument(
+        "--mock",
+        action="store_true",
+        help="Answer from the built-in mock server (in-process) instead of Ollama, "
+             "to test the harness itself. Use `harness mock-server` for one over HTTP.",
     )
-    return parser.parse_args()
+    args = parser.parse_args()
+    if args.log_sample and args.log_file is None:
+        parser.error("--log-sample needs --log-file (records on stderr are not sampled)")
+    return args
 
 
 if __name__ == "__main__":
     args = parse_args()
+    if args.log_file:
+        configure_logging(args.log_file, sample=dict(args.log_sample))
+    if args.rescore:
+        rescore_results(Path(args.rescore), fmt=args.results_format,
+                        compression=args.compression)
+        raise SystemExit(0)
+    if args.resume:
+        asyncio.run(resume_run(Path(args.resume)))
+        raise SystemExit(0)
     asyncio.run(run_all(
         model_filter=args.model,
         config_filter=args.config,
         suite_filter=args.suite,
+        concurrency=args.concurrency,
+        endpoints=args.endpoint,
+        endpoint_concurrency=args.endpoint_concurrency,
+        api=args.api,
+        warmup=args.warmup,
+        keep_alive=args.keep_alive,
+        pin_models=args.pin_models,
+        cache=args.cache,
+        cache_max_mb=args.cache_max_mb,
+        mock=args.mock,
+        incremental=args.incremental,
+        min_repeats=args.min_repeats,
+        max_repeats=args.max_repeats,
+        ci_width=args.ci_width,
+        ci_method=args.ci_method,
+        case_order=args.case_order,
+        batch_sizes=args.batch_sizes,
+        sandbox_workers=args.sandbox_workers,
+        sandbox_memory_mb=args.sandbox_memory_mb,
+        code_samples=args.code_samples,
+        pass_k=args.pass_k,
+        db_path=None if args.no_db else args.db,
+        results_format=args.results_format,
+        compression=args.compression,
+        trace=args.trace,
+        metrics_port=args.metrics_port,
+        live=args.live,
     ))
@@ -0,0 +1,165 @@
+"""Online, constant-memory statistics over case records.
+
+``RunningStats`` keeps count, mean and M2 (Welford's update) plus min and max,
+so the mean and variance of a stream need neither the values nor a second pass.
+``QuantileSketch`` is a log-bucketed sketch (DDSketch): each estimated quantile
+is within ``relative_accuracy`` of an actual value, in a few hundred buckets
+however many values are added. ``CaseAggregator`` keeps one of each per
+(group, metric) so a run can summarise its cases as they finish.
+"""
+
+from __future__ import annotations
+
+import math
+from collections.abc import Hashable, Mapping, Sequence
+from dataclasses import dataclass
+from typing import Any
+
+DEFAULT_QUANTILES = (0.5, 0.9, 0.99)
+
+
+@dataclass
+class RunningStats:
+    """Count, mean, sample variance, min and max of a stream of numbers."""
+
+    count: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+    min: float = math.inf
+    max: float = -math.inf
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    @property
+    def variance(self) -> float:
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def stddev(self) -> float:
+        return math.sqrt(self.variance)
+
+
+class QuantileSketch:
+    """Mergeable quantile estimates with bounded relative error (DDSketch).
+
+    A value x > 0 lands in bucket ceil(log_gamma(x)), gamma = (1 + a) / (1 - a),
+    and is read back as the bucket's midpoint, which is within a (the relative
+    accuracy) of x. Negative values use a mirrored set of buckets; values too
+    close to zero are counted apart. Past ``max_buckets`` the lowest buckets
+    are collapsed together, which only coarsens the smallest magnitudes.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01, max_buckets: int = 2048) -> None:
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be in (0, 1)")
+        self.relative_accuracy = relative_accuracy
+        self.max_buckets = max_buckets
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self._min_value = 1e-9
+        self._positive: dict[int, int] = {}
+        self._negative: dict[int, int] = {}
+        self._zero = 0
+        self.count = 0
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        if abs(value) < self._min_value:
+            self._zero += 1
+            return
+        store = self._positive if value > 0 else self._negative
+        key = math.ceil(math.log(abs(value)) / self._log_gamma)
+        store[key] = store.get(key, 0) + 1
+        if len(store) > self.max_buckets:
+            self._collapse(store)
+
+    def merge(self, other: QuantileSketch) -> None:
+        if other._gamma != self._gamma:
+            raise ValueError("cannot merge sketches with different relative accuracy")
+        for mine, theirs in ((self._positive, other._positive), (self._negative, other._negative)):
+            for key, n in theirs.items():
+                mine[key] = mine.get(key, 0) + n
+            if len(mine) > self.max_buckets:
+                self._collapse(mine)
+        self._zero += other._zero
+        self.count += other.count
+
+    def quantile(self, q: float) -> float | None:
+        """Estimated q-quantile (0 <= q <= 1), or None if nothing was added."""
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = 0
+        for key in sorted(self._negative, reverse=True):  # most negative first
+            seen += self._negative[key]
+            if seen > rank:
+                return -self._value(key)
+        seen += self._zero
+        if seen > rank:
+            return 0.0
+        for key in sorted(self._positive):
+            seen += self._positive[key]
+            if seen > rank:
+                return self._value(key)
+        return self._value(max(self._positive)) if self._positive else 0.0
+
+    def _value(self, key: int) -> float:
+        return 2 * self._gamma ** key / (self._gamma + 1)
+
+    def _collapse(self, store: dict[int, int]) -> None:
+        keys = sorted(store)
+        excess = keys[: len(keys) - self.max_buckets + 1]
+        store[excess[-1]] = sum(store.pop(k) for k in excess[:-1]) + store[excess[-1]]
+
+
+class CaseAggregator:
+    """Running stats and a quantile sketch per (group, metric), fed one record at a time."""
+
+    def __init__(
+        self,
+        quantiles: Sequence[float] = DEFAULT_QUANTILES,
+        relative_accuracy: float = 0.01,
+    ) -> None:
+        self.quantiles = tuple(quantiles)
+        self.relative_accuracy = relative_accuracy
+        self._groups: dict[Hashable, dict[str, tuple[RunningStats, QuantileSketch]]] = {}
+
+    def add(self, group: Hashable, fields: Mapping[str, float]) -> None:
+        metrics = self._groups.setdefault(group, {})
+        for name, value in fields.items():
+            if not math.isfinite(value):
+                continue
+            if name not in metrics:
+                metrics[name] = (RunningStats(), QuantileSketch(self.relative_accuracy))
+            stats, sketch = metrics[name]
+            stats.add(value)
+            sketch.add(value)
+
+    def summary(self, group: Hashable) -> dict[str, dict[str, Any]]:
+        """metric -> count, mean, stddev, min, max and p50/p90/p99 (by default) of a group."""
+        out: dict[str, dict[str, Any]] = {}
+        for name, (stats, sketch) in self._groups.get(group, {}).items():
+            out[name] = {
+                "count": stats.count,
+                "mean": round(stats.mean, 4),
+                "stddev": round(stats.stddev, 4),
+                "min": round(stats.min, 4),
+                "max": round(stats.max, 4),
+            }
+            for q in self.quantiles:
+                # Clamp: a bucket midpoint may fall just outside the observed range
+                estimate = min(max(sketch.quantile(q) or 0.0, stats.min), stats.max)
+                out[name][f"p{q * 100:g}"] = round(estimate, 4)
+        return out
+
+    def pop(self, group: Hashable) -> dict[str, dict[str, Any]]:
+        """A group's summary; its state is dropped."""
+        summary = self.summary(group)
+        self._groups.pop(group, None)
+        return summary
@@ -0,0 +1,117 @@
+"""Content-addressed on-disk cache of deterministic chat responses.
+
+A response is keyed by the backend, the model's digest and the exact request
+payload, so a changed prompt, sampling parameter or re-pulled model never
+reuses a stale answer. Entries live in a small SQLite file and are evicted
+least-recently-used once the cache exceeds its size cap.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any
+
+MODES = ("off", "read", "readwrite")
+
+CACHE_SQL = """\
+CREATE TABLE IF NOT EXISTS responses (
+    key       TEXT PRIMARY KEY,
+    value     TEXT NOT NULL,
+    size      INTEGER NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_responses_last_used ON responses(last_used);
+"""
+
+
+def cache_key(backend: str, model_digest: str | None, payload: dict[str, Any]) -> str:
+    """SHA-256 over a canonical JSON encoding of everything that determines the output."""
+    blob = json.dumps(
+        {"backend": backend, "digest": model_digest, "payload": payload},
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def is_deterministic(payload: dict[str, Any]) -> bool:
+    """Only greedy (temperature 0) requests are worth replaying."""
+    return payload.get("temperature", 1.0) == 0
+
+
+class ResponseCache:
+    """Size-capped LRU response store.
+
+    ``mode`` is ``read`` (serve hits, never write) or ``readwrite``; an ``off``
+    cache is simply not constructed.
+    """
+
+    def __init__(self, path: Path, max_bytes: int = 512 * 1024 * 1024, mode: str = "readwrite"):
+        if mode not in MODES[1:]:
+            raise ValueError(f"cache mode must be 'read' or 'readwrite', got {mode!r}")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(path))
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(CACHE_SQL)
+        self.max_bytes = max_bytes
+        self.mode = mode
+        self.size = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        row = self.conn.execute("SELECT value FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        if self.mode == "readwrite":
+            self.conn.execute(
+                "UPDATE responses SET last_used = ? WHERE key = ?", (time.time(), key)
+            )
+            self.conn.commit()
+        return json.loads(row[0])
+
+    def put(self, key: str, value: dict[str, Any]) -> None:
+        if self.mode != "readwrite":
+            return
+        blob = json.dumps(value, separators=(",", ":"))
+        old = self.conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+        self.conn.execute(
+            "INSERT OR REPLACE INTO responses (key, value, size, last_used) VALUES (?, ?, ?, ?)",
+            (key, blob, len(blob), time.time()),
+        )
+        self.size += len(blob) - (old[0] if old else 0)
+        self.writes += 1
+        self._evict()
+        self.conn.commit()
+
+    def _evict(self) -> None:
+        while self.size > self.max_bytes:
+            row = self.conn.execute(
+                "SELECT key, size FROM responses ORDER BY last_used LIMIT 1"
+            ).fetchone()
+            if row is None:
+                break
+            self.conn.execute("DELETE FROM responses WHERE key = ?", (row[0],))
+            self.size -= row[1]
+            self.evictions += 1
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "hits": self.hits,
+            "misses": self.misses,
+            "writes": self.writes,
+            "evictions": self.evictions,
+            "size_bytes": self.size,
+        }
+
+    def close(self) -> None:
+        self.conn.close()
@@ -2,13 +2,23 @@
 
 from __future__ import annotations
 
+import asyncio
+import csv
+import json
+import sys
+from pathlib import Path
+
 import click
 from rich.console import Console
 from rich.table import Table
 
 from .config import get_settings, load_source
 from .db import init_db
+from .logging import configure_logging
+from .mock_server import FaultPlan, LatencyModel, MockServer
 from .models import ModelRegistry
+from .query import DEFAULT_GROUP_BY, GROUP_COLUMNS, query_rollups
+from .resultfile import export_json
 
 console = Console()
 
@@ -16,6 +26,9 @@ console = Console()
 @click.group()
 def main() -> None:
     """AI Test Harness — benchmark and evaluate local LLMs."""
+    settings = get_settings()
+    if settings.log_path is not None:
+        configure_logging(settings.log_path, sample=settings.log_sample)
 
 
 @main.command()
@@ -71,5 +84,139 @@ def init() -> None:
     console.print(f"[green]Database initialized at {settings.db_path}[/green]")
 
 
+@main.command()
+@click.option("--db", "db_path", type=click.Path(dir_okay=False, path_type=Path),
+              help="Results database. Defaults to HARNESS_DB_PATH (harness.db).")
+@click.option("-m", "--model", "models", multiple=True, help="Model name (exact).")
+@click.option("-c", "--config", "configs", multiple=True, help="Config label substring.")
+@click.option("-s", "--suite", "suites", multiple=True, help="Suite name (exact).")
+@click.option("--metric", "metrics", multiple=True, help="Metric name or glob (cases.*).")
+@click.option("--since", help="Start: 30d, 12h, 2w or an ISO date.")
+@click.option("--until", help="End: same forms as --since; a date includes that whole day.")
+@click.option("--digest", help="Model digest prefix.")
+@click.option(
+    "-g", "--group-by", "group_by", multiple=True, type=click.Choice(sorted(GROUP_COLUMNS)),
+    help=f"Group rows by these, in order. Default: {' '.join(DEFAULT_GROUP_BY)}.",
+)
+@click.option("--format", "fmt", type=click.Choice(["table", "csv", "json"]), default="table",
+              show_default=True)
+@click.option("--limit", type=int, help="Maximum groups to return.")
+def query(
+    db_path: Path | None,
+    models: tuple[str, ...],
+    configs: tuple[str, ...],
+    suites: tuple[str, ...],
+    metrics: tuple[str, ...],
+    since: str | None,
+    until: str | None,
+    digest: str | None,
+    group_by: tuple[str, ...],
+    fmt: str,
+    limit: int | None,
+) -> None:
+    """Slice historical results: mean, stddev and count per group, from the rollups.
+
+    \b
+    Example, tok/s trend for one model and config over 30 days:
+      harness query -m qwen2.5:7b -c precise -s latency --metric avg_tps --since 30d -g day
+    """
+    path = db_path or get_settings().db_path
+    if not path.exists():
+        raise click.ClickException(f"no results database at {path}; run run_tests.py first")
+    conn = init_db(path)
+    try:
+        rows = query_rollups(
+            conn, models=models, configs=configs, suites=suites, metrics=metrics,
+            since=since, until=until, digest=digest,
+            group_by=group_by or DEFAULT_GROUP_BY, limit=limit,
+        )
+    except ValueError as e:
+        raise click.BadParameter(str(e)) from None
+    finally:
+        conn.close()
+
+    if fmt == "json":
+        click.echo(json.dumps(rows, indent=2))
+        return
+    columns = [*(group_by or DEFAULT_GROUP_BY), "runs", "count", "mean", "stddev", "last"]
+    if fmt == "csv":
+        writer = csv.DictWriter(sys.stdout, fieldnames=columns, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(rows)
+        return
+    table = Table(title=f"Results ({len(rows)} group(s))")
+    for col in columns:
+        numeric = col in ("runs", "count", "mean", "stddev")
+        table.add_column(col, justify="right" if numeric else "left",
+                         style="cyan" if col in GROUP_COLUMNS else None)
+    for row in rows:
+        table.add_row(*("" if row[c] is None else str(row[c]) for c in columns))
+    console.print(table)
+
+
+@main.command("export-json")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False, path_type=Path))
+@click.option("-o", "--output", type=click.Path(dir_okay=False, path_type=Path),
+              help="Defaults to the input name with a .json suffix.")
+def export_json_command(path: Path, output: Path | None) -> None:
+    """Export a compact results file (.cjson[.gz|.xz]) in the plain JSON layout."""
+    try:
+        out = export_json(path, output)
+    except ValueError as e:
+        raise click.ClickException(str(e)) from None
+    console.print(f"[green]Exported {path} to {out}[/green]")
+
+
+@main.command()
+@click.option("--host", default="127.0.0.1", show_default=True)
+@click.option("--port", default=11500, show_default=True)
+@click.option("--load-ms", default=2000.0, show_default=True, help="Model load time.")
+@click.option("--prefill-ms", default=0.5, show_default=True, help="Per prompt token.")
+@click.option("--decode-ms", default=20.0, show_default=True, help="Per generated token.")
+@click.option("--jitter", default=0.1, show_default=True, help="+/- fraction on each phase.")
+@click.option("--parallel", default=4, show_default=True, help="Slots before requests queue.")
+@click.option("--error-rate", default=0.0, show_default=True, help="Share of 500 responses.")
+@click.option("--timeout-rate", default=0.0, show_default=True, help="Share of hung requests.")
+@click.option("--truncate-rate", default=0.0, show_default=True, help="Share cut off halfway.")
+@click.option("--answer", default="ok", show_default=True, help="Default reply.")
+@click.option(
+    "--script",
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    help="JSON object mapping prompt substrings to replies.",
+)
+def mock_server(
+    host: str,
+    port: int,
+    load_ms: float,
+    prefill_ms: float,
+    decode_ms: float,
+    jitter: float,
+    parallel: int,
+    error_rate: float,
+    timeout_rate: float,
+    truncate_rate: float,
+    answer: str,
+    script: Path | None,
+) -> None:
+    """Serve a mock Ollama/OpenAI-compatible endpoint for harness testing."""
+    server = MockServer(
+        latency=LatencyModel(load_ms, prefill_ms, decode_ms, jitter, parallel),
+        faults=FaultPlan(error_rate, timeout_rate, truncate_rate),
+        script=json.loads(script.read_text(encoding="utf-8")) if script else None,
+        default_answer=answer,
+    )
+
+    async def serve() -> None:
+        listener = await server.serve(host, port)
+        console.print(f"[green]Mock server listening on http://{host}:{port}[/green]")
+        async with listener:
+            await listener.serve_forever()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        console.print(f"Served {server.stats['requests']} request(s)")
+
+
 if __name__ == "__main__":
     main()
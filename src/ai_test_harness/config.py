@@ -37,8 +37,23 @@ class Settings(BaseSettings):
         default="http://localhost:11434",
         description="Base URL of the running inference server.",
     )
+    endpoints: list[str] = Field(
+        default_factory=list,
+        description="Inference server URLs to balance across. Empty means [base_url].",
+    )
+    log_path: Path | None = Field(
+        default=None,
+        description="NDJSON log file, written from a background thread. Unset logs to stderr.",
+    )
+    log_sample: dict[str, float] = Field(
+        default_factory=dict,
+        description='Fraction of each event\'s log records to keep, e.g. {"result_recorded": 0.1}.',
+    )
     hardware: HardwareProfile = Field(default_factory=HardwareProfile)
 
+    def endpoint_urls(self) -> list[str]:
+        return self.endpoints or [self.base_url]
+
 
 def load_source(path: Path) -> dict[str, Any]:
     """Load and validate the model catalog from source.json."""
@@ -1,12 +1,16 @@
-"""SQLite database management with schema versioning."""
+"""SQLite database management with schema versioning.
+
+A new database gets the version 1 schema and then every migration in order;
+an existing one gets the migrations above its recorded version. Each
+migration runs in its own transaction together with its version bump.
+"""
 
 from __future__ import annotations
 
+import math
 import sqlite3
 from pathlib import Path
 
-SCHEMA_VERSION = 1
-
 SCHEMA_SQL = """\
 CREATE TABLE IF NOT EXISTS schema_version (
     version INTEGER NOT NULL
@@ -39,12 +43,137 @@ CREATE TABLE IF NOT EXISTS test_results (
 """
 
 
+# (version, SQL) in order; a migration's SQL must not COMMIT
+MIGRATIONS: list[tuple[int, str]] = [
+    # 2: config/digest columns for filtering, and indexes for the hot lookups
+    (2, """\
+ALTER TABLE test_runs ADD COLUMN config_label TEXT;
+ALTER TABLE test_runs ADD COLUMN model_digest TEXT;
+-- run_tests.py names its tests "<config label> | <suite>"
+UPDATE test_runs
+   SET config_label = substr(test_name, 1, length(test_name) - length(test_suite) - 3)
+ WHERE test_name LIKE '% | ' || test_suite;
+
+-- Covering: "latest value of a metric for a model/test" reads only the index
+CREATE INDEX IF NOT EXISTS idx_results_metric
+    ON test_results (model_name, test_name, metric_name, created_at, metric_value);
+-- Per-test lookups: the foreign key, and deleting a test's rows to re-write it
+CREATE INDEX IF NOT EXISTS idx_results_test
+    ON test_results (run_id, model_name, test_name);
+CREATE INDEX IF NOT EXISTS idx_runs_model_suite
+    ON test_runs (model_name, test_suite, created_at);
+CREATE INDEX IF NOT EXISTS idx_runs_config ON test_runs (config_label, created_at);
+"""),
+    # 3: per (run, model, test, metric) rollups, kept current by triggers
+    (3, """\
+CREATE TABLE IF NOT EXISTS suite_rollups (
+    run_id      TEXT    NOT NULL,
+    model_name  TEXT    NOT NULL,
+    test_name   TEXT    NOT NULL,
+    metric_name TEXT    NOT NULL,
+    n           INTEGER NOT NULL,
+    total       REAL    NOT NULL,
+    total_sq    REAL    NOT NULL,
+    created_at  TEXT    NOT NULL,  -- earliest row: when the run measured this
+    PRIMARY KEY (run_id, model_name, test_name, metric_name)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_rollups_metric
+    ON suite_rollups (model_name, metric_name, created_at);
+
+INSERT INTO suite_rollups
+SELECT run_id, model_name, test_name, metric_name,
+       COUNT(*), SUM(metric_value), SUM(metric_value * metric_value), MIN(created_at)
+  FROM test_results
+ WHERE metric_value IS NOT NULL
+ GROUP BY run_id, model_name, test_name, metric_name;
+
+CREATE TRIGGER IF NOT EXISTS test_results_rollup_insert
+AFTER INSERT ON test_results WHEN NEW.metric_value IS NOT NULL
+BEGIN
+    INSERT INTO suite_rollups VALUES (
+        NEW.run_id, NEW.model_name, NEW.test_name, NEW.metric_name,
+        1, NEW.metric_value, NEW.metric_value * NEW.metric_value, NEW.created_at
+    )
+    ON CONFLICT (run_id, model_name, test_name, metric_name) DO UPDATE SET
+        n = n + 1,
+        total = total + excluded.total,
+        total_sq = total_sq + excluded.total_sq,
+        created_at = min(created_at, excluded.created_at);
+END;
+
+CREATE TRIGGER IF NOT EXISTS test_results_rollup_delete
+AFTER DELETE ON test_results WHEN OLD.metric_value IS NOT NULL
+BEGIN
+    UPDATE suite_rollups
+       SET n = n - 1,
+           total = total - OLD.metric_value,
+           total_sq = total_sq - OLD.metric_value * OLD.metric_value
+     WHERE run_id = OLD.run_id AND model_name = OLD.model_name
+       AND test_name = OLD.test_name AND metric_name = OLD.metric_name;
+    DELETE FROM suite_rollups
+     WHERE run_id = OLD.run_id AND model_name = OLD.model_name
+       AND test_name = OLD.test_name AND metric_name = OLD.metric_name AND n <= 0;
+END;
+
+-- What dashboards and `harness query` read: one row per run/model/test/metric
+CREATE VIEW IF NOT EXISTS suite_rollup_stats AS
+SELECT r.run_id, r.model_name, t.config_label, t.test_suite, r.test_name, t.model_digest,
+       t.backend, r.metric_name, r.n AS count, r.total / r.n AS mean,
+       CASE WHEN r.n > 1
+            THEN sqrt(max((r.total_sq - r.total * r.total / r.n) / (r.n - 1), 0.0))
+            ELSE 0.0 END AS stddev,
+       r.created_at
+  FROM suite_rollups r
+  LEFT JOIN test_runs t USING (run_id, model_name, test_name);
+"""),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def migrate(conn: sqlite3.Connection) -> list[int]:
+    """Apply the migrations above the database's version; returns the versions applied."""
+    row = conn.execute("SELECT version FROM schema_version").fetchone()
+    current = row[0] if row else None
+    if current is None or current > SCHEMA_VERSION:
+        raise RuntimeError(
+            f"Database schema version mismatch: expected at most {SCHEMA_VERSION}, "
+            f"got {current if current is not None else 'NULL'}. Upgrade ai_test_harness."
+        )
+    applied = []
+    for version, sql in MIGRATIONS:
+        if version <= current:
+            continue
+        try:
+            conn.executescript(
+                f"BEGIN;\n{sql}\nUPDATE schema_version SET version = {version};\nCOMMIT;"
+            )
+        except sqlite3.Error:
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+        applied.append(version)
+    return applied
+
+
+def _has_sqrt(conn: sqlite3.Connection) -> bool:
+    try:
+        conn.execute("SELECT sqrt(4)")
+    except sqlite3.OperationalError:
+        return False
+    return True
+
+
 def init_db(db_path: Path) -> sqlite3.Connection:
-    """Open database, enforce pragmas, apply schema if needed."""
+    """Open database, enforce pragmas, apply schema and pending migrations."""
     conn = sqlite3.connect(str(db_path))
     conn.execute("PRAGMA journal_mode=WAL")
     conn.execute("PRAGMA foreign_keys=ON")
     conn.execute("PRAGMA busy_timeout=5000")
+    # suite_rollup_stats needs sqrt(); SQLite builds without math functions get Python's
+    if not _has_sqrt(conn):
+        conn.create_function("sqrt", 1, math.sqrt, deterministic=True)
 
     existing = conn.execute(
         "SELECT name FROM sqlite_master WHERE type='table' AND name='schema_version'"
@@ -52,13 +181,7 @@ def init_db(db_path: Path) -> sqlite3.Connection:
 
     if existing is None:
         conn.executescript(SCHEMA_SQL)
-        conn.execute("INSERT INTO schema_version (version) VALUES (?)", (SCHEMA_VERSION,))
+        conn.execute("INSERT INTO schema_version (version) VALUES (1)")
         conn.commit()
-    else:
-        row = conn.execute("SELECT version FROM schema_version").fetchone()
-        if row is None or row[0] != SCHEMA_VERSION:
-            raise RuntimeError(
-                f"Database schema version mismatch: expected {SCHEMA_VERSION}, "
-                f"got {row[0] if row else 'NULL'}. Run migrations."
-            )
+    migrate(conn)
     return conn
@@ -0,0 +1,97 @@
+"""Bounded-concurrency case executor — fan test cases out, keep results in order."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+from collections.abc import Awaitable, Callable, Iterable
+from contextlib import AbstractAsyncContextManager
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class CaseExecutor:
+    """Runs per-case coroutines with a per-suite and per-endpoint concurrency limit.
+
+    Results are returned in input order regardless of completion order, and the
+    optional ``on_result`` callback fires in input order as soon as every earlier
+    case has finished, so per-case printing stays deterministic.
+    """
+
+    def __init__(self, suite_limit: int = 1, endpoint_limit: int = 4) -> None:
+        if suite_limit < 1 or endpoint_limit < 1:
+            raise ValueError("concurrency limits must be >= 1")
+        self.suite_limit = suite_limit
+        self.endpoint_limit = endpoint_limit
+        self._endpoint_sems: dict[str, asyncio.Semaphore] = {}
+
+    def _endpoint_sem(self, endpoint: str) -> asyncio.Semaphore:
+        sem = self._endpoint_sems.get(endpoint)
+        if sem is None:
+            sem = asyncio.Semaphore(self.endpoint_limit)
+            self._endpoint_sems[endpoint] = sem
+        return sem
+
+    def slot(self, endpoint: str = "default") -> asyncio.Semaphore:
+        """The endpoint's request slots, for a ``fn`` that map() runs with ``endpoint=None``."""
+        return self._endpoint_sem(endpoint)
+
+    async def map(
+        self,
+        items: Iterable[T],
+        fn: Callable[[T], Awaitable[R]],
+        *,
+        endpoint: str | None = "default",
+        limit: int | None = None,
+        serial: bool = False,
+        on_result: Callable[[R], Any] | None = None,
+    ) -> list[R]:
+        """Run ``fn`` over ``items`` and return the results in input order.
+
+        ``serial=True`` forces one case at a time (for timing-sensitive suites).
+        Each case holds one of ``endpoint``'s slots while it runs; with None it
+        holds none, and ``fn`` takes ``slot()`` itself around its requests only.
+        The first exception cancels the remaining cases and is re-raised as-is.
+        """
+        items = list(items)
+        endpoint_sem: AbstractAsyncContextManager[Any] = (
+            self._endpoint_sem(endpoint) if endpoint is not None else contextlib.nullcontext()
+        )
+        suite_limit = 1 if serial else min(limit or self.suite_limit, len(items) or 1)
+
+        if suite_limit == 1:
+            results: list[R] = []
+            for item in items:
+                async with endpoint_sem:
+                    result = await fn(item)
+                results.append(result)
+                if on_result is not None:
+                    on_result(result)
+            return results
+
+        suite_sem = asyncio.Semaphore(suite_limit)
+        finished: dict[int, R] = {}
+        next_to_report = 0
+
+        async def run_one(idx: int, item: T) -> R:
+            nonlocal next_to_report
+            async with suite_sem, endpoint_sem:
+                result = await fn(item)
+            finished[idx] = result
+            # Release results strictly in input order
+            while next_to_report in finished:
+                if on_result is not None:
+                    on_result(finished[next_to_report])
+                next_to_report += 1
+            return result
+
+        tasks = [asyncio.ensure_future(run_one(i, item)) for i, item in enumerate(items)]
+        try:
+            return list(await asyncio.gather(*tasks))
+        except BaseException:
+            for t in tasks:
+                t.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
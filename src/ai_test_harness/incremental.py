@@ -0,0 +1,96 @@
+"""Content hashes of test cases and lookup of earlier results, for incremental runs.
+
+A case's hash covers everything that decides what the harness sends for it and
+how the answer is scored. Callables (suite runners, graders, per-case
+validators) are hashed by their source code and their compiled code (a
+lambda's source as ``inspect`` finds it is only its first line), so editing
+one invalidates exactly the cases that depend on it. Earlier results whose
+records carry the same hash can then be merged in instead of querying the
+model again.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import inspect
+import json
+import types
+from collections.abc import Collection, Iterable
+from pathlib import Path
+from typing import Any
+
+from .resultfile import load_results, result_files
+
+
+def _code(code: types.CodeType) -> list[Any]:
+    """A code object's bytecode, constants and names, nested code objects included."""
+    consts = [
+        _code(c) if isinstance(c, types.CodeType)
+        else sorted(map(repr, c)) if isinstance(c, frozenset)  # set order varies by process
+        else repr(c)
+        for c in code.co_consts
+    ]
+    return [code.co_code.hex(), consts, list(code.co_names)]
+
+
+def _stable(obj: Any) -> Any:
+    """JSON stand-in for values json cannot encode, stable across processes."""
+    if callable(obj):
+        try:
+            source = inspect.getsource(obj)
+        except (OSError, TypeError):
+            source = getattr(obj, "__qualname__", type(obj).__name__)
+        code = getattr(obj, "__code__", None)
+        return [source, _code(code)] if isinstance(code, types.CodeType) else source
+    if isinstance(obj, (set, frozenset)):
+        return sorted(obj, key=repr)
+    return repr(obj)
+
+
+def fingerprint(*parts: Any) -> str:
+    """SHA-256 over a canonical JSON encoding of ``parts``."""
+    blob = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=_stable)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def recent_results(results_dir: Path) -> list[Path]:
+    """Result files in ``results_dir`` (either format), newest first."""
+    return sorted(result_files(results_dir), key=lambda p: p.stat().st_mtime, reverse=True)
+
+
+def index_results(
+    paths: Iterable[Path],
+    records_keys: dict[str, str],
+    wanted: Collection[tuple[str, str]] | None = None,
+) -> dict[tuple[str, str], dict[str, Any]]:
+    """Map ``(suite, input_hash)`` to a stored case record, the first path winning.
+
+    ``records_keys`` names, per suite, where a suite result keeps its case
+    records. Records written before hashes existed, and unreadable files, are
+    skipped. With ``wanted``, only those keys are kept, and no further file is
+    read once all of them are found.
+    """
+    index: dict[tuple[str, str], dict[str, Any]] = {}
+    missing = set(wanted) if wanted is not None else None
+    for path in paths:
+        try:
+            data = load_results(path)
+        except (OSError, ValueError):
+            continue
+        for run in data.get("configs_run", []):
+            for suite, result in run.get("suites", {}).items():
+                key = records_keys.get(suite)
+                if key is None or not isinstance(result, dict):
+                    continue
+                for record in result.get(key, []):
+                    if "error" in record or not record.get("input_hash"):
+                        continue
+                    found = (suite, record["input_hash"])
+                    if missing is None:
+                        index.setdefault(found, record)
+                    elif found in missing:
+                        index[found] = record
+                        missing.discard(found)
+        if missing is not None and not missing:
+            break
+    return index
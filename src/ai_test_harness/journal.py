@@ -0,0 +1,141 @@
+"""Append-only, crash-safe journal of a matrix run.
+
+Every completed case and suite is appended as one JSON line, so an interrupted
+run (crash, Ctrl-C, a server OOM) keeps everything finished so far and can be
+resumed. Lines are flushed to the OS as they are written, which survives the
+process dying; ``fsync`` runs in batches so durability against power loss
+costs almost nothing per case.
+
+Line types: ``run`` (header with the run's arguments), ``case``, ``suite``
+and ``end``.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+
+@dataclass
+class JournalState:
+    """What a journal says is already done."""
+
+    header: dict[str, Any] = field(default_factory=dict)
+    cases: dict[tuple[str, str, str], dict[str, Any]] = field(default_factory=dict)
+    suites: dict[tuple[str, str], dict[str, Any]] = field(default_factory=dict)
+    finished: bool = False
+
+
+def read_journal(path: Path) -> JournalState:
+    """Replay a journal; a torn final line from a crash is ignored."""
+    state = JournalState()
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            kind = entry.get("type")
+            if kind == "run":
+                state.header = entry
+            elif kind == "case":
+                state.cases[(entry["config"], entry["suite"], entry["case_id"])] = entry["record"]
+            elif kind == "suite":
+                state.suites[(entry["config"], entry["suite"])] = entry["result"]
+            elif kind == "end":
+                state.finished = True
+    return state
+
+
+class RunJournal:
+    """Writes a run's journal and answers "is this already done?" when resuming.
+
+    ``state`` holds only what was replayed from an earlier run; entries written
+    since go to disk but are not kept, so memory does not grow with the run.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        state: JournalState | None = None,
+        fsync_every: int = 32,
+        fsync_interval_s: float = 2.0,
+    ) -> None:
+        self.path = path
+        self.state = state or JournalState()
+        self.fsync_every = fsync_every
+        self.fsync_interval_s = fsync_interval_s
+        path.parent.mkdir(parents=True, exist_ok=True)
+        torn = False
+        if path.exists() and path.stat().st_size:
+            with open(path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                torn = f.read(1) != b"\n"
+        self._file = open(path, "a", encoding="utf-8")
+        if torn:
+            self._file.write("\n")  # end a line cut short by a crash so appends start clean
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    @classmethod
+    def create(cls, path: Path, run_id: str, args: dict[str, Any]) -> RunJournal:
+        journal = cls(path)
+        journal._append({"type": "run", "run_id": run_id, "args": args, "started": time.time()})
+        journal.state.header = {"run_id": run_id, "args": args}
+        return journal
+
+    @classmethod
+    def resume(cls, path: Path) -> RunJournal:
+        state = read_journal(path)
+        if not state.header:
+            raise ValueError(f"{path} is not a run journal (no header line)")
+        return cls(path, state)
+
+    @property
+    def run_id(self) -> str:
+        return self.state.header["run_id"]
+
+    def completed_case(self, config: str, suite: str, case_id: str) -> dict[str, Any] | None:
+        return self.state.cases.get((config, suite, case_id))
+
+    def completed_suite(self, config: str, suite: str) -> dict[str, Any] | None:
+        return self.state.suites.get((config, suite))
+
+    def record_case(self, config: str, suite: str, case_id: str, record: dict[str, Any]) -> None:
+        self._append({
+            "type": "case", "config": config, "suite": suite, "case_id": case_id, "record": record,
+        })
+
+    def record_suite(self, config: str, suite: str, result: dict[str, Any]) -> None:
+        self._append({"type": "suite", "config": config, "suite": suite, "result": result})
+
+    def finish(self) -> None:
+        """Mark the run complete and close the journal."""
+        self._append({"type": "end", "finished": time.time()})
+        self.state.finished = True
+        self.close()
+
+    def _append(self, entry: dict[str, Any]) -> None:
+        self._file.write(json.dumps(entry, default=str) + "\n")
+        self._file.flush()
+        self._unsynced += 1
+        if (
+            self._unsynced >= self.fsync_every
+            or time.monotonic() - self._last_sync >= self.fsync_interval_s
+        ):
+            self.sync()
+
+    def sync(self) -> None:
+        if self._unsynced:
+            os.fsync(self._file.fileno())
+            self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self.sync()
+            self._file.close()
@@ -0,0 +1,118 @@
+"""Model warm-up, preload and keep_alive management.
+
+Ollama loads a model on its first request and unloads it after ``keep_alive``
+idles out. Left alone, that load time lands in whichever case happens to run
+first. The lifecycle manager loads each (model, num_ctx) explicitly before its
+suites start, so load cost is measured once and kept out of per-case numbers,
+and unloads the model (``keep_alive=0``) once its configs are done.
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import asdict, dataclass
+from typing import Any
+
+import httpx
+
+from .logging import log_event
+
+NS = 1e9
+
+
+@dataclass
+class LoadRecord:
+    model: str
+    num_ctx: int
+    load_s: float  # server-reported load_duration; 0.0 when already resident
+    wall_s: float  # preload round trip including overhead
+
+
+class ModelLifecycle:
+    """Preloads models before use and unloads them after, optionally pinning them.
+
+    ``keep_alive`` accepts Ollama's values: a duration such as ``"10m"``,
+    seconds, or ``-1`` to keep a model loaded until it is unloaded explicitly.
+    Pinned models use ``-1`` and stay resident until ``close()``.
+    """
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        keep_alive: str | int = "10m",
+        pin: bool = False,
+        timeout: float = 300.0,
+    ) -> None:
+        self.client = client
+        self.keep_alive: str | int = -1 if pin else keep_alive
+        self.pin = pin
+        self.timeout = timeout
+        self.loads: list[LoadRecord] = []
+        self.resident: set[str] = set()
+
+    async def _generate(self, body: dict[str, Any]) -> dict[str, Any]:
+        # /api/generate with no prompt only loads or unloads the model
+        resp = await self.client.post(
+            "/api/generate", json=body, timeout=httpx.Timeout(self.timeout, connect=10.0)
+        )
+        resp.raise_for_status()
+        return resp.json()
+
+    async def preload(self, model: str, num_ctx: int) -> LoadRecord | None:
+        """Load ``model`` with ``num_ctx`` and hold it for ``keep_alive``.
+
+        Returns None if the server refused; the suites then load on first use.
+        """
+        start = time.perf_counter()
+        try:
+            data = await self._generate(
+                {"model": model, "keep_alive": self.keep_alive, "options": {"num_ctx": num_ctx}}
+            )
+        except (httpx.HTTPError, ValueError) as e:
+            log_event("model_preload_failed", model=model, level="warning", error=str(e))
+            return None
+        record = LoadRecord(
+            model=model,
+            num_ctx=num_ctx,
+            load_s=data.get("load_duration", 0) / NS,
+            wall_s=time.perf_counter() - start,
+        )
+        self.loads.append(record)
+        self.resident.add(model)
+        log_event("model_preloaded", model=model, num_ctx=num_ctx, load_s=round(record.load_s, 3))
+        return record
+
+    async def unload(self, model: str) -> None:
+        """Ask the server to drop ``model`` now (``keep_alive=0``)."""
+        try:
+            await self._generate({"model": model, "keep_alive": 0})
+        except (httpx.HTTPError, ValueError) as e:
+            log_event("model_unload_failed", model=model, level="warning", error=str(e))
+            return
+        self.resident.discard(model)
+        log_event("model_unloaded", model=model)
+
+    async def release(self, model: str) -> None:
+        """Done with ``model``: unload it unless models are pinned for the run."""
+        if not self.pin:
+            await self.unload(model)
+
+    async def close(self) -> None:
+        """Unload everything still resident (pinned models)."""
+        for model in sorted(self.resident):
+            await self.unload(model)
+
+    def load_for(self, model: str, num_ctx: int) -> LoadRecord | None:
+        """The most recent preload of (model, num_ctx), if any."""
+        for record in reversed(self.loads):
+            if (record.model, record.num_ctx) == (model, num_ctx):
+                return record
+        return None
+
+    def report(self) -> dict[str, Any]:
+        return {
+            "keep_alive": self.keep_alive,
+            "pinned": self.pin,
+            "loads": [asdict(r) for r in self.loads],
+            "total_load_s": round(sum(r.load_s for r in self.loads), 3),
+        }
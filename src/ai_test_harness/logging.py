@@ -1,12 +1,155 @@
-"""Structured JSON logging."""
+"""Structured JSON logging.
+
+By default ``log_event`` prints each record to stderr. After
+``configure_logging(path)`` records go to a ``LogSink`` instead: log_event only
+samples the record and puts it on a bounded queue, and a background thread
+serialises the queue to a rotating NDJSON file. When the queue is full the
+record is dropped and counted, so logging never blocks a run.
+"""
 
 from __future__ import annotations
 
+import atexit
 import json
+import queue
+import random
 import sys
+import threading
 import time
+from collections.abc import Mapping
+from pathlib import Path
 from typing import Any
 
+_CLOSE = object()
+
+
+class LogSink:
+    """Buffered, sampled, rotating NDJSON log writer with a background thread.
+
+    ``sample`` maps event names to the fraction of their records to keep (the
+    rest are counted in ``sampled_out``); kept records of a sampled event carry
+    ``sample_rate`` so counts can be re-weighted. Before a line would take the
+    file past ``max_bytes`` it rotates to ``.1`` .. ``.<backups>``. Records
+    dropped because the queue was full are reported in the file as a
+    ``log_records_dropped`` event.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        max_bytes: int = 64 * 1024 * 1024,
+        backups: int = 3,
+        sample: Mapping[str, float] | None = None,
+        queue_size: int = 10_000,
+        flush_s: float = 0.5,
+    ) -> None:
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.sample = dict(sample or {})
+        self.flush_s = flush_s
+        self.stats = {"written": 0, "dropped": 0, "sampled_out": 0, "rotations": 0, "errors": 0}
+        self._queue: queue.Queue[Any] = queue.Queue(queue_size)
+        self._reported_drops = 0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "a", encoding="utf-8")  # closed by the thread
+        self._thread = threading.Thread(target=self._run, name="log-sink", daemon=True)
+        self._thread.start()
+
+    def emit(self, record: dict[str, Any]) -> None:
+        """Queue a record; never blocks."""
+        rate = self.sample.get(record.get("event", ""), 1.0)
+        if rate < 1.0:
+            if random.random() >= rate:
+                self.stats["sampled_out"] += 1
+                return
+            record["sample_rate"] = rate
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.stats["dropped"] += 1
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Write what is queued and stop the thread."""
+        if not self._thread.is_alive():
+            return
+        try:
+            self._queue.put(_CLOSE, timeout=timeout)
+        except queue.Full:
+            pass  # the thread is wedged; it is a daemon, so exit anyway
+        self._thread.join(timeout)
+
+    def _run(self) -> None:
+        done = False
+        while not done:
+            try:
+                batch = [self._queue.get(timeout=self.flush_s)]
+            except queue.Empty:
+                batch = []
+            while batch and len(batch) < 1000:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if _CLOSE in batch:
+                batch = [r for r in batch if r is not _CLOSE]
+                done = True
+            dropped = self.stats["dropped"]
+            if dropped > self._reported_drops:
+                batch.append({"ts": time.time(), "level": "warning", "event": "log_records_dropped",
+                              "dropped": dropped - self._reported_drops})
+                self._reported_drops = dropped
+            if batch:
+                self._write(batch)
+        self._file.close()
+
+    def _write(self, batch: list[dict[str, Any]]) -> None:
+        try:
+            for record in batch:
+                line = json.dumps(record, default=str) + "\n"
+                size = self._file.tell()
+                if size and size + len(line) > self.max_bytes:
+                    self._rotate()
+                self._file.write(line)
+                self.stats["written"] += 1
+            self._file.flush()
+        except Exception:
+            self.stats["errors"] += 1  # logging failures must not crash the run
+
+    def _rotate(self) -> None:
+        self._file.close()
+        if self.backups > 0:
+            for i in range(self.backups - 1, 0, -1):
+                older = self.path.with_name(f"{self.path.name}.{i}")
+                if older.exists():
+                    older.replace(self.path.with_name(f"{self.path.name}.{i + 1}"))
+            self.path.replace(self.path.with_name(f"{self.path.name}.1"))
+        self._file = open(self.path, "w", encoding="utf-8")
+        self.stats["rotations"] += 1
+
+
+_sink: LogSink | None = None
+
+
+def configure_logging(path: Path | None, **options: Any) -> LogSink | None:
+    """Send log_event records to a LogSink at ``path`` (None: back to stderr).
+
+    ``options`` are LogSink's. A previous sink is closed first; the last one
+    is closed at interpreter exit, so queued records are not lost.
+    """
+    global _sink
+    if _sink is not None:
+        _sink.close()
+    _sink = LogSink(path, **options) if path is not None else None
+    return _sink
+
+
+@atexit.register
+def _close_sink() -> None:
+    if _sink is not None:
+        _sink.close()
+
 
 def log_event(
     event: str,
@@ -16,7 +159,7 @@ def log_event(
     level: str = "info",
     **extra: Any,
 ) -> None:
-    """Write a structured JSON log line to stderr."""
+    """Write a structured JSON log record to the configured sink, or stderr."""
     record: dict[str, Any] = {
         "ts": time.time(),
         "level": level,
@@ -27,6 +170,9 @@ def log_event(
     if model is not None:
         record["model"] = model
     record.update(extra)
+    if _sink is not None:
+        _sink.emit(record)
+        return
     try:
         print(json.dumps(record), file=sys.stderr)
     except Exception:
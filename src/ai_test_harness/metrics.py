@@ -0,0 +1,288 @@
+"""Live run metrics in the Prometheus text exposition format.
+
+``HarnessMetrics`` holds the series a run updates as it goes: cases completed
+and in flight, request rate, prompt/completion token throughput, request
+latency histograms per model and suite, errors and timeouts, and cache hit
+rates. ``MetricsServer`` serves them at ``GET /metrics`` for a local
+Prometheus to scrape. Plain counters, gauges and histograms are implemented
+here (no client library); rates over the last ``window_s`` are exported as
+gauges next to the ``_total`` counters, for dashboards that do not use rate().
+"""
+
+from __future__ import annotations
+
+import asyncio
+import bisect
+import math
+import time
+from collections import deque
+from collections.abc import Callable, Iterator, Sequence
+from contextlib import contextmanager
+from typing import Any
+
+import httpx
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+def error_kind(error: BaseException) -> str:
+    """The ``kind`` label of a failed request: timeout, http, transport or other."""
+    if isinstance(error, httpx.TimeoutException | TimeoutError):
+        return "timeout"
+    if isinstance(error, httpx.HTTPStatusError):
+        return "http"
+    if isinstance(error, httpx.TransportError):
+        return "transport"
+    return "other"
+
+
+class _Family:
+    """One metric name with its label names; ``kind`` is its Prometheus TYPE."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values: dict[tuple[str, ...], Any] = {}
+
+    def _key(self, labels: dict[str, Any]) -> tuple[str, ...]:
+        if set(labels) != set(self.labels):
+            raise ValueError(f"{self.name} takes labels {self.labels}, got {sorted(labels)}")
+        return tuple(str(labels[n]) for n in self.labels)
+
+    def _selector(self, key: tuple[str, ...], extra: str = "") -> str:
+        pairs = [f'{n}="{_escape(v)}"' for n, v in zip(self.labels, key)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for key, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{self._selector(key)} {_number(value)}")
+        return lines
+
+
+class Counter(_Family):
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def set(self, total: float, **labels: Any) -> None:
+        """For totals mirrored from another object's own counter."""
+        self._values[self._key(labels)] = total
+
+
+class Gauge(_Family):
+    kind = "gauge"
+
+    def set(self, value: float, **labels: Any) -> None:
+        self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+
+class Histogram(_Family):
+    kind = "histogram"
+
+    def __init__(
+        self, name: str, help: str, labels: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> None:
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        counts, total = self._values.get(key, ([0] * (len(self.buckets) + 1), 0.0))
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        self._values[key] = (counts, total + value)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for key, (counts, total) in sorted(self._values.items()):
+            cumulative = 0
+            for bound, n in zip((*self.buckets, math.inf), counts):
+                cumulative += n
+                le = f'le="{_number(bound)}"'
+                lines.append(f"{self.name}_bucket{self._selector(key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{self._selector(key)} {_number(total)}")
+            lines.append(f"{self.name}_count{self._selector(key)} {cumulative}")
+        return lines
+
+
+class RateWindow:
+    """Sum of amounts added over the last ``window_s`` seconds, per second."""
+
+    def __init__(self, window_s: float = 60.0, clock: Callable[[], float] = time.monotonic):
+        self.window_s = window_s
+        self._clock = clock
+        self._start = clock()
+        self._events: deque[tuple[float, float]] = deque()
+        self._sum = 0.0
+
+    def add(self, amount: float = 1.0) -> None:
+        self._events.append((self._clock(), amount))
+        self._sum += amount
+
+    def rate(self) -> float:
+        now = self._clock()
+        while self._events and self._events[0][0] < now - self.window_s:
+            self._sum -= self._events.popleft()[1]
+        span = min(self.window_s, now - self._start)
+        return self._sum / span if span > 0 else 0.0
+
+
+class HarnessMetrics:
+    """The series a matrix run exports; run_tests.py calls the record_* hooks."""
+
+    def __init__(self, window_s: float = 60.0) -> None:
+        self.window_s = window_s
+        self.cases = Counter("harness_cases_completed_total", "Cases finished.",
+                             ("model", "suite", "outcome"))
+        self.in_flight = Gauge("harness_cases_in_flight", "Cases currently running.")
+        self.requests = Counter("harness_requests_total", "Chat requests answered.",
+                                ("model", "suite"))
+        self.request_rate = Gauge("harness_requests_per_second",
+                                  f"Chat requests per second over the last {window_s:g}s.")
+        self.tokens = Counter("harness_tokens_total", "Tokens processed, by kind.",
+                              ("model", "kind"))
+        self.token_rate = Gauge("harness_tokens_per_second",
+                                f"Tokens per second over the last {window_s:g}s, by kind.",
+                                ("kind",))
+        self.latency = Histogram("harness_request_duration_seconds",
+                                 "Chat request wall time.", ("model", "suite"))
+        self.errors = Counter("harness_request_errors_total",
+                              "Failed chat requests, by kind (timeout, http, transport, other).",
+                              ("model", "suite", "kind"))
+        self.suite_errors = Counter("harness_suite_errors_total", "Suites that raised.",
+                                    ("model", "suite"))
+        self.code_timeouts = Counter("harness_code_timeouts_total",
+                                     "Generated-code runs killed at the time limit (not cached).")
+        self.cache_lookups = Counter("harness_cache_lookups_total",
+                                     "Cache lookups, by cache and result (hit, miss).",
+                                     ("cache", "result"))
+        self.cache_hit_ratio = Gauge("harness_cache_hit_ratio", "Hits per lookup, by cache.",
+                                     ("cache",))
+        self.configs = Gauge("harness_configs", "Configs in the run, by state.", ("state",))
+        self.up = Gauge("harness_run_start_time_seconds", "Unix time the run started.")
+        self.up.set(time.time())
+        self._request_window = RateWindow(window_s)
+        self._token_windows = {k: RateWindow(window_s) for k in ("prompt", "completion")}
+        # Called before each scrape, to mirror counters kept elsewhere (caches, sandbox)
+        self.collectors: list[Callable[[HarnessMetrics], None]] = []
+
+    @contextmanager
+    def case(self, model: str, suite: str) -> Iterator[None]:
+        """Count the block as a case in flight, then as completed (ok, or error if it raised)."""
+        self.in_flight.inc()
+        outcome = "error"
+        try:
+            yield
+            outcome = "ok"
+        finally:
+            self.in_flight.inc(-1)
+            self.cases.inc(model=model, suite=suite, outcome=outcome)
+
+    def record_request(
+        self, model: str, suite: str, seconds: float,
+        prompt_tokens: int = 0, completion_tokens: int = 0,
+    ) -> None:
+        self.requests.inc(model=model, suite=suite)
+        self.latency.observe(seconds, model=model, suite=suite)
+        self._request_window.add()
+        for kind, n in (("prompt", prompt_tokens), ("completion", completion_tokens)):
+            if n:
+                self.tokens.inc(n, model=model, kind=kind)
+                self._token_windows[kind].add(n)
+
+    def record_request_error(self, model: str, suite: str, error: BaseException) -> None:
+        self.errors.inc(model=model, suite=suite, kind=error_kind(error))
+
+    def record_cache(self, cache: str, hits: int, misses: int) -> None:
+        self.cache_lookups.set(hits, cache=cache, result="hit")
+        self.cache_lookups.set(misses, cache=cache, result="miss")
+        if hits + misses:
+            self.cache_hit_ratio.set(hits / (hits + misses), cache=cache)
+
+    def snapshot(self) -> dict[str, float]:
+        """Current rates and error totals, for a progress display."""
+        errors = self.errors._values
+        return {
+            "requests_per_s": self._request_window.rate(),
+            "prompt_tok_s": self._token_windows["prompt"].rate(),
+            "completion_tok_s": self._token_windows["completion"].rate(),
+            "request_errors": sum(errors.values()),
+            "timeouts": sum(v for key, v in errors.items() if key[-1] == "timeout"),
+            "suite_errors": sum(self.suite_errors._values.values()),
+        }
+
+    def render(self) -> str:
+        for collect in self.collectors:
+            collect(self)
+        self.request_rate.set(self._request_window.rate())
+        for kind, window in self._token_windows.items():
+            self.token_rate.set(window.rate(), kind=kind)
+        families = [v for v in vars(self).values() if isinstance(v, _Family)]
+        return "\n".join(line for f in families for line in f.render()) + "\n"
+
+
+class MetricsServer:
+    """Serves ``GET /metrics`` over HTTP/1.1 from the event loop."""
+
+    def __init__(self, metrics: HarnessMetrics, host: str = "127.0.0.1", port: int = 9464):
+        self.metrics = metrics
+        self.host = host
+        self.port = port
+        self._server: asyncio.Server | None = None
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._serve_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]  # the real one if port was 0
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _serve_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            request_line = (await reader.readline()).decode("latin-1")
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+            method, target, *_ = request_line.split(" ") + ["", ""]
+            if method == "GET" and target.split("?")[0] == "/metrics":
+                status, body, content_type = "200 OK", self.metrics.render(), CONTENT_TYPE
+            else:
+                status, body, content_type = "404 Not Found", "not found\n", "text/plain"
+            payload = body.encode("utf-8")
+            writer.write(
+                f"HTTP/1.1 {status}\r\ncontent-type: {content_type}\r\n"
+                f"content-length: {len(payload)}\r\nconnection: close\r\n\r\n".encode("latin-1")
+                + payload
+            )
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
@@ -0,0 +1,333 @@
+"""Mock inference server for exercising the harness without a real model.
+
+Speaks the OpenAI-compatible ``/v1/chat/completions`` endpoint and the parts of
+Ollama's native API the harness uses (``/api/chat``, ``/api/generate``,
+``/api/ps``, ``/api/tags``), streaming or not. It runs either in-process as an
+httpx transport (``MockServer().transport()``) or over local HTTP
+(``harness mock-server``).
+
+Response times follow a simple latency model: a model load whenever the
+(model, num_ctx) pair changes, a per-token prefill and decode cost with jitter,
+and a fixed number of parallel slots beyond which requests queue. Faults
+(500s, hung requests, truncated streams) are injected at configurable rates.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import random
+import time
+from collections import Counter
+from collections.abc import AsyncIterator, Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+import httpx
+
+NS = 1e9
+
+
+@dataclass
+class LatencyModel:
+    load_ms: float = 2000.0
+    prefill_ms_per_token: float = 0.5
+    decode_ms_per_token: float = 20.0
+    jitter: float = 0.1  # each phase varies by up to +/- this fraction
+    parallel: int = 4  # requests served at once; the rest queue
+
+
+@dataclass
+class FaultPlan:
+    error_rate: float = 0.0  # answer 500
+    timeout_rate: float = 0.0  # hang for hang_s before answering
+    truncate_rate: float = 0.0  # stop the stream (or body) halfway
+    hang_s: float = 3600.0
+
+
+@dataclass
+class _Generation:
+    """Token stream plus the server-side timings of one request, filled in as it runs."""
+
+    tokens: list[str]
+    queued_s: float = 0.0
+    load_s: float = 0.0
+    prefill_s: float = 0.0
+    decode_s: float = 0.0
+    prompt_tokens: int = 0
+    emitted: list[str] = field(default_factory=list)
+
+    def ollama_timings(self) -> dict[str, int]:
+        return {
+            "total_duration": int((self.load_s + self.prefill_s + self.decode_s) * NS),
+            "load_duration": int(self.load_s * NS),
+            "prompt_eval_count": self.prompt_tokens,
+            "prompt_eval_duration": int(self.prefill_s * NS),
+            "eval_count": len(self.emitted),
+            "eval_duration": int(self.decode_s * NS),
+        }
+
+
+class MockServer:
+    """Scripted, latency-modelled stand-in for an Ollama server.
+
+    ``script`` maps a substring of the last user message to the answer to give
+    (first match wins, case-insensitive); a callable receives the messages
+    instead. Anything unmatched gets ``default_answer``.
+    """
+
+    def __init__(
+        self,
+        latency: LatencyModel | None = None,
+        faults: FaultPlan | None = None,
+        script: dict[str, str] | Callable[[list[dict[str, Any]]], str] | None = None,
+        default_answer: str = "ok",
+        models: list[str] | None = None,
+        seed: int = 0,
+    ) -> None:
+        self.latency = latency or LatencyModel()
+        self.faults = faults or FaultPlan()
+        self.script = script or {}
+        self.default_answer = default_answer
+        self.models = models
+        self.resident: tuple[str, int] | None = None
+        self.stats: Counter[str] = Counter()
+        self._rng = random.Random(seed)
+        self._slots = asyncio.Semaphore(self.latency.parallel)
+
+    # -- behaviour -------------------------------------------------------------
+
+    def answer(self, messages: list[dict[str, Any]]) -> str:
+        if callable(self.script):
+            return self.script(messages)
+        last = next(
+            (m.get("content", "") for m in reversed(messages) if m.get("role") == "user"), ""
+        )
+        for needle, reply in self.script.items():
+            if needle.lower() in last.lower():
+                return reply
+        return self.default_answer
+
+    def _cost(self, ms: float) -> float:
+        jitter = self.latency.jitter
+        return max(ms * (1 + self._rng.uniform(-jitter, jitter)), 0.0) / 1000
+
+    def _fault(self) -> str | None:
+        roll = self._rng.random()
+        for name, rate in (
+            ("error", self.faults.error_rate),
+            ("timeout", self.faults.timeout_rate),
+            ("truncate", self.faults.truncate_rate),
+        ):
+            if roll < rate:
+                self.stats[f"fault_{name}"] += 1
+                return name
+            roll -= rate
+        return None
+
+    def _load(self, model: str, num_ctx: int) -> float:
+        if self.resident == (model, num_ctx):
+            return 0.0
+        self.resident = (model, num_ctx)
+        self.stats["loads"] += 1
+        return self._cost(self.latency.load_ms)
+
+    async def _generate(
+        self, gen: _Generation, model: str, num_ctx: int, stop_after: int | None
+    ) -> AsyncIterator[str]:
+        """Hold a slot, pay load and prefill, then yield tokens at the decode rate."""
+        start = time.perf_counter()
+        async with self._slots:
+            gen.queued_s = time.perf_counter() - start
+            gen.load_s = self._load(model, num_ctx)
+            gen.prefill_s = self._cost(self.latency.prefill_ms_per_token * gen.prompt_tokens)
+            await asyncio.sleep(gen.load_s + gen.prefill_s)
+            for i, token in enumerate(gen.tokens):
+                if stop_after is not None and i >= stop_after:
+                    return
+                step = self._cost(self.latency.decode_ms_per_token)
+                await asyncio.sleep(step)
+                gen.decode_s += step
+                gen.emitted.append(token)
+                yield token
+
+    # -- HTTP ------------------------------------------------------------------
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        """Answer one request; usable directly as an httpx.MockTransport handler."""
+        self.stats["requests"] += 1
+        path = request.url.path
+        if request.method == "GET" and path == "/api/ps":
+            loaded = [] if self.resident is None else [
+                {"name": self.resident[0], "context_length": self.resident[1]}
+            ]
+            return httpx.Response(200, json={"models": loaded})
+        if request.method == "GET" and path == "/api/tags":
+            names = self.models or ([self.resident[0]] if self.resident else [])
+            return httpx.Response(200, json={"models": [
+                {"name": n, "digest": hashlib.sha256(n.encode()).hexdigest()} for n in names
+            ]})
+        if request.method != "POST" or path not in (
+            "/v1/chat/completions", "/api/chat", "/api/generate"
+        ):
+            return httpx.Response(404, json={"error": f"no route for {request.method} {path}"})
+
+        body = json.loads(request.content or b"{}")
+        model = body.get("model", "")
+        if self.models is not None and model not in self.models:
+            return httpx.Response(404, json={"error": f"model '{model}' not found"})
+        options = body.get("options") or {}
+        num_ctx = options.get("num_ctx", 2048)
+        if path == "/api/generate":
+            return await self._load_or_unload(body, model, num_ctx)
+
+        fault = self._fault()
+        if fault == "error":
+            return httpx.Response(500, json={"error": "injected server error"})
+        if fault == "timeout":
+            await asyncio.sleep(self.faults.hang_s)
+
+        native = path == "/api/chat"
+        messages = body.get("messages") or []
+        max_tokens = options.get("num_predict") if native else body.get("max_tokens")
+        tokens = [t + " " for t in self.answer(messages).split()][:max_tokens]
+        if tokens:
+            tokens[-1] = tokens[-1].rstrip()
+        gen = _Generation(
+            tokens=tokens,
+            prompt_tokens=sum(len(str(m.get("content", ""))) for m in messages) // 4 + 1,
+        )
+        stop_after = len(tokens) // 2 if fault == "truncate" else None
+        stream = body.get("stream", native)  # Ollama's native API streams by default
+        if stream:
+            if native:
+                chunks = self._native_stream(gen, model, num_ctx, stop_after)
+                media = "application/x-ndjson"
+            else:
+                usage = bool((body.get("stream_options") or {}).get("include_usage"))
+                chunks = self._openai_stream(gen, model, num_ctx, stop_after, usage)
+                media = "text/event-stream"
+            return httpx.Response(200, content=chunks, headers={"content-type": media})
+
+        async for _ in self._generate(gen, model, num_ctx, stop_after):
+            pass
+        text = "".join(gen.emitted)
+        if native:
+            payload: dict[str, Any] = {
+                "model": model,
+                "message": {"role": "assistant", "content": text},
+                "done": True,
+                **gen.ollama_timings(),
+            }
+        else:
+            payload = {
+                "object": "chat.completion",
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": text},
+                    "finish_reason": "stop",
+                }],
+                "usage": {
+                    "prompt_tokens": gen.prompt_tokens, "completion_tokens": len(gen.emitted),
+                },
+            }
+        raw = json.dumps(payload).encode()
+        if fault == "truncate":
+            raw = raw[: len(raw) // 2]
+        return httpx.Response(200, content=raw, headers={"content-type": "application/json"})
+
+    async def _load_or_unload(
+        self, body: dict[str, Any], model: str, num_ctx: int
+    ) -> httpx.Response:
+        if body.get("keep_alive") in (0, "0"):
+            if self.resident and self.resident[0] == model:
+                self.resident = None
+            return httpx.Response(200, json={"model": model, "done": True, "done_reason": "unload"})
+        load_s = self._load(model, num_ctx)
+        await asyncio.sleep(load_s)
+        return httpx.Response(200, json={
+            "model": model, "done": True, "done_reason": "load", "load_duration": int(load_s * NS),
+        })
+
+    async def _openai_stream(
+        self, gen: _Generation, model: str, num_ctx: int, stop_after: int | None, usage: bool
+    ) -> AsyncIterator[bytes]:
+        async for token in self._generate(gen, model, num_ctx, stop_after):
+            chunk = {"model": model, "choices": [{"index": 0, "delta": {"content": token}}]}
+            yield f"data: {json.dumps(chunk)}\n\n".encode()
+        if stop_after is not None:
+            return  # truncated: no usage, no [DONE]
+        if usage:
+            tail = {
+                "model": model,
+                "choices": [],
+                "usage": {
+                    "prompt_tokens": gen.prompt_tokens, "completion_tokens": len(gen.emitted),
+                },
+            }
+            yield f"data: {json.dumps(tail)}\n\n".encode()
+        yield b"data: [DONE]\n\n"
+
+    async def _native_stream(
+        self, gen: _Generation, model: str, num_ctx: int, stop_after: int | None
+    ) -> AsyncIterator[bytes]:
+        async for token in self._generate(gen, model, num_ctx, stop_after):
+            line = {
+                "model": model, "message": {"role": "assistant", "content": token}, "done": False,
+            }
+            yield (json.dumps(line) + "\n").encode()
+        if stop_after is not None:
+            return  # truncated: no final chunk
+        final = {
+            "model": model,
+            "message": {"role": "assistant", "content": ""},
+            "done": True,
+            **gen.ollama_timings(),
+        }
+        yield (json.dumps(final) + "\n").encode()
+
+    # -- serving ---------------------------------------------------------------
+
+    def transport(self) -> httpx.MockTransport:
+        """In-process transport, e.g. ``EndpointPool(urls, transport=server.transport())``."""
+        return httpx.MockTransport(self.handle)
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 11500) -> asyncio.Server:
+        """Listen for HTTP/1.1 on ``host:port``; responses are sent chunked."""
+        return await asyncio.start_server(self._serve_connection, host, port)
+
+    async def _serve_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            while request_line := await reader.readline():
+                method, target, _ = request_line.decode("latin-1").split(" ", 2)
+                headers: dict[str, str] = {}
+                while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                content = await reader.readexactly(int(headers.get("content-length", 0)))
+                request = httpx.Request(
+                    method, f"http://{headers.get('host', 'mock')}{target}",
+                    headers=headers, content=content,
+                )
+                response = await self.handle(request)
+                head = (
+                    f"HTTP/1.1 {response.status_code} {response.reason_phrase}\r\n"
+                    f"content-type: {response.headers.get('content-type', 'application/json')}\r\n"
+                    "transfer-encoding: chunked\r\n\r\n"
+                )
+                writer.write(head.encode("latin-1"))
+                async for chunk in response.stream:  # type: ignore[union-attr]
+                    if not chunk:
+                        continue  # a zero-length chunk would end the body
+                    writer.write(f"{len(chunk):x}\r\n".encode() + chunk + b"\r\n")
+                    await writer.drain()
+                writer.write(b"0\r\n\r\n")
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
@@ -0,0 +1,174 @@
+"""Native Ollama /api/chat client with server-side timing breakdowns.
+
+The OpenAI-compatible endpoint drops Ollama's timing fields. ``/api/chat``
+reports them on every response (durations in nanoseconds):
+
+- ``load_duration``: loading the model into memory
+- ``prompt_eval_count`` / ``prompt_eval_duration``: prefill
+- ``eval_count`` / ``eval_duration``: decode
+
+Responses are converted to the OpenAI shape (``choices``/``usage``) so callers
+can switch APIs without changing how they read content, with the raw fields
+kept alongside and the breakdown under ``timing``.
+"""
+
+from __future__ import annotations
+
+import json
+import time
+from dataclasses import asdict, dataclass
+from typing import Any
+
+import httpx
+
+from .streaming import StreamTiming
+
+NS = 1e9
+
+# OpenAI request fields that Ollama's native API takes as options
+_OPTION_FIELDS = {"max_tokens": "num_predict", "temperature": "temperature", "top_p": "top_p"}
+
+# Server-reported fields copied through to the converted response
+_TIMING_FIELDS = (
+    "total_duration",
+    "load_duration",
+    "prompt_eval_count",
+    "prompt_eval_duration",
+    "eval_count",
+    "eval_duration",
+)
+
+
+@dataclass
+class TimingBreakdown:
+    """Wall time of one call split into overhead, model load, prefill and decode (seconds).
+
+    ``overhead_s`` is whatever the server did not account for: network, HTTP,
+    queueing for a pool slot or a busy server.
+    """
+
+    wall_s: float = 0.0
+    load_s: float = 0.0
+    prefill_s: float = 0.0
+    decode_s: float = 0.0
+    overhead_s: float = 0.0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+
+    @classmethod
+    def from_response(cls, data: dict[str, Any], wall_s: float) -> TimingBreakdown:
+        load = data.get("load_duration", 0) / NS
+        prefill = data.get("prompt_eval_duration", 0) / NS
+        decode = data.get("eval_duration", 0) / NS
+        return cls(
+            wall_s=wall_s,
+            load_s=load,
+            prefill_s=prefill,
+            decode_s=decode,
+            overhead_s=max(wall_s - load - prefill - decode, 0.0),
+            prompt_tokens=data.get("prompt_eval_count", 0),
+            completion_tokens=data.get("eval_count", 0),
+        )
+
+    def __add__(self, other: TimingBreakdown) -> TimingBreakdown:
+        return TimingBreakdown(**{k: v + getattr(other, k) for k, v in asdict(self).items()})
+
+    @property
+    def tokens_per_second_prompt(self) -> float:
+        return self.prompt_tokens / self.prefill_s if self.prefill_s > 0 else 0.0
+
+    @property
+    def tokens_per_second_generation(self) -> float:
+        return self.completion_tokens / self.decode_s if self.decode_s > 0 else 0.0
+
+    def as_dict(self) -> dict[str, float]:
+        out = {k: round(v, 4) if isinstance(v, float) else v for k, v in asdict(self).items()}
+        out["tokens_per_second_prompt"] = round(self.tokens_per_second_prompt, 1)
+        out["tokens_per_second_generation"] = round(self.tokens_per_second_generation, 1)
+        return out
+
+
+def native_payload(payload: dict[str, Any], stream: bool = False) -> dict[str, Any]:
+    """Convert a /v1/chat/completions request body to an /api/chat body."""
+    options = dict(payload.get("options") or {})
+    body: dict[str, Any] = {"stream": stream}
+    for key, value in payload.items():
+        if key in _OPTION_FIELDS:
+            options[_OPTION_FIELDS[key]] = value
+        elif key != "options":
+            body[key] = value
+    body["options"] = options
+    return body
+
+
+def _to_openai(data: dict[str, Any], content: str, wall_s: float) -> dict[str, Any]:
+    out: dict[str, Any] = {k: data[k] for k in _TIMING_FIELDS if k in data}
+    out["model"] = data.get("model")
+    out["choices"] = [{"message": {"role": "assistant", "content": content}}]
+    out["usage"] = {
+        "prompt_tokens": data.get("prompt_eval_count", 0),
+        "completion_tokens": data.get("eval_count", 0),
+    }
+    out["timing"] = TimingBreakdown.from_response(data, wall_s)
+    return out
+
+
+async def native_chat(
+    client: httpx.AsyncClient,
+    payload: dict[str, Any],
+    timeout: float = 60.0,
+) -> dict[str, Any]:
+    """POST to /api/chat; returns an OpenAI-shaped response plus Ollama's timing fields."""
+    start = time.perf_counter()
+    resp = await client.post(
+        "/api/chat",
+        json=native_payload(payload),
+        timeout=httpx.Timeout(timeout, connect=10.0),
+    )
+    resp.raise_for_status()
+    data = resp.json()
+    wall = time.perf_counter() - start
+    return _to_openai(data, (data.get("message") or {}).get("content", ""), wall)
+
+
+async def stream_native_chat(
+    client: httpx.AsyncClient,
+    payload: dict[str, Any],
+    timeout: float = 60.0,
+) -> tuple[dict[str, Any], StreamTiming]:
+    """Streaming /api/chat: timestamps each NDJSON content chunk like
+    ``stream_chat_completion`` and takes the timing fields from the final chunk."""
+    timing = StreamTiming(start=time.perf_counter())
+    parts: list[str] = []
+    final: dict[str, Any] = {}
+    async with client.stream(
+        "POST",
+        "/api/chat",
+        json=native_payload(payload, stream=True),
+        timeout=httpx.Timeout(timeout, connect=10.0),
+    ) as resp:
+        resp.raise_for_status()
+        async for line in resp.aiter_lines():
+            if not line.strip():
+                continue
+            chunk = json.loads(line)
+            delta = (chunk.get("message") or {}).get("content")
+            if delta:
+                timing.chunk_times.append(time.perf_counter())
+                parts.append(delta)
+            if chunk.get("done"):
+                final = chunk
+    timing.end = time.perf_counter()
+    timing.completion_tokens = final.get("eval_count", 0)
+    return _to_openai(final, "".join(parts), timing.end - timing.start), timing
+
+
+async def model_digests(client: httpx.AsyncClient) -> dict[str, str]:
+    """Map each locally available model name to its digest (empty if /api/tags fails)."""
+    try:
+        resp = await client.get("/api/tags", timeout=10.0)
+        resp.raise_for_status()
+        models = resp.json().get("models") or []
+    except (httpx.HTTPError, ValueError):
+        return {}
+    return {m["name"]: m["digest"] for m in models if "name" in m and "digest" in m}
@@ -0,0 +1,34 @@
+"""Unbiased pass@k estimation for sampled code generation.
+
+Drawing ``n >= k`` samples per problem and counting the ``c`` that pass gives an
+unbiased estimate of the chance that at least one of ``k`` samples passes:
+``1 - C(n - c, k) / C(n, k)`` (Chen et al., 2021, "Evaluating Large Language
+Models Trained on Code"), computed as a product to avoid huge binomials.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Sequence
+
+
+def pass_at_k(n: int, c: int, k: int) -> float:
+    """Probability that at least one of ``k`` of the ``n`` samples (``c`` correct) passes."""
+    if not 0 <= c <= n or not 1 <= k <= n:
+        raise ValueError(f"need 0 <= c <= n and 1 <= k <= n, got n={n} c={c} k={k}")
+    if n - c < k:
+        return 1.0
+    miss = 1.0
+    for i in range(n - c + 1, n + 1):
+        miss *= 1.0 - k / i
+    return 1.0 - miss
+
+
+def mean_pass_at_k(counts: Sequence[tuple[int, int]], ks: Iterable[int]) -> dict[int, float]:
+    """Mean pass@k over problems given as ``(n, c)``; k above the smallest n is skipped."""
+    if not counts:
+        return {}
+    smallest = min(n for n, _ in counts)
+    return {
+        k: sum(pass_at_k(n, c, k) for n, c in counts) / len(counts)
+        for k in sorted(set(ks)) if 1 <= k <= smallest
+    }
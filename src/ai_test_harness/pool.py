@@ -0,0 +1,238 @@
+"""Inference endpoint pool — spread requests across several local Ollama instances.
+
+The pool plugs into httpx as a transport, so any client built with
+``EndpointPool.client()`` (run_tests.py's ``chat()`` and the v1 suites alike)
+is balanced without changing call sites: requests keep using relative paths
+such as ``/v1/chat/completions`` and the transport picks the instance.
+
+Selection is least-outstanding-requests among healthy instances, preferring
+instances that already have the request's model loaded. Instances that fail
+repeatedly are ejected for a cool-down period and re-admitted by a passing
+health check.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+import httpx
+
+from .logging import log_event
+from .tracing import span
+
+
+@dataclass
+class Endpoint:
+    url: str
+    max_outstanding: int
+    outstanding: int = 0
+    failures: int = 0  # consecutive
+    ejected_until: float = 0.0
+    ejections: int = 0
+    served: int = 0
+    models: set[str] = field(default_factory=set)
+
+    def available(self, now: float) -> bool:
+        return self.ejected_until <= now
+
+    def has_capacity(self) -> bool:
+        return self.outstanding < self.max_outstanding
+
+
+class EndpointPool:
+    """Least-outstanding, model-affine balancing with passive and active health checks."""
+
+    def __init__(
+        self,
+        urls: list[str],
+        max_outstanding: int = 4,
+        max_failures: int = 3,
+        eject_s: float = 30.0,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ) -> None:
+        if not urls:
+            raise ValueError("EndpointPool needs at least one endpoint URL")
+        self.endpoints = [Endpoint(url.rstrip("/"), max_outstanding) for url in urls]
+        self.max_failures = max_failures
+        self.eject_s = eject_s
+        self._inner = transport or httpx.AsyncHTTPTransport()
+        # Probes go straight to each instance over the same connections
+        self._probe = httpx.AsyncClient(transport=self._inner, timeout=5.0)
+        self._changed = asyncio.Condition()
+
+    @property
+    def capacity(self) -> int:
+        return sum(e.max_outstanding for e in self.endpoints)
+
+    def pick(self, model: str | None, exclude: frozenset[str] = frozenset()) -> Endpoint | None:
+        """Choose an endpoint with a free slot, or None if every one is busy."""
+        now = time.monotonic()
+        candidates = [e for e in self.endpoints if e.url not in exclude] or self.endpoints
+        # All instances ejected: keep trying them rather than failing the run outright
+        live = [e for e in candidates if e.available(now)] or candidates
+        free = [e for e in live if e.has_capacity()]
+        if not free:
+            return None
+        affine = [e for e in free if model in e.models]
+        return min(affine or free, key=lambda e: e.outstanding)
+
+    async def acquire(self, model: str | None, exclude: frozenset[str] = frozenset()) -> Endpoint:
+        async with self._changed:
+            while (endpoint := self.pick(model, exclude)) is None:
+                await self._changed.wait()
+            endpoint.outstanding += 1
+            if model:
+                endpoint.models.add(model)
+            return endpoint
+
+    async def release(self, endpoint: Endpoint, ok: bool) -> None:
+        async with self._changed:
+            endpoint.outstanding -= 1
+            endpoint.served += 1
+            if ok:
+                endpoint.failures = 0
+            else:
+                self._record_failure(endpoint)
+            self._changed.notify_all()
+
+    def _record_failure(self, endpoint: Endpoint) -> None:
+        endpoint.failures += 1
+        if endpoint.failures >= self.max_failures and endpoint.available(time.monotonic()):
+            endpoint.ejected_until = time.monotonic() + self.eject_s
+            endpoint.ejections += 1
+            log_event("endpoint_ejected", url=endpoint.url, failures=endpoint.failures)
+
+    async def check_health(self) -> None:
+        """Probe every endpoint; refresh loaded models, eject or re-admit instances."""
+        results = await asyncio.gather(
+            *(self._probe.get(f"{e.url}/api/ps") for e in self.endpoints),
+            return_exceptions=True,
+        )
+        async with self._changed:
+            for endpoint, result in zip(self.endpoints, results):
+                if isinstance(result, httpx.Response) and result.status_code < 500:
+                    if endpoint.ejected_until:
+                        log_event("endpoint_readmitted", url=endpoint.url)
+                    endpoint.failures = 0
+                    endpoint.ejected_until = 0.0
+                    try:
+                        loaded = result.json().get("models") or []
+                        endpoint.models = {m["name"] for m in loaded}
+                    except (ValueError, KeyError, AttributeError):
+                        pass
+                else:
+                    # An unreachable instance is ejected straight away
+                    endpoint.failures = max(endpoint.failures, self.max_failures - 1)
+                    self._record_failure(endpoint)
+            self._changed.notify_all()
+
+    async def run_health_checks(self, interval_s: float = 15.0) -> None:
+        """Probe endpoints forever; run as a background task and cancel when done."""
+        while True:
+            await self.check_health()
+            await asyncio.sleep(interval_s)
+
+    def client(self, **kwargs: Any) -> httpx.AsyncClient:
+        """An AsyncClient whose requests are balanced across the pool."""
+        return httpx.AsyncClient(
+            base_url="http://endpoint-pool", transport=PoolTransport(self), **kwargs
+        )
+
+    def stats(self) -> list[dict[str, Any]]:
+        return [
+            {
+                "url": e.url,
+                "served": e.served,
+                "outstanding": e.outstanding,
+                "ejections": e.ejections,
+                "models": sorted(e.models),
+            }
+            for e in self.endpoints
+        ]
+
+    async def aclose(self) -> None:
+        await self._probe.aclose()  # also closes the shared transport
+
+
+def _request_model(request: httpx.Request) -> str | None:
+    """Model name from a JSON request body, if there is one."""
+    try:
+        body = json.loads(request.content) if request.content else None
+    except (httpx.RequestNotRead, ValueError):
+        return None
+    return body.get("model") if isinstance(body, dict) else None
+
+
+class _ReleasingStream(httpx.AsyncByteStream):
+    """Response body wrapper that frees the endpoint slot once the body is closed."""
+
+    def __init__(
+        self, stream: httpx.AsyncByteStream, on_close: Callable[[], Awaitable[None]]
+    ) -> None:
+        self._stream = stream
+        self._on_close = on_close
+        self._closed = False
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            if not self._closed:
+                self._closed = True
+                await self._on_close()
+
+
+class PoolTransport(httpx.AsyncBaseTransport):
+    """Routes each request to an endpoint chosen by the pool.
+
+    Connection failures never reached the server, so they are retried on another
+    instance; every other error or 5xx counts against the endpoint that served it.
+    """
+
+    def __init__(self, pool: EndpointPool) -> None:
+        self.pool = pool
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        model = _request_model(request)
+        tried: set[str] = set()
+        while True:
+            with span("endpoint_wait", cat="http"):
+                endpoint = await self.pool.acquire(model, frozenset(tried))
+            tried.add(endpoint.url)
+            url = httpx.URL(endpoint.url + request.url.raw_path.decode("ascii"))
+            headers = request.headers.copy()
+            headers["Host"] = url.netloc.decode("ascii")
+            routed = httpx.Request(
+                request.method, url,
+                headers=headers, stream=request.stream, extensions=request.extensions,
+            )
+            try:
+                response = await self.pool._inner.handle_async_request(routed)
+            except httpx.ConnectError:
+                await self.pool.release(endpoint, ok=False)
+                if len(tried) == len(self.pool.endpoints):
+                    raise
+                continue
+            except BaseException:
+                await self.pool.release(endpoint, ok=False)
+                raise
+            ok = response.status_code < 500
+            if isinstance(response.stream, httpx.ByteStream):
+                # Body already in memory (in-process transports): nothing left to wait for
+                await self.pool.release(endpoint, ok)
+                return response
+
+            async def on_close(endpoint: Endpoint = endpoint, ok: bool = ok) -> None:
+                await self.pool.release(endpoint, ok)
+
+            response.stream = _ReleasingStream(response.stream, on_close)
+            return response
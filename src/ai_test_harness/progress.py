@@ -0,0 +1,279 @@
+"""Run progress and ETA, and a rich live view of them.
+
+``ProgressTracker`` follows the cases of every (config, suite) in a matrix
+run. Its ETA is the estimated case-seconds still to run, divided by the
+parallelism observed so far. A case's estimated duration for a (model, suite)
+blends the wall times of cases run so far with the historical mean for the
+same model and suite (``load_history``). The historical mean counts as
+``HISTORY_WEIGHT`` observed cases, so it leads until this run has measured a
+few cases and then fades out; without history the run's own times are used.
+Suites not started yet count the cases of their static case lists.
+``LiveView`` redraws the run from the event loop: per-config progress bars,
+requests in flight per endpoint, rolling request and token rates, error
+counts and the ETA.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import sqlite3
+import time
+from collections.abc import Callable, Iterator, Mapping, Sequence
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from rich.console import Console, Group
+from rich.live import Live
+from rich.progress_bar import ProgressBar
+from rich.table import Table
+
+from .aggregate import RunningStats
+from .db import init_db
+from .query import query_rollups
+
+HISTORY_WEIGHT = 10  # a historical mean counts as this many observed cases
+
+
+@dataclass
+class SuiteProgress:
+    planned: int = 0  # cases handed to run_cases so far (repeats add more)
+    done: int = 0
+    finished: bool = False
+    failed: bool = False
+
+
+def load_history(
+    db_path: Path, models: Sequence[str], suites: Sequence[str]
+) -> dict[tuple[str, str], tuple[float, float]]:
+    """(model, suite) -> (mean case wall seconds, cases per run) from earlier runs.
+
+    Reads the ``case_s.mean`` / ``case_s.count`` suite metrics from the results
+    database's rollups; empty when there is no database yet.
+    """
+    if not Path(db_path).exists() or not models or not suites:
+        return {}
+    try:
+        conn = init_db(Path(db_path))
+        try:
+            rows = query_rollups(conn, models=models, suites=suites,
+                                 metrics=["case_s.mean", "case_s.count"],
+                                 group_by=("model", "suite", "metric"))
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        return {}  # an ETA without history beats no run at all
+    means = {(r["model"], r["suite"]): r["mean"] for r in rows if r["metric"] == "case_s.mean"}
+    counts = {(r["model"], r["suite"]): r["mean"] for r in rows if r["metric"] == "case_s.count"}
+    return {key: (mean, counts.get(key, 0.0)) for key, mean in means.items()}
+
+
+class ProgressTracker:
+    """Case progress of a matrix run per (config, suite), with an ETA."""
+
+    def __init__(
+        self,
+        configs: Sequence[tuple[str, str]],
+        suites: Sequence[str],
+        cases: Mapping[str, int] | None = None,
+        history: Mapping[tuple[str, str], tuple[float, float]] | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.models = dict(configs)  # config label -> model name, in run order
+        self.cases = dict(cases or {})  # suite -> cases per run, from its static case list
+        self.history = dict(history or {})
+        self.progress = {(label, s): SuiteProgress() for label in self.models for s in suites}
+        self.in_flight = 0
+        self._clock = clock
+        self.started = clock()
+        self._durations: dict[tuple[str, str], RunningStats] = {}  # (model, suite)
+        self._suite_durations: dict[tuple[str, str], RunningStats] = {}  # (label, suite)
+        self._cases_per_run: dict[str, int] = {}  # suite -> cases in its first run_cases call
+        self._busy_s = 0.0  # case-seconds of cases that ran
+        self._active_s = 0.0  # wall seconds with at least one case in flight
+        self._last_tick = clock()
+
+    def _state(self, label: str, suite: str) -> SuiteProgress:
+        self.models.setdefault(label, label)  # not in the plan: its label stands for the model
+        return self.progress.setdefault((label, suite), SuiteProgress())
+
+    def plan_cases(self, label: str, suite: str, n: int) -> None:
+        """A run_cases call for the suite is about to run ``n`` cases."""
+        self._state(label, suite).planned += n
+        self._cases_per_run.setdefault(suite, n)
+
+    def _tick(self) -> None:
+        now = self._clock()
+        if self.in_flight:
+            self._active_s += now - self._last_tick
+        self._last_tick = now
+
+    @contextmanager
+    def case(self, label: str, suite: str) -> Iterator[None]:
+        """Count the block as a case of the suite in flight, then done."""
+        self._tick()
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self._tick()
+            self.in_flight -= 1
+            self._state(label, suite).done += 1
+
+    def observe(self, label: str, suite: str, seconds: float) -> None:
+        """Wall time of a case that actually ran (not replayed or reused)."""
+        self._busy_s += seconds
+        self._state(label, suite)
+        for stats, key in ((self._durations, (self.models[label], suite)),
+                           (self._suite_durations, (label, suite))):
+            stats.setdefault(key, RunningStats()).add(seconds)
+
+    def finish_suite(self, label: str, suite: str, failed: bool = False) -> dict[str, Any] | None:
+        """Mark the suite done; returns its ``case_s`` summary (count, mean) if cases ran."""
+        state = self._state(label, suite)
+        state.finished, state.failed = True, failed
+        stats = self._suite_durations.pop((label, suite), None)
+        if stats is None or not stats.count:
+            return None
+        return {"count": stats.count, "mean": round(stats.mean, 4)}
+
+    def case_seconds(self, model: str, suite: str) -> float | None:
+        """Expected wall time of one case: this run's mean blended with history."""
+        seen = self._durations.get((model, suite))
+        past = self.history.get((model, suite))
+        n = seen.count if seen else 0
+        if past is not None:
+            return ((seen.mean * n if seen else 0.0) + past[0] * HISTORY_WEIGHT) / (
+                n + HISTORY_WEIGHT)
+        if n:
+            return seen.mean
+        # Nothing for this pair yet: any suite of the model, then any case at all
+        same_model = [s for (m, _), s in self._durations.items() if m == model]
+        pooled = same_model or list(self._durations.values())
+        count = sum(s.count for s in pooled)
+        return sum(s.mean * s.count for s in pooled) / count if count else None
+
+    def expected_cases(self, label: str, suite: str) -> float | None:
+        state = self.progress[(label, suite)]
+        if state.planned or state.finished:
+            return state.planned
+        if suite in self.cases:
+            return self.cases[suite]
+        if suite in self._cases_per_run:
+            return self._cases_per_run[suite]
+        past = self.history.get((self.models[label], suite))
+        return past[1] if past and past[1] else None
+
+    @property
+    def elapsed(self) -> float:
+        return self._clock() - self.started
+
+    @property
+    def parallelism(self) -> float:
+        self._tick()
+        return max(self._busy_s / self._active_s, 1.0) if self._active_s > 0 else 1.0
+
+    def eta(self) -> float | None:
+        """Seconds until the run finishes, or None until there is anything to go on."""
+        remaining = 0.0
+        for (label, suite), state in self.progress.items():
+            if state.finished:
+                continue
+            cases = self.expected_cases(label, suite)
+            per_case = self.case_seconds(self.models[label], suite)
+            if cases is None or per_case is None:
+                return None
+            remaining += max(cases - state.done, 0) * per_case
+        return remaining / self.parallelism
+
+    def config_rows(self) -> list[dict[str, Any]]:
+        """Per config: cases done and expected, suites finished and failed."""
+        rows = []
+        for label in self.models:
+            states = [(s, p) for (owner, s), p in self.progress.items() if owner == label]
+            expected = [self.expected_cases(label, s) for s, _ in states]
+            rows.append({
+                "config": label,
+                "done": sum(p.done for _, p in states),
+                "total": sum(e for e in expected if e is not None),
+                "suites_done": sum(p.finished for _, p in states),
+                "suites": len(states),
+                "failed": sum(p.failed for _, p in states),
+                "running": next((s for s, p in states if p.planned and not p.finished), None),
+            })
+        return rows
+
+
+def format_seconds(seconds: float | None) -> str:
+    if seconds is None:
+        return "--"
+    seconds = int(seconds)
+    hours, rest = divmod(seconds, 3600)
+    return f"{hours}:{rest // 60:02d}:{rest % 60:02d}" if hours else f"{rest // 60}:{rest % 60:02d}"
+
+
+class LiveView:
+    """A rich live dashboard of a run, redrawn from the event loop.
+
+    ``endpoints`` returns EndpointPool.stats()-style dicts and ``rates`` a
+    HarnessMetrics.snapshot()-style dict; both are read on every redraw.
+    Lines the run prints scroll above the dashboard.
+    """
+
+    def __init__(
+        self,
+        tracker: ProgressTracker,
+        endpoints: Callable[[], list[dict[str, Any]]],
+        rates: Callable[[], dict[str, float]],
+        console: Console | None = None,
+        refresh_s: float = 0.25,
+    ) -> None:
+        self.tracker = tracker
+        self.endpoints = endpoints
+        self.rates = rates
+        self.refresh_s = refresh_s
+        self._live = Live(console=console, auto_refresh=False, transient=False)
+
+    def render(self) -> Group:
+        configs = Table(box=None, pad_edge=False, expand=False)
+        for column in ("Config", "Progress", "Cases", "Suites", "Running"):
+            configs.add_column(column, no_wrap=True)
+        for row in self.tracker.config_rows():
+            total = max(row["total"], row["done"]) or None
+            suites = f"{row['suites_done']}/{row['suites']}" + (
+                f" [red]{row['failed']} failed[/red]" if row["failed"] else "")
+            bar = ProgressBar(total=total, completed=row["done"], width=30)
+            configs.add_row(row["config"], bar, f"{row['done']}/{int(total or 0)}", suites,
+                            row["running"] or "")
+        endpoints = Table(box=None, pad_edge=False)
+        for column in ("Endpoint", "In flight", "Served", "Ejections"):
+            endpoints.add_column(column, no_wrap=True)
+        for ep in self.endpoints():
+            endpoints.add_row(ep["url"], str(ep["outstanding"]), str(ep["served"]),
+                              str(ep["ejections"]))
+        r = self.rates()
+        tracker = self.tracker
+        errors = int(r.get("request_errors", 0))
+        status = (
+            f"elapsed {format_seconds(tracker.elapsed)}  "
+            f"ETA [bold]{format_seconds(tracker.eta())}[/bold]  "
+            f"cases in flight {tracker.in_flight}  "
+            f"{r.get('requests_per_s', 0.0):.1f} req/s  "
+            f"prompt {r.get('prompt_tok_s', 0.0):.0f} tok/s  "
+            f"completion {r.get('completion_tok_s', 0.0):.0f} tok/s  "
+            + (f"[red]errors {errors} ({int(r.get('timeouts', 0))} timeouts)[/red]"
+               if errors else "errors 0")
+        )
+        return Group(configs, endpoints, status)
+
+    async def run(self) -> None:
+        """Redraw until cancelled, then draw the final state once more."""
+        self._live.start()
+        try:
+            while True:
+                self._live.update(self.render(), refresh=True)
+                await asyncio.sleep(self.refresh_s)
+        finally:
+            self._live.update(self.render(), refresh=True)
+            self._live.stop()
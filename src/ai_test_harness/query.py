@@ -0,0 +1,130 @@
+"""Historical result queries over the rollup tables (see db.py, migration 3).
+
+Queries read ``suite_rollups`` joined to ``test_runs``, never ``test_results``,
+so they touch one row per run/model/test/metric. Groups merge their rollups'
+counts, sums and sums of squares, which gives the exact mean and sample
+standard deviation of every underlying metric row in the group.
+"""
+
+from __future__ import annotations
+
+import math
+import re
+import sqlite3
+from collections.abc import Sequence
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+# --group-by name -> SQL expression (r: suite_rollups, t: test_runs)
+GROUP_COLUMNS: dict[str, str] = {
+    "model": "r.model_name",
+    "config": "t.config_label",
+    "suite": "t.test_suite",
+    "metric": "r.metric_name",
+    "run": "r.run_id",
+    "day": "date(r.created_at)",
+    "digest": "t.model_digest",
+    "backend": "t.backend",
+}
+DEFAULT_GROUP_BY = ("model", "config", "suite", "metric")
+
+_RELATIVE = re.compile(r"^(\d+)([hdw])$")
+_DATE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+_UNITS = {"h": "hours", "d": "days", "w": "weeks"}
+
+
+def parse_when(value: str, now: datetime | None = None, end: bool = False) -> str:
+    """``30d`` / ``12h`` / ``2w`` ago, or an ISO date/time, as SQLite's UTC timestamp text.
+
+    A bare date is its midnight, or with ``end`` the next midnight, so that as an
+    exclusive upper bound it keeps the whole day.
+    """
+    match = _RELATIVE.match(value.strip())
+    if match:
+        when = (now or datetime.now(UTC)) - timedelta(
+            **{_UNITS[match.group(2)]: int(match.group(1))}
+        )
+    else:
+        try:
+            when = datetime.fromisoformat(value.strip())
+        except ValueError:
+            raise ValueError(f"expected e.g. 30d, 12h or 2025-01-31, got {value!r}") from None
+        if end and _DATE.match(value.strip()):
+            when += timedelta(days=1)
+        if when.tzinfo is not None:
+            when = when.astimezone(UTC)
+    return when.strftime("%Y-%m-%d %H:%M:%S")
+
+
+def query_rollups(
+    conn: sqlite3.Connection,
+    *,
+    models: Sequence[str] = (),
+    configs: Sequence[str] = (),
+    suites: Sequence[str] = (),
+    metrics: Sequence[str] = (),
+    since: str | None = None,
+    until: str | None = None,
+    digest: str | None = None,
+    group_by: Sequence[str] = DEFAULT_GROUP_BY,
+    limit: int | None = None,
+) -> list[dict[str, Any]]:
+    """Aggregate rollups matching the filters, one dict per group, ordered by group.
+
+    ``configs`` match as substrings of the config label (like run_tests.py -c),
+    ``metrics`` as globs (``cases.*``), ``digest`` as a prefix; the rest exactly.
+    ``since``/``until`` take anything parse_when does.
+    """
+    unknown = [g for g in group_by if g not in GROUP_COLUMNS]
+    if unknown:
+        raise ValueError(f"unknown group-by {unknown}; choose from {sorted(GROUP_COLUMNS)}")
+    where: list[str] = []
+    params: list[Any] = []
+
+    def any_of(template: str, values: Sequence[str]) -> None:
+        if values:
+            where.append("(" + " OR ".join([template] * len(values)) + ")")
+            params.extend(values)
+
+    any_of("r.model_name = ?", models)
+    any_of("t.config_label LIKE '%' || ? || '%'", configs)
+    any_of("t.test_suite = ?", suites)
+    any_of("r.metric_name GLOB ?", metrics)
+    if since:
+        where.append("r.created_at >= ?")
+        params.append(parse_when(since))
+    if until:
+        # A bare date includes that whole day: before the next midnight
+        where.append("r.created_at < ?" if _DATE.match(until.strip()) else "r.created_at <= ?")
+        params.append(parse_when(until, end=True))
+    if digest:
+        where.append("t.model_digest LIKE ? || '%'")
+        params.append(digest)
+
+    keys = [GROUP_COLUMNS[g] for g in group_by]
+    sql = (
+        "SELECT " + "".join(f"{k}, " for k in keys)
+        + "COUNT(DISTINCT r.run_id), SUM(r.n), SUM(r.total), SUM(r.total_sq), "
+        "MIN(r.created_at), MAX(r.created_at) "
+        "FROM suite_rollups r LEFT JOIN test_runs t USING (run_id, model_name, test_name)"
+        + (" WHERE " + " AND ".join(where) if where else "")
+        + (" GROUP BY " + ", ".join(keys) + " ORDER BY " + ", ".join(keys) if keys else "")
+        + (f" LIMIT {int(limit)}" if limit else "")
+    )
+    rows = []
+    for row in conn.execute(sql, params):
+        *group, runs, n, total, total_sq, first, last = row
+        if not n:
+            continue
+        mean = total / n
+        var = (total_sq - total * total / n) / (n - 1) if n > 1 else 0.0
+        rows.append({
+            **dict(zip(group_by, group)),
+            "runs": runs,
+            "count": n,
+            "mean": round(mean, 4),
+            "stddev": round(math.sqrt(max(var, 0.0)), 4),
+            "first": first,
+            "last": last,
+        })
+    return rows
@@ -0,0 +1,94 @@
+"""Adaptive repeat policy: sample a suite until its score's confidence interval is tight.
+
+A suite is re-run while the interval on its score is wider than the target, within
+min/max repeat bounds. Deterministic configs agree with themselves and stop at
+the minimum; noisy ones keep sampling up to the maximum.
+
+Two intervals are available: a percentile bootstrap over the per-repeat scores,
+which measures run-to-run noise, and a Wilson score interval over the pooled
+case outcomes, which treats every case of every repeat as one Bernoulli trial.
+"""
+
+from __future__ import annotations
+
+import math
+import random
+import statistics
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Any
+
+METHODS = ("bootstrap", "wilson")
+
+
+def wilson_interval(successes: float, trials: int, z: float = 1.96) -> tuple[float, float]:
+    """Wilson score interval for a binomial proportion (95% for z=1.96)."""
+    if trials <= 0:
+        return 0.0, 1.0
+    p = successes / trials
+    denom = 1 + z * z / trials
+    centre = (p + z * z / (2 * trials)) / denom
+    half = z * math.sqrt(p * (1 - p) / trials + z * z / (4 * trials * trials)) / denom
+    return max(centre - half, 0.0), min(centre + half, 1.0)
+
+
+def bootstrap_interval(
+    values: Sequence[float], confidence: float = 0.95, resamples: int = 2000, seed: int = 0
+) -> tuple[float, float]:
+    """Percentile bootstrap interval for the mean of ``values``; (0, 1) below two values."""
+    if len(values) < 2:
+        return 0.0, 1.0
+    rng = random.Random(seed)
+    n = len(values)
+    means = sorted(sum(rng.choices(values, k=n)) / n for _ in range(resamples))
+    tail = (1 - confidence) / 2
+    return means[int(tail * (resamples - 1))], means[int((1 - tail) * (resamples - 1))]
+
+
+@dataclass
+class RepeatPolicy:
+    """When to stop repeating a suite whose score is a fraction in [0, 1]."""
+
+    min_repeats: int = 1
+    max_repeats: int = 1
+    target_width: float = 0.10  # stop once the interval is at most this wide
+    method: str = "bootstrap"  # or "wilson"
+
+    def __post_init__(self) -> None:
+        if self.method not in METHODS:
+            raise ValueError(f"method must be one of {METHODS}, got {self.method!r}")
+        self.min_repeats = max(self.min_repeats, 1)
+        self.max_repeats = max(self.max_repeats, self.min_repeats)
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_repeats > 1
+
+    def interval(self, scores: Sequence[float], trials: Sequence[int]) -> tuple[float, float]:
+        """``scores[i]`` is repeat i's score over ``trials[i]`` cases."""
+        if self.method == "wilson" and all(trials):
+            successes = sum(s * t for s, t in zip(scores, trials))
+            return wilson_interval(successes, sum(trials))
+        return bootstrap_interval(scores)
+
+    def done(self, scores: Sequence[float], trials: Sequence[int]) -> bool:
+        if len(scores) >= self.max_repeats:
+            return True
+        if len(scores) < self.min_repeats:
+            return False
+        low, high = self.interval(scores, trials)
+        return high - low <= self.target_width
+
+    def summary(self, scores: Sequence[float], trials: Sequence[int]) -> dict[str, Any]:
+        low, high = self.interval(scores, trials)
+        return {
+            "repeats": len(scores),
+            "scores": [round(s, 4) for s in scores],
+            "mean": round(statistics.fmean(scores), 4),
+            "stddev": round(statistics.stdev(scores), 4) if len(scores) > 1 else 0.0,
+            "method": "wilson" if self.method == "wilson" and all(trials) else "bootstrap",
+            "ci_low": round(low, 4),
+            "ci_high": round(high, 4),
+            "ci_width": round(high - low, 4),
+            "converged": high - low <= self.target_width,
+        }
@@ -0,0 +1,311 @@
+"""Compact, deduplicated results files, and loading either results format.
+
+The compact format is a JSON document ``{"format", "version", "blobs", "data"}``
+in which ``data`` is the usual results dict with two encodings applied:
+
+- Strings of at least ``MIN_BLOB_CHARS`` (haystacks, prompts, raw outputs) are
+  stored once in ``blobs`` under a content hash and replaced by ``{"$b": hash}``.
+- Lists of two or more dicts (case records) become column-major tables,
+  ``{"$t": {"n": rows, "cols": {key: [values]}, "absent": {key: [row, ...]}}}``;
+  ``absent`` lists the rows that lack a key, so records round-trip exactly.
+
+A dict that would read as one of these markers is wrapped as ``{"$d": dict}``.
+Files are written without indentation and optionally gzip- or lzma-compressed
+(``.cjson``, ``.cjson.gz``, ``.cjson.xz``). ``load_results`` reads any of
+those or a plain ``.json`` results file and returns the plain layout, which
+``export_json`` writes back out.
+
+``write_results`` consumes any iterator in the results as it writes, so a run
+can stream its configs from a ``CaseSpool`` instead of holding every case
+record in memory until the end.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import io
+import json
+import lzma
+import shutil
+import tempfile
+from collections.abc import Callable, Iterator, Sequence
+from pathlib import Path
+from typing import Any, BinaryIO, TextIO
+
+FORMAT = "ai-test-harness.compact"
+VERSION = 1
+MIN_BLOB_CHARS = 96
+
+COMPRESSIONS = {"none": "", "gzip": ".gz", "lzma": ".xz"}
+# Globs matching every results file, for directory scans
+RESULT_GLOBS = ("*.json", "*.cjson", "*.cjson.gz", "*.cjson.xz")
+
+_MARKERS = frozenset({"$b", "$t", "$d"})
+
+
+def _blob_key(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=12).hexdigest()
+
+
+def _encoder(min_blob: int, keep_blob: Callable[[str, str], None]) -> Callable[[Any], Any]:
+    """The compact encoding of one value; long strings go to ``keep_blob(key, text)``."""
+
+    def enc(value: Any) -> Any:
+        if isinstance(value, str):
+            if len(value) < min_blob:
+                return value
+            key = _blob_key(value)
+            keep_blob(key, value)
+            return {"$b": key}
+        if isinstance(value, dict):
+            packed = {k: enc(v) for k, v in value.items()}
+            return {"$d": packed} if len(value) == 1 and next(iter(value)) in _MARKERS else packed
+        if isinstance(value, list | tuple):
+            if len(value) >= 2 and all(isinstance(v, dict) for v in value):
+                return {"$t": _table(value)}
+            return [enc(v) for v in value]
+        return value
+
+    def _table(records: Sequence[dict[str, Any]]) -> dict[str, Any]:
+        keys = list(dict.fromkeys(k for r in records for k in r))
+        cols: dict[str, list[Any]] = {}
+        absent: dict[str, list[int]] = {}
+        for key in keys:
+            column = []
+            for i, record in enumerate(records):
+                if key in record:
+                    column.append(enc(record[key]))
+                else:
+                    column.append(None)
+                    absent.setdefault(key, []).append(i)
+            cols[key] = column
+        return {"n": len(records), "cols": cols, "absent": absent}
+
+    return enc
+
+
+def pack(data: Any, min_blob: int = MIN_BLOB_CHARS) -> dict[str, Any]:
+    """Encode a results dict (any JSON value) in the compact layout."""
+    blobs: dict[str, str] = {}
+    packed = _encoder(min_blob, blobs.setdefault)(data)
+    return {"format": FORMAT, "version": VERSION, "blobs": blobs, "data": packed}
+
+
+def unpack(doc: dict[str, Any]) -> Any:
+    """Inverse of pack."""
+    if doc.get("format") != FORMAT:
+        raise ValueError("not a compact results document")
+    if doc.get("version") != VERSION:
+        raise ValueError(f"unsupported compact results version {doc.get('version')!r}")
+    blobs: dict[str, str] = doc["blobs"]
+
+    def dec(value: Any) -> Any:
+        if isinstance(value, list):
+            return [dec(v) for v in value]
+        if not isinstance(value, dict):
+            return value
+        if len(value) == 1:
+            (marker, inner), = value.items()
+            if marker == "$b":
+                return blobs[inner]
+            if marker == "$d":
+                return {k: dec(v) for k, v in inner.items()}
+            if marker == "$t":
+                missing = {k: set(rows) for k, rows in inner["absent"].items()}
+                return [
+                    {k: dec(col[i]) for k, col in inner["cols"].items()
+                     if i not in missing.get(k, ())}
+                    for i in range(inner["n"])
+                ]
+        return {k: dec(v) for k, v in value.items()}
+
+    return dec(doc["data"])
+
+
+def _lazy(value: Any) -> bool:
+    """An iterator, or a dict holding one at any depth: written as it is consumed."""
+    return isinstance(value, Iterator) or (
+        isinstance(value, dict) and any(_lazy(v) for v in value.values())
+    )
+
+
+def _write_json(out: TextIO, data: Any) -> None:
+    """``json.dump(data, out, indent=2)``, consuming iterators one element at a time."""
+
+    def dump(value: Any, depth: int) -> None:
+        if not _lazy(value):
+            out.write(json.dumps(value, indent=2, default=str).replace("\n", "\n" + "  " * depth))
+            return
+        pad = "\n" + "  " * (depth + 1)
+        items = enumerate(value) if isinstance(value, Iterator) else enumerate(value.items())
+        out.write("[" if isinstance(value, Iterator) else "{")
+        empty = True
+        for i, item in items:
+            out.write(("," if i else "") + pad)
+            if isinstance(value, Iterator):
+                dump(item, depth + 1)
+            else:
+                out.write(json.dumps(item[0]) + ": ")
+                dump(item[1], depth + 1)
+            empty = False
+        close = "]" if isinstance(value, Iterator) else "}"
+        out.write(close if empty else "\n" + "  " * depth + close)
+
+    dump(data, 0)
+
+
+def _write_compact(out: TextIO, data: Any, min_blob: int = MIN_BLOB_CHARS) -> None:
+    """The compact document for ``data``, consuming iterators one element at a time.
+
+    Blobs are spilled to a temporary file and written after ``data``, so only
+    their keys stay in memory. An iterator is written as a plain list.
+    """
+    seen: set[str] = set()
+    with tempfile.TemporaryFile("w+", encoding="utf-8") as spill:
+
+        def keep(key: str, text: str) -> None:
+            if key not in seen:
+                spill.write(("," if seen else "") + json.dumps(key) + ":" + json.dumps(text))
+                seen.add(key)
+
+        enc = _encoder(min_blob, keep)
+
+        def dump(value: Any) -> None:
+            if isinstance(value, Iterator):
+                out.write("[")
+                for i, item in enumerate(value):
+                    out.write("," if i else "")
+                    dump(item)
+                out.write("]")
+            elif _lazy(value):
+                escape = len(value) == 1 and next(iter(value)) in _MARKERS
+                out.write('{"$d":{' if escape else "{")
+                for i, (k, v) in enumerate(value.items()):
+                    out.write(("," if i else "") + json.dumps(k) + ":")
+                    dump(v)
+                out.write("}}" if escape else "}")
+            else:
+                out.write(json.dumps(enc(value), separators=(",", ":"), default=str))
+
+        out.write(json.dumps({"format": FORMAT, "version": VERSION}, separators=(",", ":"))[:-1])
+        out.write(',"data":')
+        dump(data)
+        out.write(',"blobs":{')
+        spill.seek(0)
+        shutil.copyfileobj(spill, out)
+        out.write("}}")
+
+
+def write_results(
+    data: dict[str, Any], stem: Path, compression: str = "gzip", fmt: str = "compact"
+) -> Path:
+    """Write ``data`` to ``<stem>.cjson`` plus the compression's suffix, or ``<stem>.json``.
+
+    Iterators anywhere in ``data`` are consumed as the file is written, so a
+    result set never has to be in memory all at once (see CaseSpool).
+    """
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"compression must be one of {sorted(COMPRESSIONS)}")
+    if fmt == "json":
+        path = stem.with_name(stem.name + ".json")
+        with open(path, "w", encoding="utf-8") as out:
+            _write_json(out, data)
+        return path
+    path = stem.with_name(stem.name + ".cjson" + COMPRESSIONS[compression])
+    with open(path, "wb") as raw:
+        if compression == "gzip":
+            binary: BinaryIO = gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=6, mtime=0)
+        elif compression == "lzma":
+            binary = lzma.LZMAFile(raw, mode="wb", preset=6)
+        else:
+            binary = raw
+        with io.TextIOWrapper(binary, encoding="utf-8") as out:
+            _write_compact(out, data)
+    return path
+
+
+def load_results(path: Path) -> dict[str, Any]:
+    """Read a results file in either format, returning the plain results layout.
+
+    Raises OSError if it cannot be read and ValueError if it is corrupt.
+    """
+    raw = path.read_bytes()
+    try:
+        if path.suffix == ".gz":
+            raw = gzip.decompress(raw)
+        elif path.suffix == ".xz":
+            raw = lzma.decompress(raw)
+        doc = json.loads(raw)
+        if isinstance(doc, dict) and doc.get("format") == FORMAT:
+            return unpack(doc)
+    except (OSError, EOFError, lzma.LZMAError, KeyError, TypeError) as e:
+        raise ValueError(f"corrupt results file {path}: {e!r}") from e
+    return doc
+
+
+def result_stem(path: Path) -> str:
+    """File name without its results suffixes: ``run.cjson.gz`` -> ``run``."""
+    for suffix in (".cjson.gz", ".cjson.xz", ".cjson", ".json"):
+        if path.name.endswith(suffix):
+            return path.name[: -len(suffix)]
+    return path.stem
+
+
+def export_json(path: Path, out: Path | None = None) -> Path:
+    """Write a results file in the plain, indented JSON layout; returns the path written."""
+    if out is None:
+        out = path.with_name(result_stem(path) + ".json")
+    if out.resolve() == path.resolve():
+        raise ValueError(f"{path} is already plain JSON")
+    out.write_text(json.dumps(load_results(path), indent=2, default=str), encoding="utf-8")
+    return out
+
+
+def result_files(results_dir: Path) -> list[Path]:
+    """Every results file directly in ``results_dir``, either format."""
+    if not results_dir.is_dir():
+        return []
+    return sorted({p for pattern in RESULT_GLOBS for p in results_dir.glob(pattern)})
+
+
+class CaseSpool:
+    """Case record lists of finished suites, held on disk until the results file is written.
+
+    ``stash`` moves every non-empty list of dicts (case records, haystacks) out
+    of a suite result into one packed line of a temporary file and returns the
+    rest; ``restore`` puts them back, in their original key order.
+    """
+
+    def __init__(self, directory: Path | None = None) -> None:
+        self._file = tempfile.TemporaryFile(dir=directory)
+        self._index: dict[tuple[str, str], tuple[int, int, list[str]]] = {}
+        self.bytes = 0
+
+    def stash(self, config: str, suite: str, result: dict[str, Any]) -> dict[str, Any]:
+        lists = {
+            k: v for k, v in result.items()
+            if isinstance(v, list) and v and all(isinstance(r, dict) for r in v)
+        }
+        if not lists:
+            return result
+        raw = json.dumps(pack(lists), separators=(",", ":"), default=str).encode("utf-8")
+        offset = self._file.seek(0, io.SEEK_END)
+        self._file.write(raw)
+        self._index[(config, suite)] = (offset, len(raw), list(result))
+        self.bytes += len(raw)
+        return {k: v for k, v in result.items() if k not in lists}
+
+    def restore(self, config: str, suite: str, result: Any) -> Any:
+        if (config, suite) not in self._index:
+            return result
+        offset, size, order = self._index[(config, suite)]
+        self._file.seek(offset)
+        lists = unpack(json.loads(self._file.read(size)))
+        restored = {k: lists[k] if k in lists else result[k]
+                    for k in order if k in lists or k in result}
+        restored.update(result)  # keys added since stash go last
+        return restored
+
+    def close(self) -> None:
+        self._file.close()
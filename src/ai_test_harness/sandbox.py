@@ -0,0 +1,304 @@
+"""Warm, resource-limited Python sandbox for running generated code.
+
+``SandboxPool`` keeps a few worker interpreters alive. Each job is handled by
+forking the warm worker, so a snippet pays no interpreter startup. The forked
+child gets CPU, memory, file-size and open-file rlimits, a fresh temporary
+working directory, and its own process group, which is killed on timeout.
+Results are cached by the SHA-256 of the code text, so identical snippets
+(common across temperature-0 configs) run once.
+
+Where ``fork`` or ``resource`` is unavailable (Windows), workers fall back to a
+fresh ``python -c`` subprocess per job, without rlimits.
+
+Run as ``python -m ai_test_harness.sandbox`` to start a worker, which reads JSON
+jobs from stdin and writes one JSON result line per job.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import hashlib
+import json
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+import traceback
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Any
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None  # type: ignore[assignment]
+
+MB = 1024 * 1024
+
+
+@dataclass
+class Limits:
+    timeout_s: float = 15.0  # wall clock
+    cpu_s: int = 10
+    memory_mb: int = 512  # address space
+    file_mb: int = 16  # largest file the snippet may write (stdout/stderr included)
+    open_files: int = 64
+
+
+@dataclass
+class ExecResult:
+    returncode: int | None
+    stdout: str = ""
+    stderr: str = ""
+    timed_out: bool = False
+    duration_s: float = 0.0
+    cached: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return self.returncode == 0 and not self.timed_out
+
+
+def _apply_limits(limits: dict[str, Any]) -> None:
+    """Set rlimits on the current (child) process; unsupported ones are skipped."""
+    if resource is None:
+        return
+    for name, value in (
+        ("RLIMIT_CPU", limits["cpu_s"]),
+        ("RLIMIT_AS", limits["memory_mb"] * MB),
+        ("RLIMIT_FSIZE", limits["file_mb"] * MB),
+        ("RLIMIT_NOFILE", limits["open_files"]),
+    ):
+        with contextlib.suppress(AttributeError, ValueError, OSError):
+            resource.setrlimit(getattr(resource, name), (value, value))
+
+
+def _read(f: Any) -> str:
+    f.seek(0)
+    return f.read().decode("utf-8", errors="replace").strip()
+
+
+def _run_forked(code: str, limits: dict[str, Any]) -> dict[str, Any]:
+    """Run ``code`` in a forked child of this (warm) interpreter."""
+    workdir = tempfile.mkdtemp(prefix="sandbox-")
+    start = time.perf_counter()
+    with tempfile.TemporaryFile() as out, tempfile.TemporaryFile() as err:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        pid = os.fork()
+        if pid == 0:  # child: never returns
+            status = 1
+            try:
+                os.setsid()
+                os.chdir(workdir)
+                devnull = os.open(os.devnull, os.O_RDONLY)
+                os.dup2(devnull, 0)
+                os.dup2(out.fileno(), 1)
+                os.dup2(err.fileno(), 2)
+                _apply_limits(limits)
+                exec(compile(code, "<snippet>", "exec"), {"__name__": "__main__"})
+                status = 0
+            except SystemExit as e:
+                if isinstance(e.code, int):
+                    status = e.code
+                elif e.code is None:
+                    status = 0
+                else:
+                    print(e.code, file=sys.stderr)
+            except BaseException as e:
+                # Drop this frame so the traceback starts at the snippet, as with `python file.py`
+                traceback.print_exception(type(e), e, e.__traceback__.tb_next)
+            finally:
+                with contextlib.suppress(BaseException):
+                    sys.stdout.flush()
+                    sys.stderr.flush()
+                os._exit(status)
+
+        timed_out = False
+        deadline = start + limits["timeout_s"]
+        while True:
+            done, wait_status = os.waitpid(pid, os.WNOHANG)
+            if done:
+                break
+            if time.perf_counter() >= deadline:
+                timed_out = True
+                with contextlib.suppress(ProcessLookupError):
+                    os.killpg(pid, signal.SIGKILL)
+                _, wait_status = os.waitpid(pid, 0)
+                break
+            time.sleep(0.002)
+        result = {
+            "returncode": os.waitstatus_to_exitcode(wait_status),
+            "stdout": _read(out),
+            "stderr": _read(err),
+            "timed_out": timed_out,
+            "duration_s": round(time.perf_counter() - start, 4),
+        }
+    shutil.rmtree(workdir, ignore_errors=True)
+    return result
+
+
+def run_python(code: str, limits: Limits | None = None) -> ExecResult:
+    """Run one snippet in a fresh sandboxed subprocess (blocking, no warm worker)."""
+    lim = asdict(limits or Limits())
+    workdir = tempfile.mkdtemp(prefix="sandbox-")
+    start = time.perf_counter()
+    posix = resource is not None and os.name == "posix"
+    try:
+        proc = subprocess.run(
+            [sys.executable, "-c", code],
+            capture_output=True,
+            stdin=subprocess.DEVNULL,
+            cwd=workdir,
+            timeout=lim["timeout_s"],
+            preexec_fn=(lambda: _apply_limits(lim)) if posix else None,
+            start_new_session=posix,
+        )
+        return ExecResult(
+            returncode=proc.returncode,
+            stdout=proc.stdout.decode("utf-8", errors="replace").strip(),
+            stderr=proc.stderr.decode("utf-8", errors="replace").strip(),
+            duration_s=round(time.perf_counter() - start, 4),
+        )
+    except subprocess.TimeoutExpired:
+        return ExecResult(None, timed_out=True, duration_s=round(time.perf_counter() - start, 4))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def _serve() -> None:
+    """Worker loop: one JSON job per stdin line, one JSON result per stdout line."""
+    forking = hasattr(os, "fork") and resource is not None
+    for line in sys.stdin:
+        job = json.loads(line)
+        if forking:
+            result = _run_forked(job["code"], job["limits"])
+        else:
+            result = asdict(run_python(job["code"], Limits(**job["limits"])))
+        sys.stdout.write(json.dumps(result) + "\n")
+        sys.stdout.flush()
+
+
+class SandboxPool:
+    """Async pool of warm sandbox workers with an execution-result cache."""
+
+    def __init__(
+        self, size: int = 2, limits: Limits | None = None, cache_entries: int = 1024
+    ) -> None:
+        self.size = size
+        self.limits = limits or Limits()
+        self.cache_entries = cache_entries
+        self.stats: dict[str, int] = {"runs": 0, "cache_hits": 0, "timeouts": 0, "restarts": 0}
+        self._cache: OrderedDict[str, ExecResult] = OrderedDict()
+        self._idle: asyncio.Queue[asyncio.subprocess.Process] = asyncio.Queue()
+        self._workers: list[asyncio.subprocess.Process] = []
+        self._started = False
+
+    async def __aenter__(self) -> SandboxPool:
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc: object) -> None:
+        await self.close()
+
+    async def _spawn(self) -> asyncio.subprocess.Process:
+        proc = await asyncio.create_subprocess_exec(
+            sys.executable, "-m", "ai_test_harness.sandbox",
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            # A reply holds stdout and stderr (each up to file_mb) as JSON, where
+            # escaping can grow a byte to 6; the default 64 KB line limit is far too small
+            limit=12 * self.limits.file_mb * MB + MB,
+        )
+        self._workers.append(proc)
+        return proc
+
+    async def start(self) -> None:
+        """Pre-fork the workers; called on first use if not called before."""
+        if self._started:
+            return
+        self._started = True
+        for _ in range(self.size):
+            self._idle.put_nowait(await self._spawn())
+
+    def key(self, code: str) -> str:
+        return hashlib.sha256(code.encode("utf-8")).hexdigest()
+
+    async def run(self, code: str) -> ExecResult:
+        """Execute ``code`` on an idle worker, or return the cached result for it."""
+        key = self.key(code)
+        hit = self._cache.get(key)
+        if hit is not None:
+            self._cache.move_to_end(key)
+            self.stats["cache_hits"] += 1
+            return ExecResult(**{**asdict(hit), "cached": True})
+        await self.start()
+        worker = await self._idle.get()
+        failed = False
+        try:
+            result = await self._execute(worker, code)
+        except (TimeoutError, OSError, ValueError, asyncio.IncompleteReadError):
+            # The worker itself died or hung; replace it and report the job as failed
+            await self._replace(worker)
+            result = ExecResult(None, stderr="sandbox worker failed")
+            failed = True
+        except BaseException:
+            # Cancelled mid-job: its reply is still on the way and would be read as the
+            # next job's, so the worker is never reused (replaced even if cancelled again)
+            await asyncio.shield(self._replace(worker))
+            raise
+        else:
+            self._idle.put_nowait(worker)
+        self.stats["runs"] += 1
+        self.stats["timeouts"] += result.timed_out
+        if not failed:  # a worker failure says nothing about the code; try it again next time
+            self._cache[key] = result
+            while len(self._cache) > self.cache_entries:
+                self._cache.popitem(last=False)
+        return result
+
+    async def _replace(self, worker: asyncio.subprocess.Process) -> None:
+        """Kill a worker that cannot be reused and put a fresh one in the idle queue."""
+        self._workers.remove(worker)
+        with contextlib.suppress(ProcessLookupError):
+            worker.kill()
+        await worker.wait()
+        self.stats["restarts"] += 1
+        self._idle.put_nowait(await self._spawn())
+
+    async def _execute(self, worker: asyncio.subprocess.Process, code: str) -> ExecResult:
+        assert worker.stdin is not None and worker.stdout is not None
+        job = {"code": code, "limits": asdict(self.limits)}
+        worker.stdin.write((json.dumps(job) + "\n").encode("utf-8"))
+        await worker.stdin.drain()
+        # The worker enforces timeout_s itself; this only guards against a wedged worker
+        line = await asyncio.wait_for(worker.stdout.readline(), self.limits.timeout_s + 10)
+        if not line:
+            raise asyncio.IncompleteReadError(b"", None)
+        return ExecResult(**json.loads(line))
+
+    async def close(self) -> None:
+        for worker in self._workers:
+            if worker.stdin is not None:
+                worker.stdin.close()
+        for worker in self._workers:
+            try:
+                await asyncio.wait_for(worker.wait(), 2)
+            except TimeoutError:
+                with contextlib.suppress(ProcessLookupError):
+                    worker.kill()
+                await worker.wait()
+        self._workers.clear()
+        self._idle = asyncio.Queue()
+        self._started = False
+
+    def report(self) -> dict[str, Any]:
+        return {**self.stats, "workers": self.size, "limits": asdict(self.limits)}
+
+
+if __name__ == "__main__":
+    _serve()
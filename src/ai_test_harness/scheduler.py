@@ -0,0 +1,206 @@
+"""Model-swap-aware ordering of the configuration matrix.
+
+Ollama reloads a model whenever the model name or ``num_ctx`` changes between
+requests. The scheduler groups work by (model, num_ctx) so each pair is loaded
+once, estimates the load time this saves, and records the reloads actually seen.
+
+Within a suite, Ollama/llama.cpp reuses a slot's KV cache for the part of a new
+prompt that matches the previous one. ``plan_prefix_order`` orders cases so
+prompts sharing long prefixes (a common system prompt, haystacks built from the
+same filler) run back to back on the same slot, and estimates the prompt
+evaluation this saves over the given order.
+"""
+
+from __future__ import annotations
+
+import os
+from collections.abc import Callable, Hashable, Sequence
+from dataclasses import asdict, dataclass, field
+from typing import Any, Generic, TypeVar
+
+T = TypeVar("T")
+
+# Load times below this are Ollama touching an already-resident model, not a reload.
+RELOAD_THRESHOLD_S = 0.25
+# Rough prompt size estimate for reporting prefix reuse in tokens
+CHARS_PER_TOKEN = 4
+
+
+@dataclass
+class ReloadEvent:
+    model: str
+    num_ctx: int
+    load_s: float
+
+
+@dataclass
+class SchedulePlan(Generic[T]):
+    order: list[T]
+    naive_reloads: int
+    planned_reloads: int
+    naive_per_model: dict[str, int] = field(default_factory=dict)
+    planned_per_model: dict[str, int] = field(default_factory=dict)
+
+    @property
+    def reloads_avoided(self) -> int:
+        return self.naive_reloads - self.planned_reloads
+
+
+def count_reloads(
+    keys: list[tuple[str, Hashable]],
+    resident: tuple[str, Hashable] | None = None,
+) -> dict[str, int]:
+    """Count model loads per model for a sequence of (model, num_ctx) keys.
+
+    ``resident`` is what the server already has loaded before the first key.
+    """
+    loads: dict[str, int] = {}
+    previous = resident
+    for key in keys:
+        if key != previous:
+            loads[key[0]] = loads.get(key[0], 0) + 1
+        previous = key
+    return loads
+
+
+class MatrixScheduler:
+    """Orders (model, num_ctx, config) work to minimise reloads and tracks real ones."""
+
+    def __init__(self, default_load_s: float = 10.0) -> None:
+        self.default_load_s = default_load_s
+        self.events: list[ReloadEvent] = []
+        self._plan: SchedulePlan[Any] | None = None
+
+    def plan(
+        self,
+        items: list[T],
+        key: Callable[[T], tuple[str, Hashable]],
+        resident: tuple[str, Hashable] | None = None,
+    ) -> SchedulePlan[T]:
+        """Group items by model, then by num_ctx, both in first-seen order.
+
+        Work matching the ``resident`` (model, num_ctx) runs first so the model the
+        server already holds is used before anything is swapped in. The sort is
+        stable, so configs sharing a (model, num_ctx) keep their relative order.
+        """
+        models: list[str] = []
+        groups: list[tuple[str, Hashable]] = []
+        for item in items:
+            if key(item)[0] not in models:
+                models.append(key(item)[0])
+            if key(item) not in groups:
+                groups.append(key(item))
+        if resident is not None and resident[0] in models:
+            models.remove(resident[0])
+            models.insert(0, resident[0])
+        order = sorted(
+            items,
+            key=lambda it: (models.index(key(it)[0]), key(it) != resident, groups.index(key(it))),
+        )
+        naive = count_reloads([key(it) for it in items], resident)
+        planned = count_reloads([key(it) for it in order], resident)
+        self._plan = SchedulePlan(
+            order=order,
+            naive_reloads=sum(naive.values()),
+            planned_reloads=sum(planned.values()),
+            naive_per_model=naive,
+            planned_per_model=planned,
+        )
+        return self._plan
+
+    def observe(self, model: str, num_ctx: int, load_s: float) -> None:
+        """Record a server-reported load duration; only real reloads are kept."""
+        if load_s >= RELOAD_THRESHOLD_S:
+            self.events.append(ReloadEvent(model=model, num_ctx=num_ctx, load_s=load_s))
+
+    def estimated_load_s(self, model: str) -> float:
+        """Mean observed load time for a model, or the default when none was seen."""
+        seen = [e.load_s for e in self.events if e.model == model]
+        return sum(seen) / len(seen) if seen else self.default_load_s
+
+    def report(self) -> dict[str, Any]:
+        """Summarise planned vs naive reloads, estimated time saved and observed reloads."""
+        plan = self._plan
+        if plan is None:
+            return {}
+        saved = sum(
+            (plan.naive_per_model.get(m, 0) - plan.planned_per_model.get(m, 0))
+            * self.estimated_load_s(m)
+            for m in plan.naive_per_model
+        )
+        return {
+            "naive_reloads": plan.naive_reloads,
+            "planned_reloads": plan.planned_reloads,
+            "reloads_avoided": plan.reloads_avoided,
+            "est_load_time_saved_s": round(saved, 1),
+            "observed_reloads": [asdict(e) for e in self.events],
+        }
+
+
+@dataclass
+class PrefixPlan:
+    order: list[int]  # indices into the prompts, in the order to run them
+    slots: int
+    prompt_chars: int
+    shared_chars: int  # prompt prefix a slot can serve from its cache, planned order
+    naive_shared_chars: int  # the same for the given order
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "slots": self.slots,
+            "est_prompt_tokens": self.prompt_chars // CHARS_PER_TOKEN,
+            "est_shared_tokens": self.shared_chars // CHARS_PER_TOKEN,
+            "est_shared_tokens_naive": self.naive_shared_chars // CHARS_PER_TOKEN,
+            "est_prompt_eval_saved": (self.shared_chars - self.naive_shared_chars)
+            // CHARS_PER_TOKEN,
+        }
+
+
+def shared_prefix_chars(prompts: Sequence[str], order: Sequence[int], slots: int = 1) -> int:
+    """Characters each prompt shares with the one before it on its slot.
+
+    Cases are assumed to be handed to slots round-robin in ``order``, which is
+    what a bounded executor does when cases take similar time.
+    """
+    previous: list[str | None] = [None] * max(slots, 1)
+    shared = 0
+    for position, index in enumerate(order):
+        slot = position % len(previous)
+        before = previous[slot]
+        if before is not None:
+            shared += len(os.path.commonprefix([before, prompts[index]]))
+        previous[slot] = prompts[index]
+    return shared
+
+
+def prefix_order(prompts: Sequence[str], slots: int = 1) -> list[int]:
+    """Order prompt indices to maximise prefix reuse across ``slots`` parallel slots.
+
+    Sorting puts prompts that share a prefix next to each other (adjacent pairs
+    in sorted order share the most). With several slots the sorted list is cut
+    into one contiguous run per slot and the runs are interleaved, so each wave
+    of in-flight cases takes the next case of every run and each slot works
+    through a run of similar prompts.
+    """
+    ranked = sorted(range(len(prompts)), key=prompts.__getitem__)
+    slots = max(min(slots, len(ranked)), 1)
+    # One run per slot, longer runs first, so interleaving matches round-robin dispatch
+    base, extra = divmod(len(ranked), slots)
+    runs, start = [], 0
+    for r in range(slots):
+        end = start + base + (r < extra)
+        runs.append(ranked[start:end])
+        start = end
+    return [run[j] for j in range(len(runs[0])) for run in runs if j < len(run)]
+
+
+def plan_prefix_order(prompts: Sequence[str], slots: int = 1) -> PrefixPlan:
+    """Prefix-reuse order for ``prompts`` and its estimated saving over the given order."""
+    order = prefix_order(prompts, slots)
+    return PrefixPlan(
+        order=order,
+        slots=slots,
+        prompt_chars=sum(len(p) for p in prompts),
+        shared_chars=shared_prefix_chars(prompts, order, slots),
+        naive_shared_chars=shared_prefix_chars(prompts, range(len(prompts)), slots),
+    )
@@ -0,0 +1,116 @@
+"""Streaming chat completions with per-chunk timestamps.
+
+A non-streaming request only yields total completion time. Streaming lets us
+timestamp every content chunk and derive real time-to-first-token (TTFT),
+inter-token latency (ITL) percentiles, decode throughput that excludes
+prefill, and stalls in the token stream.
+"""
+
+from __future__ import annotations
+
+import json
+import time
+from dataclasses import dataclass, field
+from typing import Any
+
+import httpx
+
+# A gap between chunks is a stall when it exceeds both of these.
+STALL_MIN_MS = 250.0
+STALL_FACTOR = 5.0  # x the median inter-token gap
+
+# Upper bucket edges (ms) for the inter-token latency histogram; the last bucket is open.
+ITL_BUCKETS_MS = [5, 10, 20, 35, 50, 75, 100, 150, 250, 500, 1000]
+
+
+@dataclass
+class StreamTiming:
+    start: float
+    end: float = 0.0
+    chunk_times: list[float] = field(default_factory=list)
+    completion_tokens: int = 0
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Linear-interpolated percentile (pct in 0..100); 0.0 for an empty list."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    lo = int(rank)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (rank - lo)
+
+
+def stream_metrics(timing: StreamTiming) -> dict[str, Any]:
+    """Derive TTFT, ITL percentiles/histogram, decode tok/s and stalls from a timed stream."""
+    chunks = timing.chunk_times
+    if not chunks:
+        return {"ttft_ms": None, "decode_tps": 0.0, "stalls": 0}
+    gaps = [(b - a) * 1000 for a, b in zip(chunks, chunks[1:])]
+    p50 = percentile(gaps, 50)
+    stall_ms = max(STALL_MIN_MS, STALL_FACTOR * p50)
+    stalls = [g for g in gaps if g > stall_ms]
+
+    counts = [0] * (len(ITL_BUCKETS_MS) + 1)
+    for g in gaps:
+        idx = next((i for i, edge in enumerate(ITL_BUCKETS_MS) if g <= edge), len(ITL_BUCKETS_MS))
+        counts[idx] += 1
+
+    # Decode covers everything after the first token, so prefill is excluded
+    tokens = max(timing.completion_tokens, len(chunks))
+    decode_s = chunks[-1] - chunks[0]
+    return {
+        "ttft_ms": round((chunks[0] - timing.start) * 1000, 1),
+        "itl_p50_ms": round(p50, 1),
+        "itl_p95_ms": round(percentile(gaps, 95), 1),
+        "itl_p99_ms": round(percentile(gaps, 99), 1),
+        "decode_tps": round((tokens - 1) / decode_s, 1) if decode_s > 0 else 0.0,
+        "stalls": len(stalls),
+        "max_stall_ms": round(max(stalls), 1) if stalls else 0.0,
+        "itl_histogram_ms": {"edges": ITL_BUCKETS_MS, "counts": counts},
+    }
+
+
+async def stream_chat_completion(
+    client: httpx.AsyncClient,
+    payload: dict[str, Any],
+    timeout: float = 60.0,
+) -> tuple[dict[str, Any], StreamTiming]:
+    """POST a streaming /v1/chat/completions request and timestamp each content chunk.
+
+    Returns the response re-assembled in the non-streaming shape (choices/usage)
+    alongside the timing record.
+    """
+    body = {**payload, "stream": True, "stream_options": {"include_usage": True}}
+    timing = StreamTiming(start=time.perf_counter())
+    parts: list[str] = []
+    usage: dict[str, Any] = {}
+    async with client.stream(
+        "POST",
+        "/v1/chat/completions",
+        json=body,
+        timeout=httpx.Timeout(timeout, connect=10.0),
+    ) as resp:
+        resp.raise_for_status()
+        async for line in resp.aiter_lines():
+            if not line.startswith("data:"):
+                continue
+            data = line[len("data:"):].strip()
+            if data == "[DONE]":
+                break
+            chunk = json.loads(data)
+            if chunk.get("usage"):
+                usage = chunk["usage"]
+            for choice in chunk.get("choices") or []:
+                delta = (choice.get("delta") or {}).get("content")
+                if delta:
+                    timing.chunk_times.append(time.perf_counter())
+                    parts.append(delta)
+    timing.end = time.perf_counter()
+    timing.completion_tokens = usage.get("completion_tokens", 0)
+    assembled = {
+        "choices": [{"message": {"role": "assistant", "content": "".join(parts)}}],
+        "usage": usage,
+    }
+    return assembled, timing
@@ -1 +1,6 @@
-"""Test suite implementations."""
+"""Test suite implementations.
+
+Suites post relative paths on the ``httpx.AsyncClient`` they are given; pass
+``EndpointPool(settings.endpoint_urls()).client()`` to balance them across
+several inference servers.
+"""
@@ -2,11 +2,13 @@
 
 from __future__ import annotations
 
-import time
 from typing import Any
 
 import httpx
 
+from ..ollama import native_chat
+from ..streaming import stream_chat_completion, stream_metrics
+
 
 async def run_intent_classification(
     client: httpx.AsyncClient,
@@ -42,24 +44,60 @@ async def run_latency_test(
     model: str,
     prompt: str,
     max_tokens: int = 128,
-) -> dict[str, float]:
-    """Measure first-token latency and generation throughput."""
-    start = time.perf_counter()
-    resp = await client.post(
-        "/v1/chat/completions",
-        json={
+) -> dict[str, float | None]:
+    """Measure first-token latency, inter-token latency and decode throughput.
+
+    Streams the completion so first_token_latency_ms is the real time to the
+    first content chunk, and generation tok/s excludes prefill. With no content
+    chunk at all it is None and first_token_seen is False.
+    """
+    _, timing = await stream_chat_completion(
+        client,
+        {
             "model": model,
             "messages": [{"role": "user", "content": prompt}],
             "max_tokens": max_tokens,
-            "stream": False,
         },
     )
-    resp.raise_for_status()
-    elapsed = time.perf_counter() - start
-    data = resp.json()
-    completion_tokens = data.get("usage", {}).get("completion_tokens", 0)
+    metrics = stream_metrics(timing)
+    elapsed = timing.end - timing.start
+    return {
+        "first_token_latency_ms": metrics["ttft_ms"],
+        "first_token_seen": metrics["ttft_ms"] is not None,
+        "tokens_per_second_generation": metrics["decode_tps"],
+        "itl_p50_ms": metrics.get("itl_p50_ms", 0.0),
+        "itl_p95_ms": metrics.get("itl_p95_ms", 0.0),
+        "itl_p99_ms": metrics.get("itl_p99_ms", 0.0),
+        "stalls": float(metrics["stalls"]),
+        "total_time_ms": elapsed * 1000,
+    }
+
 
+async def run_throughput_test(
+    client: httpx.AsyncClient,
+    model: str,
+    prompt: str,
+    max_tokens: int = 128,
+) -> dict[str, float]:
+    """Measure prefill and decode throughput from Ollama's server-side timings.
+
+    Uses the native /api/chat endpoint, which reports load, prompt-eval and
+    eval durations; the remainder of wall time is network/queue overhead.
+    """
+    data = await native_chat(
+        client,
+        {
+            "model": model,
+            "messages": [{"role": "user", "content": prompt}],
+            "max_tokens": max_tokens,
+        },
+    )
+    timing = data["timing"]
     return {
-        "first_token_latency_ms": elapsed * 1000,
-        "tokens_per_second_generation": (completion_tokens / elapsed) if elapsed > 0 else 0.0,
+        "tokens_per_second_prompt": timing.tokens_per_second_prompt,
+        "tokens_per_second_generation": timing.tokens_per_second_generation,
+        "load_time_ms": timing.load_s * 1000,
+        "prefill_time_ms": timing.prefill_s * 1000,
+        "decode_time_ms": timing.decode_s * 1000,
+        "overhead_time_ms": timing.overhead_s * 1000,
     }
@@ -0,0 +1,217 @@
+"""Lightweight tracing spans exported as Chrome trace-event JSON.
+
+``start_tracing(path)`` installs a ``Tracer``; until then ``span`` is a no-op,
+so instrumented code costs nothing when tracing is off. Finished spans are
+streamed to the file as complete ("X") events, so a long run does not hold its
+trace in memory, and the file opens in Perfetto (ui.perfetto.dev) or
+chrome://tracing.
+
+Concurrent cases run in one thread, but a trace timeline needs the spans on a
+row to nest. ``lane()`` gives the current task a row of its own (the lowest
+free one) until it exits, and spans inside it land on that row. Spans outside
+any lane go on row 0, or on a fixed named row (``span(..., lane="results_db")``).
+Waits that overlap freely, like cases queued for a concurrency slot, are async
+("b"/"e") events instead. ``tagged(config=..., suite=..., case=...)`` adds
+tags to the args of every span started inside it.
+"""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import json
+import os
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any
+
+import httpx
+
+_LANE: ContextVar[int] = ContextVar("trace_lane", default=0)
+_TAGS: ContextVar[dict[str, Any]] = ContextVar("trace_tags", default={})  # replaced, never mutated
+
+# httpcore trace events (<prefix>.<step>.started/.complete) -> span name
+HTTP_STEPS = {
+    "connect_tcp": "http.connect",
+    "connect_unix_socket": "http.connect",
+    "start_tls": "http.tls",
+    "send_request_headers": "http.send",
+    "send_request_body": "http.send_body",
+    "receive_response_headers": "http.server",  # time to first byte: queueing plus compute
+    "receive_response_body": "http.receive",
+}
+
+
+class Tracer:
+    """Streams spans to a Chrome trace-event JSON file (the array form)."""
+
+    def __init__(self, path: Path, process_name: str = "ai_test_harness") -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.spans = 0
+        self._t0 = time.perf_counter()
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+        self._free: list[int] = []
+        self._lanes = itertools.count(1)
+        self._named: dict[str, int] = {}
+        self._async_ids = itertools.count(1)
+        self._file = open(self.path, "w", encoding="utf-8")
+        self._file.write("[\n")
+        self._meta("process_name", 0, process_name)
+        self._meta("thread_name", 0, "run")
+
+    def _us(self, t: float) -> float:
+        return round((t - self._t0) * 1e6, 1)
+
+    def _write(self, event: dict[str, Any]) -> None:
+        line = json.dumps(event, default=str) + ",\n"
+        with self._lock:
+            if not self._file.closed:
+                self._file.write(line)
+
+    def _meta(self, kind: str, tid: int, name: str) -> None:
+        self._write({"ph": "M", "name": kind, "pid": self._pid, "tid": tid, "args": {"name": name}})
+
+    def add(
+        self, name: str, start: float, end: float, *, cat: str = "harness",
+        lane: str | None = None, **args: Any,
+    ) -> None:
+        """Record a finished span from perf_counter() ``start`` to ``end``."""
+        with self._lock:  # spans also finish in worker threads (db writes, grading)
+            self.spans += 1
+        self._write({
+            "name": name, "cat": cat, "ph": "X", "ts": self._us(start),
+            "dur": round((end - start) * 1e6, 1), "pid": self._pid,
+            "tid": self._named_lane(lane) if lane else _LANE.get(),
+            "args": {**_TAGS.get(), **args},
+        })
+
+    def add_async(self, name: str, start: float, end: float, *, cat: str = "wait",
+                  **args: Any) -> None:
+        """Record a span that may overlap others on its row, as an async event pair."""
+        with self._lock:
+            self.spans += 1
+        event = {"name": name, "cat": cat, "id": next(self._async_ids), "pid": self._pid,
+                 "tid": _LANE.get()}
+        self._write({**event, "ph": "b", "ts": self._us(start), "args": {**_TAGS.get(), **args}})
+        self._write({**event, "ph": "e", "ts": self._us(end)})
+
+    @contextmanager
+    def span(self, name: str, *, cat: str = "harness", lane: str | None = None,
+             **args: Any) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, start, time.perf_counter(), cat=cat, lane=lane, **args)
+
+    @contextmanager
+    def lane(self) -> Iterator[int]:
+        """Run the block on a row of its own (for one concurrent case)."""
+        with self._lock:
+            tid = heapq.heappop(self._free) if self._free else None
+        if tid is None:
+            tid = next(self._lanes)
+            self._meta("thread_name", tid, f"lane {tid}")
+        token = _LANE.set(tid)
+        try:
+            yield tid
+        finally:
+            _LANE.reset(token)
+            with self._lock:
+                heapq.heappush(self._free, tid)
+
+    def _named_lane(self, name: str) -> int:
+        tid = self._named.get(name)
+        if tid is None:
+            tid = self._named[name] = 1_000_000 + len(self._named)
+            self._meta("thread_name", tid, name)
+        return tid
+
+    async def _on_request(self, request: httpx.Request) -> None:
+        started: dict[str, float] = {}
+
+        async def trace(event: str, info: dict[str, Any]) -> None:
+            step, _, phase = event.rpartition(".")
+            step = step.rpartition(".")[2]
+            if step == "response_closed":
+                # A stream closed early (e.g. at [DONE]) only finishes its body
+                # step when the generator is collected; end it here instead
+                now = time.perf_counter()
+                for open_step, start in started.items():
+                    self.add(HTTP_STEPS[open_step], start, now, cat="http")
+                started.clear()
+            elif step in HTTP_STEPS:
+                if phase == "started":
+                    started[step] = time.perf_counter()
+                elif step in started:
+                    self.add(HTTP_STEPS[step], started.pop(step), time.perf_counter(),
+                             cat="http", **({"failed": True} if phase == "failed" else {}))
+
+        request.extensions = {**request.extensions, "trace": trace}
+
+    def httpx_hooks(self) -> dict[str, list[Any]]:
+        """``event_hooks`` for an httpx.AsyncClient: connect/send/server/receive spans."""
+        return {"request": [self._on_request]}
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file.closed:
+                return
+            self._file.write(json.dumps({
+                "ph": "M", "name": "trace_spans", "pid": self._pid, "tid": 0,
+                "args": {"spans": self.spans},
+            }) + "\n]\n")
+            self._file.close()
+
+
+_tracer: Tracer | None = None
+
+
+def start_tracing(path: Path) -> Tracer:
+    """Install a Tracer writing to ``path``, closing any previous one."""
+    global _tracer
+    stop_tracing()
+    _tracer = Tracer(path)
+    return _tracer
+
+
+def stop_tracing() -> Tracer | None:
+    """Close and uninstall the current Tracer, returning it."""
+    global _tracer
+    tracer, _tracer = _tracer, None
+    if tracer is not None:
+        tracer.close()
+    return tracer
+
+
+def current_tracer() -> Tracer | None:
+    return _tracer
+
+
+def span(name: str, *, cat: str = "harness", lane: str | None = None,
+         **args: Any) -> AbstractContextManager[Any]:
+    """Time the block as a span of the current Tracer; a no-op when tracing is off."""
+    if _tracer is None:
+        return nullcontext()
+    return _tracer.span(name, cat=cat, lane=lane, **args)
+
+
+def lane() -> AbstractContextManager[Any]:
+    """Give the block a trace row of its own; a no-op when tracing is off."""
+    return _tracer.lane() if _tracer is not None else nullcontext()
+
+
+@contextmanager
+def tagged(**tags: Any) -> Iterator[None]:
+    """Add ``tags`` to the args of every span started in the block."""
+    token = _TAGS.set({**_TAGS.get(), **tags})
+    try:
+        yield
+    finally:
+        _TAGS.reset(token)
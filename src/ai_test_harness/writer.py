@@ -0,0 +1,188 @@
+"""Async write-behind batcher for the results database.
+
+Callers enqueue statements without awaiting anything; a background task drains
+the queue on aiosqlite's worker thread and writes each batch with
+``executemany`` inside a single transaction, once ``batch_rows`` statements are
+pending or ``flush_ms`` has passed since the first of them. Consecutive
+statements with the same SQL share one ``executemany`` and run in queue order,
+so a ``test_runs`` row always lands before the results that reference it.
+A batch that fails is retried one statement at a time, so a bad row is
+dropped (and logged) without losing its neighbours. ``close`` drains
+everything still queued.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import itertools
+import json
+import sqlite3
+import time
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Any
+
+import aiosqlite
+
+from .db import init_db
+from .logging import log_event
+from .tracing import span
+
+_Statement = tuple[str, Sequence[Any]]
+
+INSERT_RUN = (
+    "INSERT OR IGNORE INTO test_runs (run_id, model_name, test_suite, test_name, "
+    "quantization, backend, config_label, model_digest) VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+)
+INSERT_RESULT = (
+    "INSERT INTO test_results "
+    "(run_id, model_name, test_name, metric_name, metric_value, metadata) "
+    "VALUES (?, ?, ?, ?, ?, ?)"
+)
+DELETE_RESULTS = (
+    "DELETE FROM test_results WHERE run_id = ? AND model_name = ? AND test_name = ?"
+)
+
+
+class ResultWriter:
+    """Batches inserts into the results database off the event loop."""
+
+    def __init__(self, db_path: Path, batch_rows: int = 500, flush_ms: float = 250.0) -> None:
+        self.db_path = db_path
+        self.batch_rows = batch_rows
+        self.flush_ms = flush_ms
+        self.stats: dict[str, float] = {
+            "statements": 0, "batches": 0, "failed_statements": 0, "write_s": 0.0,
+        }
+        self._queue: asyncio.Queue[_Statement | None] = asyncio.Queue()
+        self._conn: aiosqlite.Connection | None = None
+        self._task: asyncio.Task[None] | None = None
+
+    async def __aenter__(self) -> ResultWriter:
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc: object) -> None:
+        await self.close()
+
+    async def start(self) -> None:
+        # init_db applies the schema with the sync driver; the pragmas are per-connection
+        await asyncio.to_thread(lambda: init_db(self.db_path).close())
+        self._conn = await aiosqlite.connect(str(self.db_path))
+        await self._conn.execute("PRAGMA foreign_keys=ON")
+        await self._conn.execute("PRAGMA busy_timeout=5000")
+        await self._conn.execute("PRAGMA synchronous=NORMAL")  # WAL: durable at checkpoint
+        self._task = asyncio.create_task(self._drain())
+
+    def add(self, sql: str, params: Sequence[Any]) -> None:
+        """Queue one statement; never blocks."""
+        self._queue.put_nowait((sql, params))
+
+    def add_run(
+        self,
+        run_id: str,
+        model_name: str,
+        test_suite: str,
+        test_name: str,
+        quantization: str | None = None,
+        backend: str | None = None,
+        config_label: str | None = None,
+        model_digest: str | None = None,
+    ) -> None:
+        self.add(INSERT_RUN, (
+            run_id, model_name, test_suite, test_name, quantization, backend,
+            config_label, model_digest,
+        ))
+
+    def add_result(
+        self,
+        run_id: str,
+        model_name: str,
+        test_name: str,
+        metric_name: str,
+        metric_value: float | None,
+        metadata: dict[str, Any] | None = None,
+    ) -> None:
+        self.add(INSERT_RESULT, (
+            run_id, model_name, test_name, metric_name, metric_value, json.dumps(metadata),
+        ))
+
+    def replace_results(self, run_id: str, model_name: str, test_name: str) -> None:
+        """Drop a test's earlier rows so re-writing it (e.g. on resume) stays idempotent."""
+        self.add(DELETE_RESULTS, (run_id, model_name, test_name))
+
+    async def _drain(self) -> None:
+        loop = asyncio.get_running_loop()
+        closing = False
+        while not closing:
+            first = await self._queue.get()
+            if first is None:
+                break
+            batch = [first]
+            deadline = loop.time() + self.flush_ms / 1000
+            while len(batch) < self.batch_rows:
+                try:
+                    item = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self._queue.get(), remaining)
+                    except TimeoutError:
+                        break
+                if item is None:
+                    closing = True
+                    break
+                batch.append(item)
+            await self._write(batch)
+
+    async def _write(self, batch: list[_Statement]) -> None:
+        assert self._conn is not None
+        start = time.perf_counter()
+        # On a trace row of its own: the drain task runs alongside the cases
+        with span("db_write", lane="results_db", statements=len(batch)):
+            try:
+                await self._conn.execute("BEGIN")
+                for sql, group in itertools.groupby(batch, key=lambda s: s[0]):
+                    await self._conn.executemany(sql, [params for _, params in group])
+                await self._conn.commit()
+            except sqlite3.Error:
+                with contextlib.suppress(sqlite3.Error):
+                    await self._conn.rollback()
+                await self._write_each(batch)
+            else:
+                self.stats["statements"] += len(batch)
+        self.stats["batches"] += 1
+        self.stats["write_s"] += time.perf_counter() - start
+
+    async def _write_each(self, batch: list[_Statement]) -> None:
+        """Slow path after a failed batch: one transaction per statement, so only bad rows drop."""
+        assert self._conn is not None
+        for sql, params in batch:
+            try:
+                await self._conn.execute(sql, params)
+                await self._conn.commit()
+                self.stats["statements"] += 1
+            except sqlite3.Error as e:
+                with contextlib.suppress(sqlite3.Error):
+                    await self._conn.rollback()
+                self.stats["failed_statements"] += 1
+                log_event("results_write_failed", level="error", sql=sql.split("(")[0].strip(),
+                          error=str(e))
+
+    async def close(self) -> None:
+        """Drain the queue, commit and close the connection."""
+        if self._task is not None:
+            self._queue.put_nowait(None)
+            await self._task
+            self._task = None
+        if self._conn is not None:
+            await self._conn.close()
+            self._conn = None
+
+    def report(self) -> dict[str, Any]:
+        return {
+            "path": str(self.db_path), **self.stats, "write_s": round(self.stats["write_s"], 3),
+        }
@@ -0,0 +1,60 @@
+"""Tests for online case statistics and quantile sketches."""
+
+from __future__ import annotations
+
+import random
+import statistics
+
+import pytest
+
+from ai_test_harness.aggregate import CaseAggregator, QuantileSketch, RunningStats
+
+
+def test_running_stats_match_two_pass_statistics() -> None:
+    values = [random.Random(1).gauss(50, 10) for _ in range(1000)]
+    stats = RunningStats()
+    for v in values:
+        stats.add(v)
+    assert stats.count == 1000
+    assert stats.mean == pytest.approx(statistics.fmean(values))
+    assert stats.stddev == pytest.approx(statistics.stdev(values))
+    assert (stats.min, stats.max) == (min(values), max(values))
+
+
+def test_sketch_quantiles_are_within_relative_accuracy() -> None:
+    rng = random.Random(2)
+    values = sorted(rng.lognormvariate(0, 2) * rng.choice((-1, 1)) for _ in range(20_000))
+    whole, left, right = QuantileSketch(0.01), QuantileSketch(0.01), QuantileSketch(0.01)
+    for i, v in enumerate(values):
+        whole.add(v)
+        (left if i % 2 else right).add(v)
+    left.merge(right)
+    for q in (0.01, 0.25, 0.5, 0.9, 0.99):
+        actual = values[int(q * (len(values) - 1))]
+        assert whole.quantile(q) == pytest.approx(actual, rel=0.011)
+        assert left.quantile(q) == whole.quantile(q)
+    assert QuantileSketch().quantile(0.5) is None
+
+    full, capped = QuantileSketch(0.01), QuantileSketch(0.01, max_buckets=400)
+    for _ in range(5000):
+        v = rng.uniform(0.001, 1000)  # ~680 buckets
+        full.add(v)
+        capped.add(v)
+    assert capped.quantile(0.5) == full.quantile(0.5)  # collapsing only coarsens small values
+    assert capped.quantile(0.99) == full.quantile(0.99)
+
+
+def test_case_aggregator_summaries_per_group() -> None:
+    agg = CaseAggregator()
+    for i in range(1, 101):
+        agg.add(("m | precise", "latency"), {"latency_s": i / 10, "ok": float(i % 2)})
+    agg.add(("m | precise", "latency"), {"latency_s": float("nan")})
+    agg.add(("m | creative", "latency"), {"latency_s": 1.0})
+
+    latency = agg.pop(("m | precise", "latency"))["latency_s"]
+    assert latency["count"] == 100 and latency["mean"] == 5.05
+    assert latency["min"] == 0.1 and latency["max"] == 10.0
+    assert latency["p50"] == pytest.approx(5.0, rel=0.01)
+    assert latency["p99"] == pytest.approx(9.9, rel=0.01)
+    assert agg.summary(("m | precise", "latency")) == {}
+    assert agg.summary(("m | creative", "latency"))["latency_s"]["p90"] == 1.0
@@ -0,0 +1,83 @@
+"""Tests for the content-addressed response cache."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import httpx
+import pytest
+
+import run_tests as rt
+from ai_test_harness.cache import ResponseCache, cache_key, is_deterministic
+
+PAYLOAD = {"model": "m", "messages": [{"role": "user", "content": "hi"}], "temperature": 0.0}
+
+
+def test_key_covers_digest_backend_and_payload() -> None:
+    base = cache_key("ollama/openai", "sha256:a", PAYLOAD)
+    assert base == cache_key("ollama/openai", "sha256:a", dict(reversed(PAYLOAD.items())))
+    assert base != cache_key("ollama/openai", "sha256:b", PAYLOAD)
+    assert base != cache_key("ollama/native", "sha256:a", PAYLOAD)
+    assert base != cache_key("ollama/openai", "sha256:a", {**PAYLOAD, "max_tokens": 8})
+    assert is_deterministic(PAYLOAD)
+    assert not is_deterministic({**PAYLOAD, "temperature": 0.7})
+
+
+def test_read_mode_never_writes(tmp_path: Path) -> None:
+    path = tmp_path / "responses.db"
+    writer = ResponseCache(path)
+    writer.put("k", {"choices": []})
+    writer.close()
+
+    reader = ResponseCache(path, mode="read")
+    assert reader.get("k") == {"choices": []}
+    reader.put("other", {"choices": []})
+    assert reader.get("other") is None
+    assert (reader.hits, reader.misses, reader.writes) == (1, 1, 0)
+    with pytest.raises(ValueError):
+        ResponseCache(path, mode="off")
+
+
+def test_lru_eviction_keeps_recently_used(tmp_path: Path) -> None:
+    entry = {"choices": [{"message": {"content": "x" * 100}}]}
+    cache = ResponseCache(tmp_path / "responses.db", max_bytes=450)  # room for three entries
+    cache.put("a", entry)
+    cache.put("b", entry)
+    cache.put("c", entry)
+    cache.get("a")  # refresh a, so b is now least recently used
+    cache.put("d", entry)
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("d") is not None
+    assert cache.evictions == 1 and cache.size <= 450
+
+
+async def test_chat_bypasses_the_cache_without_a_model_digest(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+) -> None:
+    cache = ResponseCache(tmp_path / "responses.db")
+    for name, value in (("cache", cache), ("digests", {}), ("undigested", set()),
+                        ("api", "openai"), ("metrics", None)):
+        monkeypatch.setattr(rt.RUNTIME, name, value)
+    calls = 0
+
+    def answer(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        return httpx.Response(200, json={"choices": [{"message": {"content": "hi"}}]})
+
+    config = rt.build_configs("m")[0]  # temperature 0: cacheable
+    messages = [{"role": "user", "content": "hello"}]
+    async with httpx.AsyncClient(transport=httpx.MockTransport(answer),
+                                 base_url="http://m") as client:
+        for _ in range(2):
+            await rt.chat(client, config, messages)
+        assert calls == 2 and cache.writes == cache.misses == 0  # no digest: never looked up
+        logged = [json.loads(line) for line in capsys.readouterr().err.splitlines()]
+        assert [r["event"] for r in logged] == ["cache_bypassed"]  # once per model
+
+        rt.RUNTIME.digests = {"m": "sha256:a"}
+        for _ in range(2):
+            await rt.chat(client, config, messages)
+        assert calls == 3
+    cache.close()
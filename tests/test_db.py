@@ -3,12 +3,17 @@
 from __future__ import annotations
 
 import sqlite3
+from pathlib import Path
+
+import pytest
+
+from ai_test_harness.db import SCHEMA_SQL, SCHEMA_VERSION, init_db
 
 
 def test_schema_version_exists(db_conn: sqlite3.Connection) -> None:
     row = db_conn.execute("SELECT version FROM schema_version").fetchone()
     assert row is not None
-    assert row[0] == 1
+    assert row[0] == SCHEMA_VERSION
 
 
 def test_tables_created(db_conn: sqlite3.Connection) -> None:
@@ -25,3 +30,59 @@ def test_tables_created(db_conn: sqlite3.Connection) -> None:
 def test_foreign_keys_enabled(db_conn: sqlite3.Connection) -> None:
     row = db_conn.execute("PRAGMA foreign_keys").fetchone()
     assert row[0] == 1
+
+
+def add_rows(conn: sqlite3.Connection, test_name: str, values: list[float]) -> None:
+    conn.execute(
+        "INSERT OR IGNORE INTO test_runs (run_id, model_name, test_suite, test_name) "
+        "VALUES ('r1', 'm', 'latency', ?)", (test_name,),
+    )
+    conn.executemany(
+        "INSERT INTO test_results (run_id, model_name, test_name, metric_name, metric_value) "
+        "VALUES ('r1', 'm', ?, 'tps', ?)", [(test_name, v) for v in values],
+    )
+    conn.commit()
+
+
+def test_migrates_version_1_database_and_backfills(tmp_path: Path) -> None:
+    db = tmp_path / "old.db"
+    old = sqlite3.connect(db)
+    old.executescript(SCHEMA_SQL)
+    old.execute("INSERT INTO schema_version (version) VALUES (1)")
+    add_rows(old, "m | precise | latency", [10.0, 20.0, 30.0])
+    old.close()
+
+    conn = init_db(db)
+    try:
+        assert conn.execute("SELECT version FROM schema_version").fetchone()[0] == SCHEMA_VERSION
+        row = conn.execute(
+            "SELECT config_label, count, mean, stddev FROM suite_rollup_stats"
+        ).fetchone()
+        assert row == ("m | precise", 3, 20.0, 10.0)
+        plan = " ".join(r[-1] for r in conn.execute(
+            "EXPLAIN QUERY PLAN SELECT metric_value FROM test_results WHERE model_name = 'm' "
+            "AND test_name = 't' AND metric_name = 'tps' ORDER BY created_at DESC LIMIT 1"
+        ))
+        assert "COVERING INDEX idx_results_metric" in plan
+    finally:
+        conn.close()
+
+    newer = sqlite3.connect(db)
+    newer.execute("UPDATE schema_version SET version = ?", (SCHEMA_VERSION + 1,))
+    newer.commit()
+    newer.close()
+    with pytest.raises(RuntimeError, match="schema version mismatch"):
+        init_db(db)
+
+
+def test_rollups_follow_inserts_and_deletes(db_conn: sqlite3.Connection) -> None:
+    add_rows(db_conn, "t", [1.0, 2.0, 3.0, 4.0])
+
+    def stats() -> list[tuple]:
+        return db_conn.execute("SELECT count, mean FROM suite_rollup_stats").fetchall()
+
+    assert stats() == [(4, 2.5)]
+    db_conn.execute("DELETE FROM test_results WHERE metric_value > 2")
+    assert stats() == [(2, 1.5)]
+    db_conn.execute("DELETE FROM test_results")
+    assert stats() == []
@@ -0,0 +1,110 @@
+"""Tests for the bounded-concurrency case executor."""
+
+from __future__ import annotations
+
+import asyncio
+import sys
+
+import pytest
+
+import run_tests as rt
+from ai_test_harness.executor import CaseExecutor
+
+
+async def test_results_keep_input_order() -> None:
+    executor = CaseExecutor(suite_limit=4)
+
+    async def slow_for_small(n: int) -> int:
+        await asyncio.sleep(0.01 * (5 - n))
+        return n * 10
+
+    reported: list[int] = []
+    results = await executor.map(range(5), slow_for_small, on_result=reported.append)
+    assert results == [0, 10, 20, 30, 40]
+    assert reported == [0, 10, 20, 30, 40]
+
+
+async def test_limit_bounds_in_flight_cases() -> None:
+    executor = CaseExecutor(suite_limit=3, endpoint_limit=8)
+    in_flight = 0
+    peak = 0
+
+    async def track(_: int) -> None:
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+
+    await executor.map(range(10), track)
+    assert peak == 3
+
+    peak = 0
+    await executor.map(range(10), track, serial=True)
+    assert peak == 1
+
+
+async def test_endpoint_limit_caps_suite_limit() -> None:
+    executor = CaseExecutor(suite_limit=8, endpoint_limit=2)
+    in_flight = 0
+    peak = 0
+
+    async def track(_: int) -> None:
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+
+    await executor.map(range(10), track, endpoint="http://a")
+    assert peak == 2
+
+
+async def test_first_error_propagates_unwrapped() -> None:
+    executor = CaseExecutor(suite_limit=4)
+
+    async def fail_on_two(n: int) -> int:
+        if n == 2:
+            raise ValueError("boom")
+        await asyncio.sleep(0.05)
+        return n
+
+    with pytest.raises(ValueError, match="boom"):
+        await executor.map(range(6), fail_on_two)
+
+
+async def test_unslotted_cases_hold_the_endpoint_only_while_requesting() -> None:
+    executor = CaseExecutor(suite_limit=4, endpoint_limit=1)
+    running = requesting = peak_running = peak_requesting = 0
+
+    async def case(n: int) -> int:
+        nonlocal running, requesting, peak_running, peak_requesting
+        running += 1
+        peak_running = max(peak_running, running)
+        async with executor.slot("pool"):
+            requesting += 1
+            peak_requesting = max(peak_requesting, requesting)
+            await asyncio.sleep(0.01)
+            requesting -= 1
+        await asyncio.sleep(0.05)  # e.g. running the generated code, slot released
+        running -= 1
+        return n
+
+    assert await executor.map(range(4), case, endpoint=None) == [0, 1, 2, 3]
+    assert peak_requesting == 1 and peak_running == 4
+    async with executor.slot("pool"):  # slots are all free again
+        pass
+
+
+def test_concurrency_flags_must_be_positive(
+    monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+) -> None:
+    monkeypatch.setattr(sys, "argv", ["run_tests.py", "-j", "3", "--endpoint-concurrency", "2"])
+    args = rt.parse_args()
+    assert (args.concurrency, args.endpoint_concurrency) == (3, 2)
+    for flag in ("--concurrency", "--endpoint-concurrency"):
+        for bad in ("0", "-4"):
+            monkeypatch.setattr(sys, "argv", ["run_tests.py", flag, bad])
+            with pytest.raises(SystemExit):
+                rt.parse_args()
+            assert "expected a positive integer" in capsys.readouterr().err
@@ -0,0 +1,99 @@
+"""Tests for case content hashes and incremental reuse of earlier results."""
+
+from __future__ import annotations
+
+import importlib.util
+import json
+import os
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+
+import run_tests as rt
+from ai_test_harness.incremental import fingerprint, index_results, recent_results
+
+
+def test_fingerprint_tracks_callable_source() -> None:
+    case = {"desc": "three items", "validate": lambda t: t.count("\n") == 2}
+    same = {"validate": lambda t: t.count("\n") == 2, "desc": "three items"}
+    edited = {"desc": "three items", "validate": lambda t: t.count("\n") == 3}
+    # Lambdas on different lines have different source, so compare one against itself
+    assert fingerprint(case) == fingerprint(dict(case))
+    assert fingerprint(case) != fingerprint(same)
+    assert fingerprint(case) != fingerprint(edited)
+    assert fingerprint("a", 1) != fingerprint("a", 2)
+
+
+def test_fingerprint_tracks_lambda_continuation_lines(tmp_path: Path) -> None:
+    def validator(name: str, continuation: str) -> object:
+        path = tmp_path / f"{name}.py"
+        # Laid out like JSON_PROMPTS: a dict entry whose lambda runs onto the next line
+        path.write_text('CASE = {\n    "validate": lambda d: isinstance(d, dict)\n'
+                        f"        and {continuation},\n}}\n", encoding="utf-8")
+        spec = importlib.util.spec_from_file_location(name, path)
+        module = importlib.util.module_from_spec(spec)  # type: ignore[arg-type]
+        spec.loader.exec_module(module)  # type: ignore[union-attr]
+        return module.CASE["validate"]
+
+    before, after = validator("before", '"name" in d'), validator("after", '"age" in d')
+    assert fingerprint({"validate": before}) != fingerprint({"validate": after})
+    assert fingerprint({"validate": before}) == fingerprint({"validate": before})
+
+
+def test_index_results_prefers_newest(tmp_path: Path) -> None:
+    def write(name: str, got: str, mtime: int) -> None:
+        records = [{"case_id": "q", "input_hash": "h1", "got": got}, {"case_id": "old"}]
+        run = {"config": {}, "suites": {"reasoning_math": {"cases": records}}}
+        path = tmp_path / name
+        path.write_text(json.dumps({"configs_run": [run]}), encoding="utf-8")
+        os.utime(path, (mtime, mtime))
+
+    write("a.json", "older", 1_000)
+    write("b.json", "newer", 2_000)
+    (tmp_path / "broken.json").write_text("{", encoding="utf-8")
+
+    index = index_results(recent_results(tmp_path), {"reasoning_math": "cases"})
+    assert list(index) == [("reasoning_math", "h1")]
+    assert index[("reasoning_math", "h1")]["got"] == "newer"
+
+    read: list[str] = []
+
+    def newest_first() -> Iterator[Path]:
+        for path in recent_results(tmp_path):
+            read.append(path.name)
+            yield path
+
+    wanted = {("reasoning_math", "h1")}
+    index = index_results(newest_first(), {"reasoning_math": "cases"}, wanted)
+    assert index[("reasoning_math", "h1")]["got"] == "newer"
+    assert read == ["broken.json", "b.json"]  # all wanted found: a.json is never read
+
+
+async def test_reuse_case_regrades_when_grader_changes(monkeypatch: pytest.MonkeyPatch) -> None:
+    problem = rt.REASONING_PROBLEMS[0]
+    prior = rt.grade_case("reasoning_math", problem, "ANSWER: 1")
+    prior["input_hash"] = "h1"
+    monkeypatch.setattr(rt.RUNTIME, "baseline", {("reasoning_math", "h1"): prior})
+    monkeypatch.setattr(rt.RUNTIME, "reuse", rt.Counter())
+
+    assert await rt.reuse_case("reasoning_math", problem, "h1") is prior
+    assert await rt.reuse_case("reasoning_math", problem, "h2") is None
+
+    lenient = rt.SuiteGrader(**{
+        **rt.GRADERS["reasoning_math"].__dict__,
+        "grade": lambda p, raw: {**rt.grade_reasoning(p, raw), "found": True},
+    })
+    monkeypatch.setitem(rt.GRADERS, "reasoning_math", lenient)
+    regraded = await rt.reuse_case("reasoning_math", problem, "h1")
+    assert regraded is not None and regraded["found"] is True
+    assert regraded["input_hash"] == "h1" and regraded["raw_output"] == "ANSWER: 1"
+    assert rt.RUNTIME.reuse == {"reused": 1, "regraded": 1}
+
+
+def test_suite_fingerprint_follows_system_style() -> None:
+    precise, _, minimal, *_ = rt.build_configs("m")
+    assert minimal.system_style != precise.system_style
+    assert rt.suite_fingerprint("intent_classification", precise) != rt.suite_fingerprint(
+        "intent_classification", minimal
+    )
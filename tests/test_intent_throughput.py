@@ -0,0 +1,44 @@
+"""Tests for the batched intent throughput suite's parsing and grading."""
+
+from __future__ import annotations
+
+import sys
+
+import pytest
+
+import run_tests as rt
+
+
+def test_parse_batch_labels_json_and_numbered() -> None:
+    assert rt.parse_batch_labels('```json\n["search", "answer"]\n```', 2) == ["search", "answer"]
+    assert rt.parse_batch_labels('Labels: ["search", "answer", "escalate"]', 2) == [
+        "search", "answer",
+    ]
+    assert rt.parse_batch_labels("1. search\n2) tool_call\n4: answer", 3) == [
+        "search", "tool_call", "",
+    ]
+    assert rt.parse_batch_labels("I think these are searches.", 2) is None
+
+
+def test_grade_intent_batch_scores_each_query() -> None:
+    batch = rt.INTENT_PROMPTS[:3]  # all "search"
+    graded = rt.grade_intent_batch(batch, '["search", "answer"]')  # one label missing
+    assert graded["parsed"] is True
+    assert [c["loose"] for c in graded["cases"]] == [True, False, False]
+    assert graded["cases"][0] == rt.grade_intent(batch[0], "search")
+
+    unparsed = rt.grade_intent_batch(batch, "no idea")
+    assert unparsed["parsed"] is False
+    assert not any(c["loose"] for c in unparsed["cases"])
+
+
+def test_batch_sizes_must_be_positive(
+    monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+) -> None:
+    monkeypatch.setattr(sys, "argv", ["run_tests.py", "--batch-sizes", "1", "4"])
+    assert rt.parse_args().batch_sizes == [1, 4]
+    for bad in ("0", "-2", "x"):
+        monkeypatch.setattr(sys, "argv", ["run_tests.py", "--batch-sizes", "4", bad])
+        with pytest.raises(SystemExit):
+            rt.parse_args()
+        assert "expected a positive integer" in capsys.readouterr().err
@@ -0,0 +1,72 @@
+"""Tests for the crash-safe run journal and resuming from it."""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+import run_tests as rt
+from ai_test_harness import journal as journal_mod
+from ai_test_harness.journal import RunJournal, read_journal
+
+
+def test_journal_round_trip_ignores_torn_line(tmp_path: Path) -> None:
+    path = tmp_path / "run.jsonl"
+    journal = RunJournal.create(path, "r1", {"model_filter": ["m"]})
+    journal.record_case("m | precise", "intent_classification", "c1", {"correct": True})
+    journal.record_suite("m | precise", "latency", {"avg_tps": 10.0})
+    journal.close()
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"type": "case", "config": "m | pre')  # killed mid-write
+
+    resumed = RunJournal.resume(path)
+    assert resumed.run_id == "r1"
+    assert resumed.state.header["args"] == {"model_filter": ["m"]}
+    assert resumed.completed_case("m | precise", "intent_classification", "c1") == {"correct": True}
+    assert resumed.completed_suite("m | precise", "latency") == {"avg_tps": 10.0}
+    assert resumed.completed_suite("m | precise", "intent_classification") is None
+    resumed.finish()
+    assert read_journal(path).finished
+
+
+def test_fsync_is_batched(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    synced: list[int] = []
+    monkeypatch.setattr(journal_mod.os, "fsync", synced.append)
+    journal = RunJournal(tmp_path / "run.jsonl", fsync_every=10, fsync_interval_s=3600)
+    for i in range(25):
+        journal.record_case("cfg", "suite", str(i), {})
+    assert len(synced) == 2
+    journal.close()
+    assert len(synced) == 3  # the tail is synced on close
+    assert len(read_journal(tmp_path / "run.jsonl").cases) == 25
+
+
+async def test_run_cases_replays_journaled_cases(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    journal = RunJournal.create(tmp_path / "run.jsonl", "r1", {})
+    journal.record_case("m | precise", "reasoning_math", "q1", {"case_id": "q1", "found": True})
+    journal.close()
+    journal = RunJournal.resume(tmp_path / "run.jsonl")
+    monkeypatch.setattr(rt.RUNTIME, "journal", journal)
+    monkeypatch.setitem(rt.GRADERS, "reasoning_math", rt.SuiteGrader(
+        [], lambda p: p["question"], rt.grade_reasoning, rt.summarize_reasoning,
+    ))
+    ran: list[str] = []
+
+    async def fn(case: dict[str, Any]) -> dict[str, Any]:
+        ran.append(case["question"])
+        return {"case_id": case["question"], "found": False}
+
+    token = rt.CURRENT_CONFIG.set(rt.build_configs("m")[0])
+    try:
+        records = await rt.run_cases("reasoning_math", [{"question": "q1"}, {"question": "q2"}], fn)
+    finally:
+        rt.CURRENT_CONFIG.reset(token)
+    journal.close()
+
+    assert ran == ["q2"]
+    assert [r["found"] for r in records] == [True, False]
+    assert read_journal(tmp_path / "run.jsonl").cases[("m | precise", "reasoning_math", "q2")]
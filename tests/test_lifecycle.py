@@ -0,0 +1,61 @@
+"""Tests for model preload/unload lifecycle management."""
+
+from __future__ import annotations
+
+import json
+
+import httpx
+
+from ai_test_harness.lifecycle import ModelLifecycle
+
+
+def recording_client(calls: list[dict], load_ns: int = 3_000_000_000) -> httpx.AsyncClient:
+    def handler(request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        calls.append(body)
+        loading = body.get("keep_alive") != 0
+        return httpx.Response(200, json={"done": True, "load_duration": load_ns if loading else 0})
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler), base_url="http://test")
+
+
+async def test_preload_records_cold_load_time() -> None:
+    calls: list[dict] = []
+    async with recording_client(calls) as client:
+        lifecycle = ModelLifecycle(client, keep_alive="5m")
+        record = await lifecycle.preload("llama3", 4096)
+    assert calls == [{"model": "llama3", "keep_alive": "5m", "options": {"num_ctx": 4096}}]
+    assert record is not None and record.load_s == 3.0
+    assert lifecycle.load_for("llama3", 4096) is record
+    assert lifecycle.load_for("llama3", 8192) is None
+    assert lifecycle.report()["total_load_s"] == 3.0
+
+
+async def test_release_unloads_unless_pinned() -> None:
+    calls: list[dict] = []
+    async with recording_client(calls) as client:
+        unpinned = ModelLifecycle(client)
+        await unpinned.preload("llama3", 4096)
+        await unpinned.release("llama3")
+        assert calls[-1] == {"model": "llama3", "keep_alive": 0}
+        assert not unpinned.resident
+
+        calls.clear()
+        pinned = ModelLifecycle(client, pin=True)
+        await pinned.preload("qwen", 4096)
+        await pinned.release("qwen")
+        assert calls[0]["keep_alive"] == -1 and len(calls) == 1
+        await pinned.close()
+    assert calls[-1] == {"model": "qwen", "keep_alive": 0}
+
+
+async def test_failed_preload_is_not_fatal() -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(404, json={"error": "model not found"})
+
+    async with httpx.AsyncClient(
+        transport=httpx.MockTransport(handler), base_url="http://test"
+    ) as client:
+        lifecycle = ModelLifecycle(client)
+        assert await lifecycle.preload("missing", 4096) is None
+    assert lifecycle.loads == []
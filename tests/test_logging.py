@@ -0,0 +1,106 @@
+"""Tests for the buffered, sampled, rotating log sink behind log_event."""
+
+from __future__ import annotations
+
+import json
+import random
+import sys
+import threading
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+import run_tests as rt
+from ai_test_harness.logging import LogSink, configure_logging, log_event
+
+
+def read(path: Path) -> list[dict[str, Any]]:
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def test_log_event_goes_to_the_sink_with_sampling(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    sink = configure_logging(tmp_path / "logs" / "harness.ndjson",
+                             sample={"result_recorded": 0.0, "model_preloaded": 1.0})
+    try:
+        for i in range(10):
+            log_event("result_recorded", run_id="r1", value=i)
+        log_event("model_preloaded", model="m", load_s=1.5)
+        log_event("endpoint_ejected", level="warning", url="http://a")
+    finally:
+        configure_logging(None)
+    log_event("after", x=1)
+
+    records = read(sink.path)
+    assert [r["event"] for r in records] == ["model_preloaded", "endpoint_ejected"]
+    assert records[0]["model"] == "m" and "sample_rate" not in records[0]
+    assert records[1]["level"] == "warning"
+    assert sink.stats["sampled_out"] == 10 and sink.stats["written"] == 2
+    assert json.loads(capsys.readouterr().err)["event"] == "after"  # back on stderr
+
+
+def test_fractional_sampling_keeps_about_that_share(tmp_path: Path) -> None:
+    random.seed(1234)
+    sink = LogSink(tmp_path / "h.ndjson", sample={"tick": 0.25})
+    for i in range(2000):
+        sink.emit({"event": "tick", "i": i})
+    sink.close()
+
+    records = read(sink.path)
+    assert 425 <= len(records) <= 575  # 500 expected, sd ~19
+    assert all(r["sample_rate"] == 0.25 for r in records)
+    assert sink.stats["sampled_out"] + len(records) == 2000
+
+
+def test_log_sample_needs_a_log_file(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+) -> None:
+    monkeypatch.setattr(sys, "argv", ["run_tests.py", "--log-sample", "tick=0.5"])
+    with pytest.raises(SystemExit):
+        rt.parse_args()
+    assert "--log-sample needs --log-file" in capsys.readouterr().err
+    log = tmp_path / "h.ndjson"
+    monkeypatch.setattr(sys, "argv", ["run_tests.py", "--log-file", str(log),
+                                      "--log-sample", "tick=0.5"])
+    assert rt.parse_args().log_sample == [("tick", 0.5)]
+
+
+def test_sink_rotates_files(tmp_path: Path) -> None:
+    sink = LogSink(tmp_path / "h.ndjson", max_bytes=500, backups=2)
+    for i in range(40):
+        sink.emit({"event": "tick", "i": i, "pad": "x" * 40})
+    sink.close()
+
+    files = sorted(p.name for p in tmp_path.iterdir())
+    assert files == ["h.ndjson", "h.ndjson.1", "h.ndjson.2"]
+    assert all((tmp_path / name).stat().st_size <= 500 for name in files)
+    kept = [r["i"] for name in reversed(files) for r in read(tmp_path / name)]
+    assert kept == list(range(40 - len(kept), 40))  # the oldest rotated out
+    assert sink.stats["rotations"] >= 2 and sink.stats["written"] == 40
+
+
+def test_full_queue_drops_and_reports(tmp_path: Path) -> None:
+    sink = LogSink(tmp_path / "h.ndjson", queue_size=3, flush_s=0.01)
+    release, writing = threading.Event(), threading.Event()
+    write = sink._write
+
+    def stalled(batch: list[dict[str, Any]]) -> None:
+        writing.set()
+        release.wait(5)
+        write(batch)
+
+    sink._write = stalled  # type: ignore[method-assign]
+    sink.emit({"event": "first"})
+    assert writing.wait(5)  # the writer is stuck on "first"; the queue holds 3 more
+    for i in range(10):
+        sink.emit({"event": "burst", "i": i})
+    release.set()
+    sink.close()
+
+    assert sink.stats["dropped"] == 7
+    events = [r["event"] for r in read(sink.path)]
+    assert events[:4] == ["first", "burst", "burst", "burst"]
+    assert read(sink.path)[-1] == {**read(sink.path)[-1], "event": "log_records_dropped",
+                                   "dropped": 7}
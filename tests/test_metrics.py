@@ -0,0 +1,130 @@
+"""Tests for the live Prometheus metrics series and their HTTP endpoint."""
+
+from __future__ import annotations
+
+import asyncio
+import re
+from typing import Any
+
+import httpx
+import pytest
+
+import run_tests as rt
+from ai_test_harness.metrics import HarnessMetrics, Histogram, MetricsServer, RateWindow
+from ai_test_harness.mock_server import LatencyModel, MockServer
+from ai_test_harness.sandbox import ExecResult, Limits, SandboxPool
+
+
+def samples(text: str) -> dict[str, float]:
+    return {line.rsplit(" ", 1)[0]: float(line.rsplit(" ", 1)[1])
+            for line in text.splitlines() if line and not line.startswith("#")}
+
+
+def test_histogram_and_rates_render_in_exposition_format() -> None:
+    latency = Histogram("lat_seconds", "Latency.", ("model",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.7, 3.0):
+        latency.observe(value, model='a"b')
+    lines = latency.render()
+    assert lines[:2] == ["# HELP lat_seconds Latency.", "# TYPE lat_seconds histogram"]
+    assert lines[2:] == [
+        'lat_seconds_bucket{model="a\\"b",le="0.1"} 1',
+        'lat_seconds_bucket{model="a\\"b",le="1"} 3',
+        'lat_seconds_bucket{model="a\\"b",le="+Inf"} 4',
+        'lat_seconds_sum{model="a\\"b"} 4.25',
+        'lat_seconds_count{model="a\\"b"} 4',
+    ]
+    with pytest.raises(ValueError):
+        latency.observe(1.0)  # missing its label
+
+    now = [0.0]
+    window = RateWindow(10.0, clock=lambda: now[0])
+    window.add(5)
+    now[0] = 5.0
+    assert window.rate() == 1.0  # 5 over the 5s seen so far
+    now[0] = 20.0
+    window.add(4)
+    assert window.rate() == 0.4  # the first 5 fell out of the window
+
+
+async def test_server_answers_scrapes() -> None:
+    metrics = HarnessMetrics()
+    metrics.record_request("m", "s", 0.3, prompt_tokens=40, completion_tokens=10)
+    metrics.record_request_error("m", "s", httpx.ReadTimeout("slow"))
+    metrics.collectors.append(lambda m: m.record_cache("response", hits=3, misses=1))
+    server = MetricsServer(metrics, port=0)
+    await server.start()
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{server.port}") as client:
+            resp = await client.get("/metrics")
+            missing = await client.get("/")
+    finally:
+        await server.close()
+
+    assert resp.status_code == 200 and resp.headers["content-type"].startswith("text/plain")
+    assert missing.status_code == 404
+    got = samples(resp.text)
+    assert got['harness_requests_total{model="m",suite="s"}'] == 1
+    assert got['harness_tokens_total{model="m",kind="prompt"}'] == 40
+    assert got['harness_request_duration_seconds_bucket{model="m",suite="s",le="0.5"}'] == 1
+    assert got['harness_request_errors_total{model="m",suite="s",kind="timeout"}'] == 1
+    assert got['harness_cache_hit_ratio{cache="response"}'] == 0.75
+    assert got['harness_tokens_per_second{kind="completion"}'] > 0
+    assert all(re.fullmatch(r"[a-z_]+(\{.*\})?", name) for name in got)
+
+
+async def test_run_cases_counts_cases_and_requests(monkeypatch: pytest.MonkeyPatch) -> None:
+    metrics = HarnessMetrics()
+    monkeypatch.setattr(rt.RUNTIME, "metrics", metrics)
+    monkeypatch.setattr(rt.RUNTIME, "executor", rt.CaseExecutor(suite_limit=2))
+    monkeypatch.setattr(rt.RUNTIME, "journal", None)
+    monkeypatch.setattr(rt.RUNTIME, "cache", None)
+    config = rt.build_configs("m")[0]
+    in_flight: list[float] = []
+
+    async def solve(prob: dict[str, str]) -> dict[str, Any]:
+        in_flight.append(metrics.in_flight._values[()])
+        await asyncio.sleep(0.01)
+        data = {"choices": [{"message": {"content": prob["answer"]}}],
+                "usage": {"prompt_tokens": 7, "completion_tokens": 2}}
+        rt.finish_response(config, data, None, elapsed=0.01)
+        if prob is rt.REASONING_PROBLEMS[3]:
+            raise RuntimeError("boom")
+        return rt.grade_case("reasoning_math", prob, prob["answer"])
+
+    tokens = rt.CURRENT_CONFIG.set(config), rt.CURRENT_SUITE.set("reasoning_math")
+    try:
+        with pytest.raises(RuntimeError):
+            await rt.run_cases("reasoning_math", rt.REASONING_PROBLEMS[:4], solve)
+    finally:
+        rt.CURRENT_CONFIG.reset(tokens[0])
+        rt.CURRENT_SUITE.reset(tokens[1])
+
+    got = samples(metrics.render())
+    done = 'harness_cases_completed_total{model="m",suite="reasoning_math",outcome="%s"}'
+    assert max(in_flight) == 2 and got["harness_cases_in_flight"] == 0
+    assert got[done % "ok"] == 3 and got[done % "error"] == 1
+    assert got['harness_requests_total{model="m",suite="reasoning_math"}'] == 4
+    assert got['harness_tokens_total{model="m",kind="prompt"}'] == 28
+
+
+async def test_code_timeouts_count_fresh_runs_only(monkeypatch: pytest.MonkeyPatch) -> None:
+    metrics = HarnessMetrics()
+    for name, value in (("metrics", metrics), ("executor", rt.CaseExecutor(suite_limit=1)),
+                        ("journal", None), ("cache", None), ("baseline", None),
+                        ("progress", None), ("api", "openai"), ("code_samples", 1)):
+        monkeypatch.setattr(rt.RUNTIME, name, value)
+    server = MockServer(latency=LatencyModel(load_ms=0, prefill_ms_per_token=0,
+                                             decode_ms_per_token=0, jitter=0),
+                        default_answer="while True: pass")
+    async with SandboxPool(size=1, limits=Limits(timeout_s=0.2)) as sandbox:
+        monkeypatch.setattr(rt.RUNTIME, "sandbox", sandbox)
+        async with httpx.AsyncClient(transport=server.transport(), base_url="http://m") as client:
+            result = await rt.run_code_suite(client, rt.build_configs("m")[0])
+
+    assert {c["status"] for c in result["cases"]} == {"TIMEOUT"}
+    fresh = sandbox.stats["runs"]
+    assert 0 < fresh < len(rt.CODE_PROMPTS)
+    assert sandbox.stats["cache_hits"] == len(rt.CODE_PROMPTS) - fresh
+    assert metrics.code_timeouts._values[()] == fresh  # cached repeats are not new timeouts
+    rt.grade_code(rt.CODE_PROMPTS[0], "", ExecResult(None, timed_out=True))  # as --rescore does
+    assert metrics.code_timeouts._values[()] == fresh
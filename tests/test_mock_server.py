@@ -0,0 +1,81 @@
+"""Tests for the mock inference server."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from ai_test_harness.mock_server import FaultPlan, LatencyModel, MockServer
+from ai_test_harness.ollama import native_chat
+from ai_test_harness.streaming import stream_chat_completion
+
+FAST = LatencyModel(load_ms=0, prefill_ms_per_token=0, decode_ms_per_token=1, jitter=0)
+
+
+def client_for(server: MockServer) -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=server.transport(), base_url="http://mock")
+
+
+async def test_scripted_answer_with_native_timings() -> None:
+    server = MockServer(
+        latency=LatencyModel(load_ms=50, decode_ms_per_token=5, jitter=0),
+        script={"capital of france": "Paris is the capital"},
+    )
+    async with client_for(server) as client:
+        data = await native_chat(client, {
+            "model": "m",
+            "messages": [{"role": "user", "content": "What is the capital of France?"}],
+            "options": {"num_ctx": 4096},
+        })
+        ps = (await client.get("/api/ps")).json()
+    assert data["choices"][0]["message"]["content"] == "Paris is the capital"
+    timing = data["timing"]
+    assert timing.load_s == pytest.approx(0.05)
+    assert timing.completion_tokens == 4 and timing.decode_s == pytest.approx(0.02)
+    assert ps == {"models": [{"name": "m", "context_length": 4096}]}
+
+
+async def test_requests_queue_beyond_parallel_slots() -> None:
+    latency = LatencyModel(load_ms=0, prefill_ms_per_token=0, decode_ms_per_token=20,
+                           jitter=0, parallel=2)
+    server = MockServer(latency=latency, default_answer="a b c")  # 60ms per request
+    body = {"model": "m", "messages": [{"role": "user", "content": "hi"}]}
+    async with client_for(server) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(client.post("/v1/chat/completions", json=body) for _ in range(4)))
+        elapsed = time.perf_counter() - start
+    # Four requests through two slots take two rounds
+    assert 0.11 < elapsed < 0.5
+
+
+async def test_injected_faults() -> None:
+    body = {"model": "m", "messages": [{"role": "user", "content": "hi"}]}
+    async with client_for(MockServer(latency=FAST, faults=FaultPlan(error_rate=1.0))) as client:
+        assert (await client.post("/v1/chat/completions", json=body)).status_code == 500
+
+    hung = MockServer(latency=FAST, faults=FaultPlan(timeout_rate=1.0, hang_s=5))
+    async with client_for(hung) as client:
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(client.post("/v1/chat/completions", json=body), 0.05)
+
+    cut = MockServer(latency=FAST, faults=FaultPlan(truncate_rate=1.0), default_answer="a b c d")
+    async with client_for(cut) as client:
+        data, timing = await stream_chat_completion(client, body)
+    assert data["choices"][0]["message"]["content"] == "a b "
+    assert data["usage"] == {}  # the stream ended before the usage chunk
+    assert cut.stats["fault_truncate"] == 1
+
+
+async def test_serves_over_local_http() -> None:
+    server = MockServer(latency=FAST, default_answer="over the wire")
+    listener = await server.serve("127.0.0.1", 0)
+    port = listener.sockets[0].getsockname()[1]
+    body = {"model": "m", "messages": [{"role": "user", "content": "hi"}]}
+    async with listener, httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}") as client:
+        resp = await client.post("/v1/chat/completions", json=body)
+        data, _ = await stream_chat_completion(client, body)
+    assert resp.json()["choices"][0]["message"]["content"] == "over the wire"
+    assert data["choices"][0]["message"]["content"] == "over the wire"
@@ -0,0 +1,71 @@
+"""Tests for the native Ollama /api/chat client."""
+
+from __future__ import annotations
+
+import json
+
+import httpx
+
+from ai_test_harness.ollama import native_chat, native_payload, stream_native_chat
+
+TIMINGS = {
+    "load_duration": 2_000_000_000,
+    "prompt_eval_count": 100,
+    "prompt_eval_duration": 500_000_000,
+    "eval_count": 40,
+    "eval_duration": 1_000_000_000,
+}
+
+
+def test_native_payload_moves_sampling_into_options() -> None:
+    body = native_payload(
+        {"model": "m", "messages": [], "max_tokens": 32, "temperature": 0.0,
+         "options": {"num_ctx": 4096}}
+    )
+    assert body == {
+        "stream": False,
+        "model": "m",
+        "messages": [],
+        "options": {"num_ctx": 4096, "num_predict": 32, "temperature": 0.0},
+    }
+
+
+async def test_native_chat_splits_wall_time() -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert request.url.path == "/api/chat"
+        return httpx.Response(200, json={"message": {"content": "hi"}, "done": True, **TIMINGS})
+
+    async with httpx.AsyncClient(
+        transport=httpx.MockTransport(handler), base_url="http://test"
+    ) as client:
+        data = await native_chat(client, {"model": "m", "messages": []})
+    assert data["choices"][0]["message"]["content"] == "hi"
+    assert data["usage"] == {"prompt_tokens": 100, "completion_tokens": 40}
+    assert data["load_duration"] == TIMINGS["load_duration"]
+    timing = data["timing"]
+    assert (timing.load_s, timing.prefill_s, timing.decode_s) == (2.0, 0.5, 1.0)
+    # The mock answers instantly, so server time exceeds wall time and overhead clamps to 0
+    assert timing.overhead_s == 0.0
+    assert timing.tokens_per_second_prompt == 200.0
+    assert timing.tokens_per_second_generation == 40.0
+
+
+async def test_stream_native_chat_reads_final_chunk_timings() -> None:
+    lines = [
+        {"message": {"content": "Hel"}, "done": False},
+        {"message": {"content": "lo"}, "done": False},
+        {"message": {"content": ""}, "done": True, **TIMINGS},
+    ]
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert json.loads(request.content)["stream"] is True
+        return httpx.Response(200, text="\n".join(json.dumps(x) for x in lines) + "\n")
+
+    async with httpx.AsyncClient(
+        transport=httpx.MockTransport(handler), base_url="http://test"
+    ) as client:
+        data, timing = await stream_native_chat(client, {"model": "m", "messages": []})
+    assert data["choices"][0]["message"]["content"] == "Hello"
+    assert len(timing.chunk_times) == 2
+    assert timing.completion_tokens == 40
+    assert data["timing"].decode_s == 1.0
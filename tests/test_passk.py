@@ -0,0 +1,89 @@
+"""Tests for the pass@k estimator and the sampled code_generation summary."""
+
+from __future__ import annotations
+
+import sys
+from math import comb
+
+import httpx
+import pytest
+
+import run_tests as rt
+from ai_test_harness.mock_server import LatencyModel, MockServer
+from ai_test_harness.passk import mean_pass_at_k, pass_at_k
+
+
+def test_pass_at_k_matches_the_combinatorial_form() -> None:
+    for n, c, k in [(10, 3, 1), (10, 3, 5), (20, 1, 10), (5, 0, 2)]:
+        assert pass_at_k(n, c, k) == pytest.approx(1 - comb(n - c, k) / comb(n, k))
+    assert pass_at_k(10, 3, 1) == pytest.approx(0.3)  # pass@1 is the pass rate
+    assert pass_at_k(10, 8, 5) == 1.0  # fewer than k failures: some sample passes
+    with pytest.raises(ValueError):
+        pass_at_k(4, 1, 5)
+
+    means = mean_pass_at_k([(10, 3), (10, 0), (4, 4)], [1, 5, 1])
+    assert list(means) == [1]  # k=5 exceeds the smallest n
+    assert means[1] == pytest.approx((0.3 + 0 + 1) / 3)
+
+
+def test_pass_k_must_be_positive(
+    monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+) -> None:
+    monkeypatch.setattr(sys, "argv", ["run_tests.py", "--pass-k", "1", "5"])
+    assert rt.parse_args().pass_k == [1, 5]
+    for bad in ("0", "-1"):
+        monkeypatch.setattr(sys, "argv", ["run_tests.py", "--pass-k", "1", bad])
+        with pytest.raises(SystemExit):
+            rt.parse_args()
+        assert "expected a positive integer" in capsys.readouterr().err
+
+
+def test_summarize_code_adds_pass_at_k_for_sampled_cases() -> None:
+    def case(statuses: list[str]) -> dict[str, object]:
+        n, passed = len(statuses), statuses.count("PASS")
+        return {
+            "status": statuses[0], "ran": statuses[0] != "FAIL",
+            "samples": [{"status": s} for s in statuses], "passed": passed,
+            "unique_programs": len(set(statuses)),
+            "pass_at_k": {str(k): pass_at_k(n, passed, k) for k in (1, 2)},
+        }
+
+    summary = rt.summarize_code([case(["PASS", "FAIL", "FAIL", "FAIL"]), case(["FAIL"] * 4)])
+    assert summary["correctness_percent"] == 50.0  # first samples only
+    assert summary["pass_at_k"] == {"1": 12.5, "2": 25.0}
+    assert summary["samples"] == 8 and summary["unique_programs"] == 3
+    assert "pass_at_k" not in rt.summarize_code([{"status": "PASS", "ran": True}])
+
+
+async def test_samples_per_s_counts_only_samples_drawn_in_this_run(
+    monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+) -> None:
+    for name, value in (("metrics", None), ("executor", rt.CaseExecutor(suite_limit=2)),
+                        ("journal", None), ("cache", None), ("sandbox", None),
+                        ("progress", None), ("api", "openai"), ("code_samples", 2),
+                        ("pass_k", (1, 2))):
+        monkeypatch.setattr(rt.RUNTIME, name, value)
+    fresh = rt.CODE_PROMPTS[0]
+
+    async def reuse_case(suite: str, case: dict[str, str], input_hash: str) -> dict | None:
+        if case is fresh:
+            return None
+        return {"prompt": case["prompt"], "status": "PASS", "ran": True, "passed": 2,
+                "samples": [{"status": "PASS"}] * 2, "unique_programs": 1,
+                "pass_at_k": {"1": 1.0, "2": 1.0}}
+
+    monkeypatch.setattr(rt, "reuse_case", reuse_case)
+    server = MockServer(latency=LatencyModel(load_ms=0, prefill_ms_per_token=0,
+                                             decode_ms_per_token=50, jitter=0),
+                        default_answer="print(1)")
+    config = rt.build_configs("m")[0]
+    token = rt.CURRENT_CONFIG.set(config)
+    try:
+        async with httpx.AsyncClient(transport=server.transport(), base_url="http://m") as client:
+            result = await rt.run_code_suite(client, config)
+    finally:
+        rt.CURRENT_CONFIG.reset(token)
+
+    assert result["samples"] == 2 * len(rt.CODE_PROMPTS)
+    assert "; 2 drawn in " in capsys.readouterr().out
+    assert result["samples_per_s"] <= 2 / 0.05  # each sample decodes for at least 50ms
@@ -0,0 +1,59 @@
+"""Tests for the multi-endpoint inference pool."""
+
+from __future__ import annotations
+
+import asyncio
+
+import httpx
+
+from ai_test_harness.pool import EndpointPool
+
+A = "http://ollama-a:11434"
+B = "http://ollama-b:11435"
+
+
+def ps_handler(loaded: dict[str, list[str]], down: frozenset[str] = frozenset()):
+    async def handler(request: httpx.Request) -> httpx.Response:
+        origin = f"{request.url.scheme}://{request.url.host}:{request.url.port}"
+        if origin in down:
+            raise httpx.ConnectError("connection refused", request=request)
+        if request.url.path == "/api/ps":
+            return httpx.Response(200, json={"models": [{"name": m} for m in loaded[origin]]})
+        await asyncio.sleep(0.01)
+        return httpx.Response(200, json={"served_by": origin})
+
+    return handler
+
+
+async def test_model_affinity_routes_to_loaded_instance() -> None:
+    pool = EndpointPool([A, B], transport=httpx.MockTransport(ps_handler({A: [], B: ["qwen"]})))
+    await pool.check_health()
+    async with pool.client() as client:
+        resp = await client.post("/v1/chat/completions", json={"model": "qwen"})
+    assert resp.json()["served_by"] == B
+    await pool.aclose()
+
+
+async def test_least_outstanding_spreads_load() -> None:
+    pool = EndpointPool(
+        [A, B], max_outstanding=2, transport=httpx.MockTransport(ps_handler({A: [], B: []}))
+    )
+    async with pool.client() as client:
+        responses = await asyncio.gather(
+            *(client.post("/v1/chat/completions", json={"model": "m"}) for _ in range(4))
+        )
+    served = [r.json()["served_by"] for r in responses]
+    assert served.count(A) == 2 and served.count(B) == 2
+    assert all(e.outstanding == 0 for e in pool.endpoints)
+    await pool.aclose()
+
+
+async def test_failing_instance_is_ejected_and_requests_retry() -> None:
+    handler = ps_handler({A: [], B: []}, down=frozenset({A}))
+    pool = EndpointPool([A, B], transport=httpx.MockTransport(handler))
+    await pool.check_health()
+    assert pool.endpoints[0].ejections == 1
+    async with pool.client() as client:
+        resp = await client.post("/v1/chat/completions", json={"model": "m"})
+    assert resp.json()["served_by"] == B
+    await pool.aclose()
@@ -0,0 +1,109 @@
+"""Tests for run progress tracking, the blended ETA and the live view."""
+
+from __future__ import annotations
+
+import asyncio
+import sqlite3
+from pathlib import Path
+
+import pytest
+from rich.console import Console
+
+from ai_test_harness.progress import HISTORY_WEIGHT, LiveView, ProgressTracker, load_history
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_eta_blends_observed_case_times_with_history() -> None:
+    clock = Clock()
+    tracker = ProgressTracker(
+        [("m | precise", "m"), ("m | creative", "m")], ["s1", "s2"],
+        history={("m", "s1"): (2.0, 4.0)}, clock=clock,
+    )
+    assert tracker.eta() is None  # nothing known about s2 yet
+    assert tracker.case_seconds("m", "s1") == 2.0
+
+    tracker.plan_cases("m | precise", "s1", 4)
+    for _ in range(2):  # two cases at a time, 1s each
+        with tracker.case("m | precise", "s1"), tracker.case("m | precise", "s1"):
+            clock.now += 1.0
+            tracker.observe("m | precise", "s1", 1.0)
+            tracker.observe("m | precise", "s1", 1.0)
+    assert tracker.finish_suite("m | precise", "s1") == {"count": 4, "mean": 1.0}
+    assert tracker.parallelism == 2.0
+    blended = (4 * 1.0 + HISTORY_WEIGHT * 2.0) / (4 + HISTORY_WEIGHT)
+    assert tracker.case_seconds("m", "s1") == pytest.approx(blended)
+    assert tracker.case_seconds("m", "s2") == 1.0  # no history: the model's other suites
+
+    tracker.plan_cases("m | precise", "s2", 6)
+    # Left: creative's s1 (4 cases, as in this run) and both s2 (6 cases each), 2 at a time
+    assert tracker.eta() == pytest.approx((4 * blended + 12 * 1.0) / 2)
+    rows = tracker.config_rows()
+    assert rows[0] == {"config": "m | precise", "done": 4, "total": 10, "suites_done": 1,
+                       "suites": 2, "failed": 0, "running": "s2"}
+    assert rows[1]["total"] == 10 and rows[1]["running"] is None
+
+
+def test_eta_without_history_uses_static_case_counts() -> None:
+    clock = Clock()
+    tracker = ProgressTracker([("m | precise", "m"), ("m | creative", "m")], ["s1", "s2"],
+                              cases={"s1": 2, "s2": 3}, clock=clock)
+    assert tracker.eta() is None  # no case has run yet
+    assert tracker.config_rows()[1]["total"] == 5
+
+    tracker.plan_cases("m | precise", "s1", 2)
+    with tracker.case("m | precise", "s1"):
+        clock.now += 2.0
+        tracker.observe("m | precise", "s1", 2.0)
+    # 1 + 2 + 3 + 3 cases left, none started but s1 of precise, at the 2s seen so far
+    assert tracker.eta() == pytest.approx(9 * 2.0)
+
+
+def test_history_comes_from_the_results_database(
+    tmp_path: Path, db_conn: sqlite3.Connection
+) -> None:
+    for run_id, mean in (("r1", 1.0), ("r2", 3.0)):
+        db_conn.execute(
+            "INSERT INTO test_runs (run_id, model_name, test_suite, test_name, config_label) "
+            "VALUES (?, 'm', 'latency', 'm | precise | latency', 'm | precise')", (run_id,))
+        db_conn.executemany(
+            "INSERT INTO test_results (run_id, model_name, test_name, metric_name, "
+            "metric_value) VALUES (?, 'm', 'm | precise | latency', ?, ?)",
+            [(run_id, "case_s.mean", mean), (run_id, "case_s.count", 5.0)])
+    db_conn.commit()
+
+    history = load_history(tmp_path / "test.db", ["m"], ["latency", "json_conformance"])
+    assert history == {("m", "latency"): (2.0, 5.0)}
+    assert load_history(tmp_path / "missing.db", ["m"], ["latency"]) == {}
+
+
+async def test_live_view_draws_progress_endpoints_and_rates() -> None:
+    clock = Clock()
+    tracker = ProgressTracker([("m | precise", "m")], ["s1"], clock=clock)
+    tracker.plan_cases("m | precise", "s1", 3)
+    with tracker.case("m | precise", "s1"):
+        clock.now += 30.0
+        tracker.observe("m | precise", "s1", 30.0)
+    console = Console(record=True, width=120, force_terminal=False)
+    view = LiveView(
+        tracker,
+        lambda: [{"url": "http://a:11434", "outstanding": 2, "served": 9, "ejections": 0}],
+        lambda: {"requests_per_s": 3.5, "prompt_tok_s": 120.0, "completion_tok_s": 40.0,
+                 "request_errors": 2, "timeouts": 1},
+        console=console, refresh_s=0.01,
+    )
+    task = asyncio.create_task(view.run())
+    await asyncio.sleep(0.05)
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+    text = console.export_text()
+    assert "m | precise" in text and "1/3" in text and "http://a:11434" in text
+    assert "3.5 req/s" in text and "completion 40 tok/s" in text
+    assert "errors 2 (1 timeouts)" in text and "ETA 1:00" in text  # 2 cases x 30s
@@ -0,0 +1,105 @@
+"""Tests for historical queries over the rollup tables and the `harness query` command."""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+from datetime import UTC, datetime
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from ai_test_harness.cli import main
+from ai_test_harness.query import parse_when, query_rollups
+
+
+def add_suite(
+    conn: sqlite3.Connection, run_id: str, label: str, suite: str, day: str,
+    metrics: dict[str, list[float]], digest: str = "sha256:abc",
+) -> None:
+    model = label.split(" | ")[0]
+    test_name = f"{label} | {suite}"
+    conn.execute(
+        "INSERT INTO test_runs (run_id, model_name, test_suite, test_name, config_label, "
+        "model_digest, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+        (run_id, model, suite, test_name, label, digest, f"{day} 03:00:00"),
+    )
+    conn.executemany(
+        "INSERT INTO test_results (run_id, model_name, test_name, metric_name, metric_value, "
+        "created_at) VALUES (?, ?, ?, ?, ?, ?)",
+        [(run_id, model, test_name, name, v, f"{day} 03:00:00")
+         for name, values in metrics.items() for v in values],
+    )
+    conn.commit()
+
+
+@pytest.fixture()
+def history(db_conn: sqlite3.Connection) -> sqlite3.Connection:
+    add_suite(db_conn, "r1", "qwen | precise", "latency", "2025-01-01", {"avg_tps": [40.0]})
+    add_suite(db_conn, "r2", "qwen | precise", "latency", "2025-01-02", {"avg_tps": [44.0]})
+    add_suite(db_conn, "r2", "qwen | creative", "latency", "2025-01-02", {"avg_tps": [50.0]},
+              digest="sha256:def")
+    add_suite(db_conn, "r2", "qwen | precise", "code_generation", "2025-01-02",
+              {"cases.exec_s": [0.1, 0.3], "correctness_percent": [50.0]})
+    return db_conn
+
+
+def test_query_trend_filters_and_groups(history: sqlite3.Connection) -> None:
+    trend = query_rollups(history, models=["qwen"], configs=["precise"], suites=["latency"],
+                          metrics=["avg_tps"], group_by=["day"])
+    assert [(r["day"], r["mean"]) for r in trend] == [("2025-01-01", 40.0), ("2025-01-02", 44.0)]
+
+    pooled = query_rollups(history, metrics=["avg_tps"], group_by=["model"])
+    assert pooled[0]["runs"] == 2 and pooled[0]["count"] == 3
+    assert pooled[0]["mean"] == pytest.approx(44.6667)
+    assert pooled[0]["stddev"] == pytest.approx(5.0332)
+
+    cases = query_rollups(history, metrics=["cases.*"], group_by=["metric"])
+    assert [(r["metric"], r["count"], r["mean"]) for r in cases] == [("cases.exec_s", 2, 0.2)]
+    assert query_rollups(history, digest="sha256:de", group_by=["config"])[0]["config"] == (
+        "qwen | creative"
+    )
+    assert query_rollups(history, since="2025-01-02", until="2025-01-02 23:59",
+                         suites=["latency"], group_by=["run"])[0]["runs"] == 1
+    with pytest.raises(ValueError):
+        query_rollups(history, group_by=["colour"])
+
+
+def test_until_date_keeps_the_whole_day(history: sqlite3.Connection) -> None:
+    def days(until: str) -> list[str]:
+        rows = query_rollups(history, metrics=["avg_tps"], until=until, group_by=["day"])
+        return [r["day"] for r in rows]
+
+    assert days("2025-01-01") == ["2025-01-01"]  # its rows are at 03:00
+    assert days("2025-01-02") == ["2025-01-01", "2025-01-02"]
+    assert days("2025-01-01 02:00") == []
+
+
+def test_parse_when() -> None:
+    now = datetime(2025, 3, 31, 12, 0, tzinfo=UTC)
+    assert parse_when("30d", now) == "2025-03-01 12:00:00"
+    assert parse_when("12h", now) == "2025-03-31 00:00:00"
+    assert parse_when("2025-01-31") == "2025-01-31 00:00:00"
+    assert parse_when("2025-01-31", end=True) == "2025-02-01 00:00:00"
+    assert parse_when("2025-01-31T06:00", end=True) == "2025-01-31 06:00:00"
+    with pytest.raises(ValueError):
+        parse_when("last tuesday")
+
+
+def test_query_command_formats(history: sqlite3.Connection, tmp_path: Path) -> None:
+    db = Path(history.execute("PRAGMA database_list").fetchone()[2])
+    runner = CliRunner()
+    args = ["query", "--db", str(db), "-s", "latency", "--metric", "avg_tps", "-g", "config"]
+
+    as_json = runner.invoke(main, [*args, "--format", "json"])
+    assert as_json.exit_code == 0
+    configs = [r["config"] for r in json.loads(as_json.output)]
+    assert configs == ["qwen | creative", "qwen | precise"]
+
+    as_csv = runner.invoke(main, [*args, "--format", "csv"])
+    assert as_csv.output.splitlines()[0] == "config,runs,count,mean,stddev,last"
+
+    assert "qwen | precise" in runner.invoke(main, args).output
+    missing = runner.invoke(main, ["query", "--db", str(tmp_path / "none.db")])
+    assert missing.exit_code != 0 and "no results database" in missing.output
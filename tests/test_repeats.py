@@ -0,0 +1,42 @@
+"""Tests for the adaptive repeat policy and its confidence intervals."""
+
+from __future__ import annotations
+
+import pytest
+
+from ai_test_harness.repeats import RepeatPolicy, bootstrap_interval, wilson_interval
+
+
+def test_wilson_interval() -> None:
+    low, high = wilson_interval(8, 10)
+    assert low == pytest.approx(0.4902, abs=1e-3)
+    assert high == pytest.approx(0.9433, abs=1e-3)
+    assert wilson_interval(0, 0) == (0.0, 1.0)
+    # More trials at the same rate narrow the interval
+    low_n, high_n = wilson_interval(800, 1000)
+    assert high_n - low_n < high - low
+
+
+def test_bootstrap_interval_reflects_spread() -> None:
+    assert bootstrap_interval([0.8]) == (0.0, 1.0)
+    assert bootstrap_interval([0.8, 0.8, 0.8]) == pytest.approx((0.8, 0.8))
+    low, high = bootstrap_interval([0.2, 0.9, 0.4, 0.7])
+    assert 0.2 <= low < high <= 0.9
+
+
+def test_policy_stops_early_when_stable_and_caps_noise() -> None:
+    policy = RepeatPolicy(min_repeats=2, max_repeats=5, target_width=0.1)
+    assert not policy.done([0.8], [25])
+    assert policy.done([0.8, 0.8], [25, 25])  # deterministic: stop at the minimum
+    assert not policy.done([0.2, 0.9], [25, 25])
+    assert policy.done([0.2, 0.9, 0.4, 0.7, 0.5], [25] * 5)  # noisy: stop at the maximum
+
+    summary = policy.summary([0.2, 0.9, 0.4, 0.7, 0.5], [25] * 5)
+    assert summary["repeats"] == 5 and summary["mean"] == 0.54
+    assert summary["converged"] is False
+
+    wilson = RepeatPolicy(min_repeats=1, max_repeats=10, target_width=0.35, method="wilson")
+    assert not wilson.done([0.8], [10])
+    assert wilson.done([0.8, 0.8], [10, 10])
+    with pytest.raises(ValueError):
+        RepeatPolicy(method="t-test")
@@ -0,0 +1,89 @@
+"""Tests for re-grading stored raw outputs (run_tests.py --rescore)."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+import run_tests as rt
+
+
+def stored_run(outputs: dict[str, str]) -> dict:
+    records = [
+        rt.grade_case("intent_classification", p, outputs.get(p["text"], "answer"))
+        for p in rt.INTENT_PROMPTS
+    ]
+    return {
+        "configs_run": [
+            {
+                "config": {"label": "m | precise"},
+                "suites": {
+                    "intent_classification": {
+                        **rt.summarize_intent(records), "cases": records, "prompt_tokens": 7,
+                    },
+                    "latency": {"avg_tps": 12.0},
+                },
+            }
+        ]
+    }
+
+
+def test_grade_case_keeps_raw_output() -> None:
+    record = rt.grade_case("reasoning_math", rt.REASONING_PROBLEMS[0], "Sum.\nANSWER: 636")
+    assert record["found"] is True
+    assert record["case_id"] == rt.REASONING_PROBLEMS[0]["question"]
+    assert record["raw_output"] == "Sum.\nANSWER: 636"
+
+
+def test_rescore_applies_current_graders(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.chdir(tmp_path)
+    first = rt.INTENT_PROMPTS[0]["text"]
+    source = tmp_path / "run.json"
+    source.write_text(json.dumps(stored_run({first: "Category: SEARCH"})), encoding="utf-8")
+
+    results = rt.rescore_results(source)
+    suite = results["m | precise"]["intent_classification"]
+    assert suite["correct_loose"] == 8  # unchanged grader: same score (search + 7 answers)
+
+    # A grader fix changes scores without re-querying anything
+    lenient = rt.SuiteGrader(**{
+        **rt.GRADERS["intent_classification"].__dict__,
+        "grade": lambda p, raw: {**rt.grade_intent(p, raw), "loose": True},
+    })
+    monkeypatch.setitem(rt.GRADERS, "intent_classification", lenient)
+    results = rt.rescore_results(source)
+    suite = results["m | precise"]["intent_classification"]
+    assert suite["correct_loose"] == len(rt.INTENT_PROMPTS)
+    assert suite["prompt_tokens"] == 7
+    assert results["m | precise"]["latency"] == {"avg_tps": 12.0}
+    assert list((tmp_path / "results").glob("*_rescored_run.cjson.gz"))
+
+
+def test_rescore_recomputes_pass_at_k_from_the_samples(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.chdir(tmp_path)
+    cp = rt.CODE_PROMPTS[0]
+    good, bad = f"print({cp['expected_output']!r})", "print("
+    samples = [{**rt.grade_case("code_generation", cp, bad), "status": "FAIL"}
+               for _ in range(3)]
+    for smp, raw in zip(samples, (good, bad, good)):
+        smp["raw_output"] = raw  # stored before a grader or sandbox fix: all failed
+    record = {**samples[0], "samples": samples, "passed": 0, "unique_programs": 2,
+              "pass_at_k": {"1": 0.0, "2": 0.0}}
+    source = tmp_path / "run.json"
+    source.write_text(json.dumps({"configs_run": [{
+        "config": {"label": "m | precise"},
+        "suites": {"code_generation": {**rt.summarize_code([record]), "cases": [record]}},
+    }]}), encoding="utf-8")
+
+    suite = rt.rescore_results(source)["m | precise"]["code_generation"]
+    rescored = suite["cases"][0]
+    assert [smp["status"] for smp in rescored["samples"]] == ["PASS", "FAIL", "PASS"]
+    assert rescored["status"] == "PASS" and rescored["passed"] == 2
+    assert rescored["pass_at_k"] == {"1": round(2 / 3, 4), "2": 1.0}
+    assert suite["pass_at_k"] == {"1": 66.7, "2": 100.0}
@@ -0,0 +1,98 @@
+"""Tests for the compact results format and loading either format."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+from ai_test_harness.resultfile import (
+    CaseSpool,
+    export_json,
+    load_results,
+    pack,
+    unpack,
+    write_results,
+)
+
+HAYSTACK = "The quick brown fox. " * 50
+
+
+def sample_results() -> dict:
+    needle = {"haystacks": [{"needle": "n1", "haystack_text": HAYSTACK}], "recall_percent": 40.0,
+              "details": [{"case_id": "a", "found": True, "raw_output": HAYSTACK},
+                          {"case_id": "b", "found": False, "stderr": "x"}]}
+    return {
+        "run_id": "r1",
+        "configs_run": [
+            {"config": {"label": "m | precise"}, "suites": {"needle_in_haystack": needle}},
+            {"config": {"label": "m | creative"}, "suites": {"needle_in_haystack": needle}},
+        ],
+        "odd": [{"$b": "not a blob"}, {"$t": 1, "other": 2}, [], [{"only": 1}]],
+    }
+
+
+def test_pack_dedupes_blobs_and_round_trips() -> None:
+    data = sample_results()
+    doc = pack(data)
+    assert len(doc["blobs"]) == 1  # the haystack, once for 2 configs x (haystack + raw output)
+    assert json.dumps(doc).count("quick brown fox") == 50
+    details = doc["data"]["configs_run"]["$t"]["cols"]["suites"][0]["needle_in_haystack"]
+    assert details["details"]["$t"]["absent"] == {"raw_output": [1], "stderr": [0]}
+    assert unpack(doc) == data
+    with pytest.raises(ValueError):
+        unpack({**doc, "version": 99})
+
+
+@pytest.mark.parametrize("compression", ["none", "gzip", "lzma"])
+def test_load_results_reads_either_format(tmp_path: Path, compression: str) -> None:
+    data = sample_results()
+    path = write_results(data, tmp_path / "run", compression)
+    assert path.name == "run.cjson" + {"none": "", "gzip": ".gz", "lzma": ".xz"}[compression]
+    assert load_results(path) == data
+
+    plain = export_json(path)
+    assert plain == tmp_path / "run.json"
+    assert json.loads(plain.read_text(encoding="utf-8")) == data
+    assert load_results(plain) == data
+    with pytest.raises(ValueError):
+        export_json(plain)
+
+
+def test_load_results_rejects_corrupt_files(tmp_path: Path) -> None:
+    path = write_results(sample_results(), tmp_path / "run", "gzip")
+    path.write_bytes(path.read_bytes()[:40])
+    with pytest.raises(ValueError, match="corrupt"):
+        load_results(path)
+
+
+@pytest.mark.parametrize("fmt", ["json", "compact"])
+def test_spooled_suites_stream_back_into_the_results_file(tmp_path: Path, fmt: str) -> None:
+    data = sample_results()
+    spool = CaseSpool(tmp_path)
+    kept = {}
+    for run in data["configs_run"]:
+        label = run["config"]["label"]
+        kept[label] = spool.stash(label, "needle_in_haystack", run["suites"]["needle_in_haystack"])
+    assert list(kept["m | precise"]) == ["recall_percent"] and spool.bytes > 0
+
+    streamed = {
+        **data,
+        "configs_run": (
+            {"config": run["config"], "suites": {
+                "needle_in_haystack": spool.restore(
+                    run["config"]["label"], "needle_in_haystack",
+                    kept[run["config"]["label"]],
+                ),
+            }}
+            for run in data["configs_run"]
+        ),
+    }
+    path = write_results(streamed, tmp_path / "run", fmt=fmt)
+    spool.close()
+    assert load_results(path) == data
+    restored = load_results(path)["configs_run"][0]["suites"]["needle_in_haystack"]
+    assert list(restored) == ["haystacks", "recall_percent", "details"]
+    if fmt == "json":
+        assert path.read_text(encoding="utf-8") == json.dumps(data, indent=2)
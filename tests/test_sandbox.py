@@ -0,0 +1,94 @@
+"""Tests for the sandboxed worker pool that runs generated code."""
+
+from __future__ import annotations
+
+import asyncio
+import sys
+
+import pytest
+
+import run_tests as rt
+from ai_test_harness.sandbox import ExecResult, Limits, SandboxPool, run_python
+
+posix_only = pytest.mark.skipif(sys.platform == "win32", reason="rlimits need POSIX")
+
+
+async def test_pool_runs_code_in_fresh_dir_and_caches_by_hash() -> None:
+    code = "import os; open('out.txt', 'w').write('x'); print(sorted(os.listdir('.')))"
+    async with SandboxPool(size=2, limits=Limits(timeout_s=5)) as pool:
+        first = await pool.run(code)
+        assert first.ok and first.stdout == "['out.txt']"  # nothing left by earlier runs
+        assert not first.cached
+
+        again = await pool.run(code)
+        assert again.cached and again.stdout == first.stdout
+        assert pool.stats["runs"] == 1 and pool.stats["cache_hits"] == 1
+
+        failed = await pool.run("raise ValueError('boom')")
+        assert failed.returncode == 1 and "ValueError: boom" in failed.stderr
+
+
+@posix_only
+async def test_pool_enforces_timeout_and_memory_limit() -> None:
+    async with SandboxPool(size=1, limits=Limits(timeout_s=0.5, memory_mb=256)) as pool:
+        hung = await pool.run("while True: pass")
+        assert hung.timed_out and not hung.ok
+
+        greedy = await pool.run("x = bytearray(1024 * 1024 * 1024)")
+        assert not greedy.ok and "MemoryError" in greedy.stderr
+
+        # The worker survives both and keeps serving
+        assert (await pool.run("print(6 * 7)")).stdout == "42"
+        assert pool.stats["restarts"] == 0
+
+
+async def test_pool_returns_output_beyond_the_stream_line_limit() -> None:
+    async with SandboxPool(size=1, limits=Limits(timeout_s=5)) as pool:
+        loud = await pool.run("print('x' * 100_000)")
+        assert loud.ok and len(loud.stdout) == 100_000
+        assert pool.stats["restarts"] == 0
+
+
+async def test_worker_failures_are_not_cached(monkeypatch: pytest.MonkeyPatch) -> None:
+    async with SandboxPool(size=1, limits=Limits(timeout_s=5)) as pool:
+        execute = pool._execute
+        calls = 0
+
+        async def flaky(worker: object, code: str) -> ExecResult:
+            nonlocal calls
+            calls += 1
+            if calls == 1:
+                raise ValueError("reply line too long")
+            return await execute(worker, code)  # type: ignore[arg-type]
+
+        monkeypatch.setattr(pool, "_execute", flaky)
+        failed = await pool.run("print(1)")
+        assert failed.returncode is None and pool.stats["restarts"] == 1
+        retried = await pool.run("print(1)")
+        assert not retried.cached and retried.stdout == "1"
+        assert (await pool.run("print(1)")).cached
+
+
+async def test_cancelled_job_does_not_leak_its_reply() -> None:
+    async with SandboxPool(size=1, limits=Limits(timeout_s=5)) as pool:
+        slow = asyncio.create_task(pool.run("import time; time.sleep(0.5); print('A')"))
+        await asyncio.sleep(0.2)  # the worker is running it
+        slow.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await slow
+        assert pool.stats["restarts"] == 1
+
+        after = await pool.run("print('B')")
+        assert after.stdout == "B" and not after.cached
+        assert (await pool.run("print('B')")).stdout == "B"
+
+
+def test_grade_code_from_execution_result_or_one_shot_run() -> None:
+    cp = rt.CODE_PROMPTS[0]
+    passed = rt.grade_code(cp, "ignored", ExecResult(0, stdout=f"x\n{cp['expected_output']}"))
+    assert passed["status"] == "PASS" and passed["ran"]
+    assert rt.grade_code(cp, "", ExecResult(None, timed_out=True))["status"] == "TIMEOUT"
+
+    one_shot = rt.grade_code(cp, f"```python\nprint({cp['expected_output']!r})\n```")
+    assert one_shot["status"] == "PASS"
+    assert run_python("import sys; sys.exit(3)").returncode == 3
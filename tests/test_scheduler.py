@@ -0,0 +1,79 @@
+"""Tests for model-swap-aware matrix scheduling."""
+
+from __future__ import annotations
+
+from ai_test_harness.scheduler import (
+    MatrixScheduler,
+    count_reloads,
+    plan_prefix_order,
+    prefix_order,
+    shared_prefix_chars,
+)
+
+MATRIX = [
+    ("llama3", 4096, "precise"),
+    ("llama3", 4096, "creative"),
+    ("llama3", 2048, "small-context"),
+    ("llama3", 8192, "large-context"),
+    ("llama3", 4096, "minimal-prompt"),
+    ("qwen", 4096, "precise"),
+    ("qwen", 2048, "small-context"),
+    ("qwen", 4096, "creative"),
+]
+
+
+def key(item: tuple[str, int, str]) -> tuple[str, int]:
+    return item[0], item[1]
+
+
+def test_count_reloads_per_model() -> None:
+    assert count_reloads([("a", 1), ("a", 1), ("a", 2), ("b", 2), ("a", 2)]) == {"a": 3, "b": 1}
+
+
+def test_plan_groups_model_and_context() -> None:
+    plan = MatrixScheduler().plan(MATRIX, key=key)
+    assert plan.naive_reloads == 7
+    assert plan.planned_reloads == 5
+    assert plan.reloads_avoided == 2
+    # Models keep first-seen order; configs sharing num_ctx keep their relative order
+    assert [c[2] for c in plan.order[:5]] == [
+        "precise", "creative", "minimal-prompt", "small-context", "large-context",
+    ]
+    assert sorted(plan.order) == sorted(MATRIX)
+
+
+def test_report_uses_observed_load_times() -> None:
+    scheduler = MatrixScheduler(default_load_s=10.0)
+    scheduler.plan(MATRIX, key=key)
+    scheduler.observe("llama3", 4096, 4.0)
+    scheduler.observe("llama3", 4096, 0.01)  # already resident, not a reload
+    report = scheduler.report()
+    assert len(report["observed_reloads"]) == 1
+    # llama3 avoids 1 reload at its observed 4s, qwen avoids 1 at the 10s default
+    assert report["est_load_time_saved_s"] == 14.0
+
+
+def test_resident_model_runs_first() -> None:
+    plan = MatrixScheduler().plan(MATRIX, key=key, resident=("qwen", 4096))
+    assert [key(c) for c in plan.order[:3]] == [("qwen", 4096)] * 2 + [("qwen", 2048)]
+    # The resident pair costs nothing; naive order still loads llama3 first
+    assert plan.planned_reloads == 4
+    assert plan.naive_reloads == 7
+
+
+def test_prefix_order_groups_shared_prefixes() -> None:
+    prompts = ["sys A: q2", "other", "sys A: q1", "sys B: q1", "sys A: q3"]
+    plan = plan_prefix_order(prompts)
+    assert [prompts[i] for i in plan.order] == sorted(prompts)
+    assert plan.shared_chars > plan.naive_shared_chars
+    assert plan.as_dict()["est_prompt_eval_saved"] >= 0
+
+
+def test_prefix_order_keeps_each_slot_on_one_run() -> None:
+    prompts = [f"{group}-{i}" for i in range(3) for group in "abcd"]  # interleaved groups
+    order = prefix_order(prompts, slots=4)
+    # Round-robin dispatch hands slot s every 4th case; each slot sees a single group
+    for slot in range(4):
+        assert len({prompts[i][0] for i in order[slot::4]}) == 1
+    naive = shared_prefix_chars(prompts, range(len(prompts)), slots=1)
+    assert shared_prefix_chars(prompts, order, slots=4) > naive
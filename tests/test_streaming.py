@@ -0,0 +1,71 @@
+"""Tests for streaming chat timing metrics."""
+
+from __future__ import annotations
+
+import json
+
+import httpx
+
+from ai_test_harness.streaming import (
+    StreamTiming,
+    percentile,
+    stream_chat_completion,
+    stream_metrics,
+)
+from ai_test_harness.suites.routing import run_latency_test
+
+
+def test_percentile_interpolates() -> None:
+    assert percentile([10, 20, 30, 40], 50) == 25
+    assert percentile([], 95) == 0.0
+
+
+def test_metrics_separate_prefill_from_decode() -> None:
+    # First token after 500ms of prefill, then 10 tokens 20ms apart and one 1s stall
+    chunks = [0.5 + 0.02 * i for i in range(10)] + [0.5 + 0.18 + 1.0]
+    timing = StreamTiming(start=0.0, end=1.7, chunk_times=chunks, completion_tokens=11)
+    m = stream_metrics(timing)
+    assert m["ttft_ms"] == 500.0
+    assert m["itl_p50_ms"] == 20.0
+    assert m["stalls"] == 1
+    assert m["max_stall_ms"] == 1000.0
+    # 10 decode tokens over 1.18s, prefill excluded
+    assert m["decode_tps"] == round(10 / 1.18, 1)
+    assert sum(m["itl_histogram_ms"]["counts"]) == 10
+
+
+async def test_stream_reassembles_sse_chunks() -> None:
+    events = [
+        {"choices": [{"delta": {"content": "Hel"}}]},
+        {"choices": [{"delta": {"content": "lo"}}]},
+        {"choices": [], "usage": {"prompt_tokens": 4, "completion_tokens": 2}},
+    ]
+    body = "".join(f"data: {json.dumps(e)}\n\n" for e in events) + "data: [DONE]\n\n"
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        sent = json.loads(request.content)
+        assert sent["stream"] is True
+        return httpx.Response(200, text=body, headers={"content-type": "text/event-stream"})
+
+    async with httpx.AsyncClient(
+        transport=httpx.MockTransport(handler), base_url="http://test"
+    ) as client:
+        data, timing = await stream_chat_completion(client, {"model": "m", "messages": []})
+    assert data["choices"][0]["message"]["content"] == "Hello"
+    assert data["usage"]["completion_tokens"] == 2
+    assert len(timing.chunk_times) == 2
+
+
+async def test_latency_test_reports_no_ttft_without_a_first_token() -> None:
+    body = (f"data: {json.dumps({'choices': [], 'usage': {'completion_tokens': 0}})}\n\n"
+            "data: [DONE]\n\n")
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, text=body, headers={"content-type": "text/event-stream"})
+
+    async with httpx.AsyncClient(
+        transport=httpx.MockTransport(handler), base_url="http://test"
+    ) as client:
+        result = await run_latency_test(client, "m", "hi")
+    assert result["first_token_latency_ms"] is None and result["first_token_seen"] is False
+    assert result["total_time_ms"] is not None  # the request itself was still timed
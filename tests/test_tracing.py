@@ -0,0 +1,120 @@
+"""Tests for tracing spans and their Chrome trace-event export."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+
+import httpx
+import pytest
+
+import run_tests as rt
+from ai_test_harness.tracing import lane, span, start_tracing, stop_tracing, tagged
+
+
+def events(path: Path) -> list[dict[str, Any]]:
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def test_spans_nest_per_lane_and_carry_tags(tmp_path: Path) -> None:
+    with span("untraced"):
+        pass  # no tracer installed: a no-op
+    tracer = start_tracing(tmp_path / "trace.json")
+
+    async def case(i: int) -> None:
+        with lane(), tagged(case=f"c{i}"), span("case"):
+            await asyncio.sleep(0.01)
+            with span("grade", passed=True):
+                pass
+
+    async def suite() -> None:
+        with tagged(config="m | precise", suite="s"), span("suite"):
+            await asyncio.gather(*(case(i) for i in range(3)))
+
+    try:
+        asyncio.run(suite())
+        with span("db_write", lane="results_db"):
+            pass
+    finally:
+        stop_tracing()
+
+    spans = [e for e in events(tracer.path) if e["ph"] == "X"]
+    assert tracer.spans == len(spans) == 8
+    cases = [e for e in spans if e["name"] == "case"]
+    assert sorted(e["tid"] for e in cases) == [1, 2, 3]  # concurrent cases get separate rows
+    assert {e["args"]["case"] for e in cases} == {"c0", "c1", "c2"}
+    grade = next(e for e in spans if e["name"] == "grade")
+    assert grade["args"] == {"config": "m | precise", "suite": "s", "case": grade["args"]["case"],
+                             "passed": True}
+    suite_span = next(e for e in spans if e["name"] == "suite")
+    assert suite_span["tid"] == 0 and suite_span["dur"] >= 10_000
+    names = {e["tid"]: e["args"]["name"] for e in events(tracer.path) if e["ph"] == "M"
+             and e["name"] == "thread_name"}
+    assert names[next(e["tid"] for e in spans if e["name"] == "db_write")] == "results_db"
+
+
+def test_span_count_holds_across_threads(tmp_path: Path) -> None:
+    tracer = start_tracing(tmp_path / "trace.json")
+
+    def work(_: int) -> None:
+        for _ in range(500):
+            with span("grade"):
+                pass
+
+    try:
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(work, range(8)))
+    finally:
+        stop_tracing()
+    assert tracer.spans == len([e for e in events(tracer.path) if e["ph"] == "X"]) == 4000
+
+
+async def test_httpx_trace_events_become_spans(tmp_path: Path) -> None:
+    tracer = start_tracing(tmp_path / "trace.json")
+    try:
+        request = httpx.Request("POST", "http://x/v1/chat/completions")
+        await tracer.httpx_hooks()["request"][0](request)
+        trace = request.extensions["trace"]
+        for step in ("connection.connect_tcp", "http11.send_request_headers",
+                     "http11.receive_response_headers"):
+            await trace(f"{step}.started", {})
+            await trace(f"{step}.complete", {})
+        await trace("http11.receive_response_body.started", {})
+        await trace("http11.response_closed.started", {})  # a stream closed before its end
+        await trace("http11.receive_response_body.complete", {})  # late: ignored
+    finally:
+        stop_tracing()
+
+    names = [e["name"] for e in events(tracer.path) if e["ph"] == "X"]
+    assert names == ["http.connect", "http.send", "http.server", "http.receive"]
+
+
+async def test_run_cases_traces_queueing_cases_and_grading(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(rt.RUNTIME, "executor", rt.CaseExecutor(suite_limit=2))
+    monkeypatch.setattr(rt.RUNTIME, "journal", None)
+    tracer = start_tracing(tmp_path / "trace.json")
+
+    async def solve(prob: dict[str, str]) -> dict[str, Any]:
+        await asyncio.sleep(0.01)
+        return rt.grade_case("reasoning_math", prob, prob["answer"])
+
+    token = rt.CURRENT_CONFIG.set(rt.build_configs("m")[0])
+    try:
+        with tagged(suite="reasoning_math"):
+            await rt.run_cases("reasoning_math", rt.REASONING_PROBLEMS[:4], solve)
+    finally:
+        rt.CURRENT_CONFIG.reset(token)
+        stop_tracing()
+
+    trace = events(tracer.path)
+    cases = [e for e in trace if e["name"] == "case"]
+    grades = [e for e in trace if e["name"] == "grade"]
+    queued = [e for e in trace if e["name"] == "queued" and e["ph"] == "b"]
+    assert len(cases) == len(grades) == len(queued) == 4
+    assert {e["tid"] for e in cases} == {1, 2}  # two slots, rows reused as cases finish
+    assert {e["args"]["case"] for e in cases} == {p["question"] for p in rt.REASONING_PROBLEMS[:4]}
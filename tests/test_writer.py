@@ -0,0 +1,71 @@
+"""Tests for the write-behind results batcher and run_tests' suite rows."""
+
+from __future__ import annotations
+
+import sqlite3
+from pathlib import Path
+
+import run_tests as rt
+from ai_test_harness.journal import RunJournal
+from ai_test_harness.writer import ResultWriter
+
+
+def rows(db: Path, sql: str) -> list[tuple]:
+    conn = sqlite3.connect(db)
+    try:
+        return conn.execute(sql).fetchall()
+    finally:
+        conn.close()
+
+
+async def test_writer_batches_and_drains_on_close(tmp_path: Path) -> None:
+    db = tmp_path / "results.db"
+    writer = ResultWriter(db, batch_rows=100, flush_ms=10_000)
+    await writer.start()
+    writer.add_run("r1", "m", "latency", "m | latency")
+    for i in range(250):
+        writer.add_result("r1", "m", "m | latency", "tps", float(i), {"case": i})
+    await writer.close()  # the last 51 statements were still waiting on flush_ms
+
+    assert writer.stats["statements"] == 251 and writer.stats["batches"] == 3
+    assert rows(db, "SELECT COUNT(*), SUM(metric_value) FROM test_results") == [(250, 31125.0)]
+
+
+async def test_replace_results_keeps_rewrites_idempotent(tmp_path: Path) -> None:
+    db = tmp_path / "results.db"
+    async with ResultWriter(db, flush_ms=1) as writer:
+        for value in (1.0, 2.0):  # e.g. a suite written, then re-written on resume
+            writer.add_run("r1", "m", "s", "m | s")
+            writer.replace_results("r1", "m", "m | s")
+            writer.add_result("r1", "m", "m | s", "score", value)
+        writer.add_result("r1", "m", "missing test", "score", 3.0)  # violates the foreign key
+
+    assert rows(db, "SELECT metric_value FROM test_results") == [(2.0,)]
+    assert rows(db, "SELECT COUNT(*) FROM test_runs") == [(1,)]
+    assert writer.stats["failed_statements"] == 1
+
+
+async def test_persist_suite_writes_suite_and_case_metrics(tmp_path: Path) -> None:
+    config = rt.build_configs("m1")[0]
+    rt.RUNTIME.journal = RunJournal.create(tmp_path / "run.jsonl", "run-1", {})
+    rt.RUNTIME.results_db = ResultWriter(tmp_path / "results.db", flush_ms=1)
+    await rt.RUNTIME.results_db.start()
+    try:
+        rt.persist_suite(config, "code_generation", {
+            "correctness_percent": 50.0, "pass_at_k": {"1": 40.0}, "note": "text",
+            "cases": [{"case_id": "a", "ran": True, "exec_s": 0.5}, {"case_id": "b", "ran": False}],
+        })
+        rt.persist_suite(config, "json_conformance", {"error": "boom"})
+    finally:
+        await rt.RUNTIME.results_db.close()
+        rt.RUNTIME.journal.close()
+        rt.RUNTIME.results_db = rt.RUNTIME.journal = None
+
+    got = rows(tmp_path / "results.db", "SELECT test_name, metric_name, metric_value "
+               "FROM test_results ORDER BY id")
+    name = f"{config.label} | code_generation"
+    assert got == [
+        (name, "correctness_percent", 50.0), (name, "pass_at_k.1", 40.0),
+        (name, "cases.ran", 1.0), (name, "cases.exec_s", 0.5), (name, "cases.ran", 0.0),
+        (f"{config.label} | json_conformance", "error", 1.0),
+    ]